@@ -3,6 +3,8 @@ import logging
 import httpx
 from typing import Any, Optional, Dict, List
 
+from src.infrastructure.http import http_clients
+
 logger = logging.getLogger(__name__)
 
 class HaClient:
@@ -19,19 +21,15 @@ class HaClient:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
         }
-        self._client: Optional[httpx.AsyncClient] = None
+        http_clients.configure("home_assistant", headers=self.headers, timeout=10.0)
 
     @property
     def client(self) -> httpx.AsyncClient:
-        """Lazy initialization of the AsyncClient."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(headers=self.headers, timeout=10.0)
-        return self._client
+        """Shared keep-alive pool for Home Assistant."""
+        return http_clients.get("home_assistant")
 
     async def close(self):
-        """Close the underlying AsyncClient."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
+        """No-op: the pool is shared process-wide and released by http_clients.aclose()."""
 
     async def get_state(self, entity_id: str) -> Optional[Dict[str, Any]]:
         """Fetch the state of a specific entity."""
@@ -2,11 +2,11 @@ import logging
 import re
 import json
 import os
-import httpx
 import asyncio
 import aiohttp
 from typing import Any, Optional, Dict, List
 from src.domain.agent import BaseAgent
+from src.infrastructure.http import http_clients
 from src.models.hlink import HLinkMessage, MessageType, Sender, Recipient, Payload
 
 logger = logging.getLogger(__name__)
@@ -26,17 +26,15 @@ class HaClient:
             logger.warning("ELECTRA_HA: No HA_TOKEN found in environment!")
 
         self.headers = {"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"}
-        self._client = None
+        http_clients.configure("home_assistant", headers=self.headers, timeout=10.0)
 
     @property
     def client(self):
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(headers=self.headers, timeout=10.0)
-        return self._client
+        return http_clients.get("home_assistant")
 
     async def close(self):
-        if self._client:
-            await self._client.aclose()
+        # The pool is shared with every other HA caller; it is released by http_clients.aclose().
+        pass
 
     async def call_service(self, domain: str, service: str, data: dict):
         url = f"{self.base_url}/services/{domain}/{service}"
@@ -13,8 +13,14 @@ import tempfile
 import base64
 import threading
 import queue
-import httpx
-from typing import Dict, Any, Optional, Generator
+import itertools
+import json
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Generator, Iterator, Tuple
+
+import yaml
 
 try:
     from melo.api import TTS as MeloTTS
@@ -31,16 +37,55 @@ except ImportError:
     PYTTSX3_AVAILABLE = False
 
 from models.hlink import HLinkMessage, MessageType, Payload, Sender, Recipient
+from infrastructure.http import http_clients
 from infrastructure.redis import RedisClient
 
+from services.metrics import get_metrics
+from services.tracing import get_tracer, trace_context
 from services.voice import voice_profile_service, VoiceProfile
 from services.voice_modulation import voice_modulation_service, EMOTION_CONFIGS
 from services.prosody import prosody_service, IntonationType
 from services.neural_voice_assignment import neural_voice_assignment_service
+from services.tts_cache import TtsCache, cache_key
 
 logger = logging.getLogger(__name__)
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
+DEFAULT_ELEVENLABS_VOICE = "21m00Tcm4TlvDq8ikWAM"
+# Audio container each engine renders to (cached clips carry no format of their own)
+ENGINE_FORMATS = {"elevenlabs": "mp3", "pyttsx3": "wav"}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 250) -> list:
+    """
+    Splits text into synthesis units: one sentence each, very short sentences
+    merged into the next and run-ons cut at the last comma or space.
+    """
+    units = []
+    pending = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = f"{pending} {sentence}".strip() if pending else sentence.strip()
+        pending = ""
+        if not sentence:
+            continue
+        if len(sentence) < min_chars:
+            pending = sentence
+            continue
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(",", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut + 1 if cut > 0 else max_chars
+            units.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            units.append(sentence)
+    if pending:
+        if units and len(units[-1]) + len(pending) < max_chars:
+            units[-1] = f"{units[-1]} {pending}"
+        else:
+            units.append(pending)
+    return units
 
 
 class TTSService:
@@ -54,6 +99,12 @@ class TTSService:
         self.is_processing = False
         self.processing_thread = None
         self.loop = None
+        # Sentences of one request are synthesized concurrently; requests stay in order
+        self.max_workers = int(os.getenv("TTS_WORKERS", "3"))
+        self.synth_pool = None
+        self._cancelled = set()
+        self._current_request = None
+        self.cache = TtsCache() if os.getenv("TTS_CACHE", "true").lower() != "false" else None
 
         self.sample_rate = 24000
         self.speaker_id = 0
@@ -96,6 +147,8 @@ class TTSService:
 
             self.is_initialized = True
             self.is_processing = True
+            if self.max_workers > 1:
+                self.synth_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
             self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
             self.processing_thread.start()
 
@@ -127,7 +180,12 @@ class TTSService:
                 try:
                     item = self.request_queue.get(timeout=1.0)
                     request_id, text, params = item
-                    self._process_tts_request(request_id, text, params, local_engine)
+                    if request_id in self._cancelled:
+                        self._cancelled.discard(request_id)
+                    else:
+                        self._current_request = request_id
+                        self._process_tts_request(request_id, text, params, local_engine)
+                        self._current_request = None
                     self.request_queue.task_done()
                 except queue.Empty:
                     continue
@@ -137,6 +195,13 @@ class TTSService:
 
     def _process_tts_request(self, request_id: str, text: str, params: Dict, local_engine):
         """Process a single TTS request."""
+        started = time.perf_counter()
+        with get_tracer().span(
+            params.get("trace_id"), "bridge.tts", enqueued_at=params.get("enqueued_at"), engine=self.engine_type
+        ):
+            self._synthesize(request_id, text, params, local_engine, started)
+
+    def _synthesize(self, request_id: str, text: str, params: Dict, local_engine, started: float):
         try:
             logger.info(f"Generating audio for request {request_id}: {text[:30]}...")
 
@@ -151,61 +216,163 @@ class TTSService:
                 {"text": text, "voice_params": {"pitch": pitch, "rate": rate, "volume": volume, "emotion": emotion}},
             )
 
-            # --- ENGINE SELECTION ---
-
-            # 1. ElevenLabs (High-Fi)
-            if self.engine_type == "elevenlabs":
-                voice_id = params.get("voice_id", "21m00Tcm4TlvDq8ikWAM")
-                url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-                headers = {"xi-api-key": ELEVENLABS_API_KEY, "Content-Type": "application/json"}
-                data = {
-                    "text": text,
-                    "model_id": "eleven_multilingual_v2",
-                    "voice_settings": {"stability": 0.5, "similarity_boost": 0.75},
-                }
-
-                resp = httpx.post(url, json=data, headers=headers, timeout=30.0)
-                if resp.status_code == 200:
-                    b64_audio = base64.b64encode(resp.content).decode("utf-8")
-                    self._send_event(
-                        MessageType.TTS_AUDIO_CHUNK,
-                        request_id,
-                        {"audio_chunk": b64_audio, "index": 0, "is_last": True, "format": "mp3"},
-                    )
-                else:
-                    logger.error(f"ElevenLabs failed: {resp.text}")
-
-            # 2. Pyttsx3 (Local Fallback)
-            elif self.engine_type == "pyttsx3" and local_engine:
-                local_engine.setProperty("rate", int(150 * rate))
-                local_engine.setProperty("volume", min(1.0, volume))
-
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tf:
-                    temp_filename = tf.name
-
-                local_engine.save_to_file(text, temp_filename)
-                local_engine.runAndWait()
-
-                with open(temp_filename, "rb") as f:
-                    audio_data = f.read()
-
+            sentences = split_sentences(text) or [text]
+            # pyttsx3 drives one shared engine per process, so only HTTP engines fan out
+            if self.engine_type == "elevenlabs" and self.synth_pool and len(sentences) > 1:
+                results = self._render_parallel(request_id, sentences, params)
+            else:
+                results = (self._render(sentence, params, local_engine) for sentence in sentences)
+
+            seq = 0
+            last_sent = False
+            audio_format = ""
+            status = "completed"
+            for index, (audio_data, audio_format) in enumerate(results):
+                if request_id in self._cancelled:
+                    status = "cancelled"
+                    break
+                if not audio_data:
+                    continue
+                if seq == 0:
+                    get_metrics().observe("tts_first_audio_seconds", time.perf_counter() - started)
                 b64_audio = base64.b64encode(audio_data).decode("utf-8")
                 self._send_event(
                     MessageType.TTS_AUDIO_CHUNK,
                     request_id,
-                    {"audio_chunk": b64_audio, "index": 0, "is_last": True, "format": "wav"},
+                    {
+                        "audio_chunk": b64_audio,
+                        "index": seq,
+                        "is_last": index == len(sentences) - 1,
+                        "format": audio_format,
+                    },
                 )
-                try:
-                    os.remove(temp_filename)
-                except:
-                    pass
+                last_sent = index == len(sentences) - 1
+                seq += 1
+            results.close()
 
-            self._send_event(MessageType.TTS_END, request_id, {"status": "completed"})
+            if seq and not last_sent and status == "completed":
+                # The last sentence failed or came back empty: close the utterance with an empty marker chunk
+                self._send_event(
+                    MessageType.TTS_AUDIO_CHUNK,
+                    request_id,
+                    {"audio_chunk": "", "index": seq, "is_last": True, "format": audio_format},
+                )
+
+            self._cancelled.discard(request_id)
+            self._send_event(MessageType.TTS_END, request_id, {"status": status, "chunks": seq})
+            get_metrics().observe("tts_synthesis_seconds", time.perf_counter() - started, {"engine": self.engine_type})
 
         except Exception as e:
             logger.error(f"TTS generation failed: {e}")
+            get_metrics().increment("tts_errors_total", labels={"engine": self.engine_type})
             self._send_event(MessageType.TTS_ERROR, request_id, {"error": str(e)})
 
+    def _render_parallel(self, request_id: str, sentences: list, params: Dict) -> Iterator[Tuple[Optional[bytes], str]]:
+        """Keeps up to `max_workers` sentences in flight and yields results in sentence order."""
+        pending: deque = deque()
+        upcoming = iter(sentences)
+        try:
+            for sentence in itertools.islice(upcoming, self.max_workers):
+                pending.append(self.synth_pool.submit(self._render, sentence, params, None))
+            while pending:
+                future = pending.popleft()
+                if request_id in self._cancelled:
+                    yield None, ""
+                    return
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error(f"TTS sentence failed for {request_id}: {e}")
+                    yield None, ""
+                for sentence in itertools.islice(upcoming, 1):
+                    pending.append(self.synth_pool.submit(self._render, sentence, params, None))
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _cache_key(self, text: str, params: Dict) -> Optional[str]:
+        if self.cache is None or self.engine_type not in ENGINE_FORMATS or not self.cache.cacheable(text):
+            return None
+        voice_id = params.get("voice_id", DEFAULT_ELEVENLABS_VOICE if self.engine_type == "elevenlabs" else None)
+        return cache_key(text, voice_id, self.engine_type, params)
+
+    def _render(self, text: str, params: Dict, local_engine) -> Tuple[Optional[bytes], str]:
+        """Synthesizes one sentence, replaying it from the cache when it was already rendered with the same voice."""
+        key = self._cache_key(text, params)
+        if key is not None:
+            audio = self.cache.get(key)
+            if audio:
+                return audio, ENGINE_FORMATS[self.engine_type]
+        audio_data, audio_format = self._render_engine(text, params, local_engine)
+        if key is not None and audio_data:
+            self.cache.put(key, audio_data)
+        return audio_data, audio_format
+
+    def _render_engine(self, text: str, params: Dict, local_engine) -> Tuple[Optional[bytes], str]:
+        """Synthesizes one sentence with the configured engine; returns (audio, format)."""
+        rate = params.get("rate", 1.0)
+        volume = params.get("volume", 1.0)
+
+        # 1. ElevenLabs (High-Fi)
+        if self.engine_type == "elevenlabs":
+            voice_id = params.get("voice_id", DEFAULT_ELEVENLABS_VOICE)
+            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+            headers = {"xi-api-key": ELEVENLABS_API_KEY, "Content-Type": "application/json"}
+            data = {
+                "text": text,
+                "model_id": "eleven_multilingual_v2",
+                "voice_settings": {"stability": 0.5, "similarity_boost": 0.75},
+            }
+
+            # Blocking call from a worker thread, but over a pooled keep-alive connection
+            resp = http_clients.get_sync("elevenlabs").post(url, json=data, headers=headers, timeout=30.0)
+            if resp.status_code == 200:
+                return resp.content, "mp3"
+            logger.error(f"ElevenLabs failed: {resp.text}")
+            return None, "mp3"
+
+        # 2. Pyttsx3 (Local Fallback)
+        if self.engine_type == "pyttsx3" and local_engine:
+            local_engine.setProperty("rate", int(150 * rate))
+            local_engine.setProperty("volume", min(1.0, volume))
+
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tf:
+                temp_filename = tf.name
+
+            local_engine.save_to_file(text, temp_filename)
+            local_engine.runAndWait()
+
+            with open(temp_filename, "rb") as f:
+                audio_data = f.read()
+            try:
+                os.remove(temp_filename)
+            except:
+                pass
+            return audio_data, "wav"
+
+        return None, ""
+
+    def cancel(self, request_id: Optional[str] = None) -> int:
+        """
+        Stops a request (or, without an id, everything queued or playing).
+        Chunks already sent are left to the client; no further ones are emitted.
+        """
+        dropped = 0
+        if request_id is None:
+            try:
+                while True:
+                    self.request_queue.get_nowait()
+                    self.request_queue.task_done()
+                    dropped += 1
+            except queue.Empty:
+                pass
+            if self._current_request:
+                self._cancelled.add(self._current_request)
+        else:
+            self._cancelled.add(request_id)
+        get_metrics().increment("tts_cancelled_total")
+        return dropped
+
     def _send_event(self, msg_type, request_id, content):
         if self.loop and not self.loop.is_closed():
             asyncio.run_coroutine_threadsafe(self._dispatch_event(msg_type, request_id, content), self.loop)
@@ -222,10 +389,8 @@ class TTSService:
         except Exception as e:
             logger.error(f"Failed to dispatch TTS event: {e}")
 
-    async def speak(self, text: str, request_id: str = None, params: Dict = None):
-        if not request_id:
-            request_id = f"tts_{int(time.time() * 1000)}"
-        params = params or {}
+    async def _voice_params(self, text: str, params: Dict) -> Dict:
+        """Request params with the agent's voice profile, emotion modulation and prosody applied."""
         agent_id = params.get("agent_id", "default")
         base_params = await self.voice_profile_service.apply_to_tts_params(
             agent_id, {"pitch": 1.0, "rate": 1.0, "volume": 1.0}
@@ -235,19 +400,98 @@ class TTSService:
             base_params = self.voice_modulation_service.modulate_voice(base_params, emotion)
         style = params.get("prosody_style", "default")
         base_params = self.prosody_service.apply_prosody(base_params, text, style=style)
-        final_params = {**params, **base_params}
+        return {**params, **base_params}
+
+    async def speak(self, text: str, request_id: str = None, params: Dict = None):
+        if not request_id:
+            request_id = f"tts_{int(time.time() * 1000)}"
+        final_params = {**await self._voice_params(text, params or {}), "enqueued_at": time.time()}
         self.request_queue.put((request_id, text, final_params))
         return request_id
 
+    async def prewarm(self, phrases: Dict[str, list], concurrency: int = 2) -> int:
+        """
+        Renders each agent's routine phrases into the cache ahead of the first
+        request; phrases already cached cost nothing. Returns how many were
+        synthesized. Only the HTTP engine is pre-warmed: pyttsx3 renders
+        locally on the processing thread and costs nothing per call.
+        """
+        if self.cache is None or self.engine_type != "elevenlabs":
+            return 0
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        def warm_one(text: str, params: Dict) -> bool:
+            key = self._cache_key(text, params)
+            if key is None or self.cache.get(key) is not None:
+                return False
+            audio, _ = self._render_engine(text, params, None)
+            if audio:
+                self.cache.put(key, audio)
+            return bool(audio)
+
+        async def warm(agent_id: str, text: str) -> bool:
+            params = await self._voice_params(text, {"agent_id": agent_id})
+            async with semaphore:
+                return await loop.run_in_executor(self.synth_pool, warm_one, text, params)
+
+        results = await asyncio.gather(
+            *(warm(agent_id, text) for agent_id, texts in phrases.items() for text in texts),
+            return_exceptions=True,
+        )
+        rendered = sum(1 for result in results if result is True)
+        if rendered:
+            logger.info(f"TTS_CACHE: Pre-warmed {rendered} phrases")
+        return rendered
+
     async def cleanup(self):
         self.is_processing = False
         if self.processing_thread:
             self.processing_thread.join(timeout=2.0)
+        if self.synth_pool:
+            self.synth_pool.shutdown(wait=False, cancel_futures=True)
 
 
 tts_service = None
 
 
+def load_persona_phrases(agents_path: Optional[str] = None) -> Dict[str, list]:
+    """`common_phrases` of every agent persona, keyed by agent id (the agent's directory name)."""
+    agents_path = agents_path or os.getenv("AGENTS_PATH", "agents")
+    phrases = {}
+    try:
+        names = sorted(os.listdir(agents_path))
+    except OSError:
+        return phrases
+    for name in names:
+        persona_path = os.path.join(agents_path, name, "persona.yaml")
+        if not os.path.isfile(persona_path):
+            continue
+        try:
+            with open(persona_path, "r", encoding="utf-8") as f:
+                persona = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"TTS_CACHE: Could not read {persona_path}: {e}")
+            continue
+        common = [p for p in persona.get("common_phrases") or [] if isinstance(p, str) and p.strip()]
+        if common:
+            phrases[name] = common
+    return phrases
+
+
+async def prewarm_tts(redis_client, agents_path: Optional[str] = None) -> int:
+    """Startup hook: brings the TTS service up and pre-renders the personas' common phrases."""
+    global tts_service
+    phrases = load_persona_phrases(agents_path)
+    if not phrases:
+        return 0
+    if not tts_service:
+        tts_service = TTSService(redis_client)
+        if not await tts_service.initialize():
+            return 0
+    return await tts_service.prewarm(phrases)
+
+
 async def handle_tts_request(websocket, message: Dict[str, Any], redis_client):
     global tts_service
     if not tts_service:
@@ -259,8 +503,14 @@ async def handle_tts_request(websocket, message: Dict[str, Any], redis_client):
         if msg_type == MessageType.TTS_REQUEST:
             text = payload.get("content")
             if text:
-                req_id = await tts_service.speak(text)
+                trace_id, _ = trace_context(message)
+                req_id = await tts_service.speak(text, params={"trace_id": trace_id} if trace_id else None)
                 await websocket.send_text(json.dumps({"type": "tts_ack", "request_id": req_id, "status": "queued"}))
+        elif msg_type == MessageType.TTS_CANCEL:
+            # Barge-in: drop the current request (or a specific one) and everything queued
+            request_id = payload.get("session_id")
+            tts_service.cancel(request_id)
+            await websocket.send_text(json.dumps({"type": "tts_ack", "request_id": request_id, "status": "cancelled"}))
     except Exception as e:
         logger.error(f"Error handling TTS request: {e}")
         await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
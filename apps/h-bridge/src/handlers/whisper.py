@@ -24,6 +24,7 @@ import queue
 
 from models.hlink import HLinkMessage, MessageType, Payload, Sender, Recipient
 from infrastructure.redis import RedisClient
+from services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -175,11 +176,12 @@ class WhisperService:
             # ... (previous ffmpeg logic)
             audio_data = np.frombuffer(out, dtype=np.float32)
 
-            # Transcribe
-            result = self.model.transcribe(audio_data, language="fr", task="transcribe", vad_filter=True)
-            segments, info = result
+            # Transcribe (segments are decoded lazily, so the join is part of the timed work)
+            with get_metrics().timer("stt_transcribe_seconds", {"model": self.model_size}):
+                result = self.model.transcribe(audio_data, language="fr", task="transcribe", vad_filter=True)
+                segments, info = result
 
-            full_text = " ".join([s.text for s in segments]).strip()
+                full_text = " ".join([s.text for s in segments]).strip()
             if not full_text:
                 return
 
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class HttpProfile:
+    """Connection settings shared by every caller of a named client."""
+
+    headers: Dict[str, str] = field(default_factory=dict)
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    max_keepalive: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    keepalive_expiry: float = 30.0
+    retries: int = int(os.getenv("HTTP_CONNECT_RETRIES", "2"))
+    http2: bool = True
+
+
+class HttpClientRegistry:
+    """
+    Process-wide registry of pooled HTTP clients.
+
+    Each named profile (one per upstream: home_assistant, elevenlabs, media...)
+    owns a single keep-alive pool with its own connection limits, timeouts and
+    connect-retry budget, so integrations stop paying a TLS handshake per call.
+    """
+
+    def __init__(self):
+        self._profiles: Dict[str, HttpProfile] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._client_loops: Dict[str, Optional[asyncio.AbstractEventLoop]] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._retired: List[httpx.AsyncClient] = []
+        self._closing: Set[asyncio.Task] = set()
+
+    def configure(self, name: str, **settings: Any) -> HttpProfile:
+        """Registers (or updates) a profile. Existing clients are closed and rebuilt on next use."""
+        current = self._profiles.get(name)
+        profile = HttpProfile(**vars(current)) if current else HttpProfile()
+        for key, value in settings.items():
+            if not hasattr(profile, key):
+                raise ValueError(f"Unknown HTTP profile setting: {key}")
+            setattr(profile, key, value)
+        if profile == current:
+            return current
+
+        self._profiles[name] = profile
+        self._retire(name)
+        sync_client = self._sync_clients.pop(name, None)
+        if sync_client is not None:
+            sync_client.close()
+        return profile
+
+    def _retire(self, name: str) -> None:
+        """Drops the AsyncClient of `name` and releases its pool."""
+        loop = self._client_loops.pop(name, None)
+        client = self._async_clients.pop(name, None)
+        if client is None or client.is_closed:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and loop in (running, None):
+            task = running.create_task(client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            # Not closable from here (no loop, or its sockets belong to another one): released by aclose()
+            self._retired.append(client)
+
+    def profile(self, name: str) -> HttpProfile:
+        if name not in self._profiles:
+            self._profiles[name] = HttpProfile()
+        return self._profiles[name]
+
+    def _client_kwargs(self, profile: HttpProfile) -> Dict[str, Any]:
+        return {
+            "headers": profile.headers,
+            "timeout": httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+        }
+
+    def _limits(self, profile: HttpProfile) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=profile.max_connections,
+            max_keepalive_connections=profile.max_keepalive,
+            keepalive_expiry=profile.keepalive_expiry,
+        )
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Returns the shared AsyncClient for `name`, creating it on first use."""
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        client = self._async_clients.get(name)
+        # A client is bound to the loop that opened its sockets; rebuild it if that loop is gone.
+        if client is not None and not client.is_closed and self._client_loops.get(name) in (loop, None):
+            return client
+        if client is not None:
+            self._retire(name)
+
+        profile = self.profile(name)
+        use_http2 = profile.http2 and HTTP2_AVAILABLE
+        transport = httpx.AsyncHTTPTransport(
+            http2=use_http2, limits=self._limits(profile), retries=profile.retries
+        )
+        client = httpx.AsyncClient(transport=transport, **self._client_kwargs(profile))
+        self._async_clients[name] = client
+        self._client_loops[name] = loop
+        logger.info(
+            f"HTTP_POOL: Opened '{name}' (max_conn={profile.max_connections}, http2={use_http2}, retries={profile.retries})"
+        )
+        return client
+
+    def get_sync(self, name: str = "default") -> httpx.Client:
+        """Returns the shared blocking Client for `name`, for use from worker threads."""
+        client = self._sync_clients.get(name)
+        if client is not None and not client.is_closed:
+            return client
+
+        profile = self.profile(name)
+        transport = httpx.HTTPTransport(
+            http2=profile.http2 and HTTP2_AVAILABLE, limits=self._limits(profile), retries=profile.retries
+        )
+        client = httpx.Client(transport=transport, **self._client_kwargs(profile))
+        self._sync_clients[name] = client
+        return client
+
+    async def close(self, name: str) -> None:
+        """Closes the clients of one profile; the next get() opens a fresh pool."""
+        client = self._async_clients.pop(name, None)
+        self._client_loops.pop(name, None)
+        sync_client = self._sync_clients.pop(name, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+        if sync_client is not None:
+            sync_client.close()
+
+    async def aclose(self):
+        for name in list(self._async_clients) + list(self._sync_clients):
+            await self.close(name)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        retired, self._retired = self._retired, []
+        for client in retired:
+            try:
+                await client.aclose()
+            except Exception as e:  # bound to a loop that is gone
+                logger.debug(f"HTTP_POOL: Could not close a retired client: {e}")
+
+
+http_clients = HttpClientRegistry()
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    return http_clients.get(name)
@@ -1,11 +1,12 @@
 import asyncio
-import json
 import logging
 from collections.abc import Callable, Coroutine
 from typing import Any, Optional, Dict
 
 import redis.asyncio as redis
 
+from models.hlink_codec import decode_entry, dumps_text, encode_entry, loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,19 +43,67 @@ class RedisClient:
                 return
 
         try:
-            # Flatten dict for Redis Stream
-            payload = {}
-            for k, v in data.items():
-                if isinstance(v, (dict, list)):
-                    payload[k] = json.dumps(v)
-                else:
-                    payload[k] = str(v)
-
-            await self.client.xadd(stream, payload, maxlen=max_len, approximate=True)
+            # One versioned field per entry (see hlink_codec); HLINK_WIRE_FORMAT=legacy flattens per key
+            await self.client.xadd(stream, encode_entry(data), maxlen=max_len, approximate=True)
             logger.info(f"STREAM_ADD: {stream} | Type: {data.get('type')}")
         except Exception as e:
             logger.error(f"Failed to add to stream {stream}: {e}")
 
+    async def _process(self, stream: str, group: str, msgs, handler, with_ids: bool) -> None:
+        for m_id, m_data in msgs:
+            try:
+                decoded_data = decode_entry(m_data)
+                if with_ids:
+                    decoded_data["stream_id"] = m_id
+
+                # FIX: ALWAYS pass the DICT to the handler
+                # (Do not wrap in HLinkMessage here, let the handler decide)
+                await handler(decoded_data)
+
+                # ACK
+                await self.client.xack(stream, group, m_id)
+
+            except Exception as e:
+                logger.error(f"STREAM_PROC_FAIL on {stream}:{m_id}: {e}")
+
+    async def _drain_pending(
+        self, stream: str, group: str, consumer: str, handler, reclaim_idle_ms: int, with_ids: bool
+    ) -> int:
+        """
+        Re-delivers what a previous run left unacknowledged: entries claimed from
+        consumers of this group idle for `reclaim_idle_ms`, then this consumer's own
+        pending list. Returns how many entries were processed.
+        """
+        processed = 0
+        cursor = "0-0"
+        while True:
+            try:
+                result = await self.client.xautoclaim(
+                    stream, group, consumer, min_idle_time=reclaim_idle_ms, start_id=cursor, count=100
+                )
+            except redis.ResponseError as e:
+                logger.warning(f"STREAM_RECLAIM: xautoclaim unavailable on {stream}/{group}: {e}")
+                break
+            cursor, claimed = result[0], [m for m in result[1] if m and m[1] is not None]
+            processed += len(claimed)
+            if claimed:
+                await self._process(stream, group, claimed, handler, with_ids)
+            if not cursor or cursor == "0-0":
+                break
+
+        last_id = "0"
+        while True:
+            messages = await self.client.xreadgroup(group, consumer, {stream: last_id}, count=100)
+            msgs = [m for _, entries in (messages or []) for m in entries if m[1]]
+            if not msgs:
+                break
+            processed += len(msgs)
+            await self._process(stream, group, msgs, handler, with_ids)
+            last_id = msgs[-1][0]
+        if processed:
+            logger.info(f"STREAM_RECLAIM: Re-delivered {processed} pending entries on {stream}/{group}")
+        return processed
+
     async def listen_stream(
         self,
         stream: str,
@@ -62,8 +111,17 @@ class RedisClient:
         consumer: str,
         handler: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]],
         start_id: str = "$",
+        reclaim_idle_ms: Optional[int] = None,
+        with_ids: bool = False,
     ):
-        """Consume messages from a Stream using a Consumer Group."""
+        """
+        Consume messages from a Stream using a Consumer Group.
+
+        With a stable group name, a restart resumes from the group's last delivered
+        entry instead of `start_id`; `reclaim_idle_ms` additionally re-delivers entries
+        left pending by a crashed run before reading new ones. `with_ids` adds the
+        entry id to each event as `stream_id`.
+        """
         if not self.client:
             if not await self.connect():
                 return
@@ -76,39 +134,19 @@ class RedisClient:
                 logger.error(f"Failed to create group {group}: {e}")
                 return
 
+        if reclaim_idle_ms is not None:
+            try:
+                await self._drain_pending(stream, group, consumer, handler, reclaim_idle_ms, with_ids)
+            except Exception as e:
+                logger.error(f"STREAM_RECLAIM: Pending drain failed on {stream}/{group}: {e}")
+
         while not self._stop_event.is_set():
             try:
                 messages = await self.client.xreadgroup(group, consumer, {stream: ">"}, count=1, block=1000)
 
                 if messages:
                     for s_name, msgs in messages:
-                        for m_id, m_data in msgs:
-                            try:
-                                # De-serialize values
-                                decoded_data = {}
-                                for k, v in m_data.items():
-                                    if isinstance(v, str) and (v.startswith("{") or v.startswith("[")):
-                                        try:
-                                            decoded_data[k] = json.loads(v)
-                                        except:
-                                            decoded_data[k] = v
-                                    else:
-                                        decoded_data[k] = v
-
-                                # Compatibility Check: If it's a wrapped message {"type": ..., "data": "..."}
-                                if "data" in decoded_data and "type" in decoded_data and len(decoded_data) == 2:
-                                    if isinstance(decoded_data["data"], dict):
-                                        decoded_data = decoded_data["data"]
-
-                                # FIX: ALWAYS pass the DICT to the handler
-                                # (Do not wrap in HLinkMessage here, let the handler decide)
-                                await handler(decoded_data)
-
-                                # ACK
-                                await self.client.xack(stream, group, m_id)
-
-                            except Exception as e:
-                                logger.error(f"STREAM_PROC_FAIL on {stream}:{m_id}: {e}")
+                        await self._process(stream, group, msgs, handler, with_ids)
 
             except redis.ConnectionError:
                 logger.error("Redis connection lost in stream listener. Re-connecting...")
@@ -118,6 +156,48 @@ class RedisClient:
                     logger.error(f"Stream loop error: {e}")
                     await asyncio.sleep(2)
 
+    async def cleanup_groups(self, stream: str, prefix: str, keep: str, idle_ms: int) -> list:
+        """
+        Destroys consumer groups named `prefix*` (other than `keep`) whose consumers
+        have all been idle for `idle_ms`, or that never had one. Their pending-entry
+        lists go with them. Returns the destroyed group names.
+        """
+        if not self.client:
+            if not await self.connect():
+                return []
+        destroyed = []
+        try:
+            groups = await self.client.xinfo_groups(stream)
+        except redis.ResponseError:
+            return []  # stream does not exist yet
+        for info in groups:
+            name = info.get("name")
+            if not name or name == keep or not name.startswith(prefix):
+                continue
+            try:
+                consumers = await self.client.xinfo_consumers(stream, name)
+                if consumers and min(c.get("idle", 0) for c in consumers) < idle_ms:
+                    continue
+                await self.client.xgroup_destroy(stream, name)
+                destroyed.append(name)
+            except Exception as e:
+                logger.warning(f"STREAM_CLEANUP: Could not inspect/destroy {stream}/{name}: {e}")
+        if destroyed:
+            logger.info(f"STREAM_CLEANUP: Destroyed {len(destroyed)} abandoned groups on {stream}: {destroyed}")
+        return destroyed
+
+    async def read_latest(self, stream: str, count: int) -> list:
+        """The newest `count` events, oldest first, as (stream_id, event) pairs."""
+        if not self.client:
+            if not await self.connect():
+                return []
+        try:
+            entries = await self.client.xrevrange(stream, max="+", min="-", count=count)
+        except Exception as e:
+            logger.error(f"Failed to read latest from {stream}: {e}")
+            return []
+        return [(m_id, decode_entry(m_data)) for m_id, m_data in reversed(entries)]
+
     async def disconnect(self):
         self._stop_event.set()
         if self.client:
@@ -133,7 +213,7 @@ class RedisClient:
             if hasattr(message, "model_dump_json"):
                 data = message.model_dump_json()
             elif isinstance(message, dict):
-                data = json.dumps(message)
+                data = dumps_text(message)
             else:
                 data = str(message)
 
@@ -153,7 +233,7 @@ class RedisClient:
                         msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
                         if msg and msg["type"] == "message":
                             try:
-                                data = json.loads(msg["data"])
+                                data = loads(msg["data"])
                                 # FIX: ALWAYS pass the DICT to the handler
                                 await handler(data)
                             except Exception as e:
@@ -2,8 +2,12 @@ import asyncio
 import json
 import logging
 import os
+import socket
 import sys
-from uuid import UUID, uuid4
+import time
+from uuid import UUID
+
+_imports_started = time.perf_counter()
 
 # Pathing
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,19 +17,27 @@ core_src = os.path.abspath(os.path.join(current_dir, "../../h-core/src"))
 if core_src not in sys.path:
     sys.path.insert(0, core_src)
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
+from infrastructure.http import http_clients
 from infrastructure.redis import RedisClient
 from infrastructure.surrealdb import SurrealDbClient
 from models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
 
 # Services
+from services.fanout import FanoutHub, Subscription
+from services.metrics import get_metrics
+from services.read_model import CachedView, ReadModelCache
+from services.tracing import build_waterfall, format_waterfall, get_tracer, load_spans, start_trace, trace_context
 from services.voice import voice_profile_service
 from services.voice_modulation import voice_modulation_service
 from services.prosody import prosody_service
 
+# Audio handlers (numpy, whisper, wakeword) are only imported by the routes that use them.
+import_profile = {"bridge.startup": round((time.perf_counter() - _imports_started) * 1000, 1)}
+
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s:%(name)s:%(message)s")
 logger = logging.getLogger("BRIDGE")
 
@@ -38,12 +50,20 @@ agents_path = os.getenv("AGENTS_PATH", "/app/agents")
 
 # Global
 discovered_agents = {}
-active_connections = set()
+hub = FanoutHub()
+read_model = ReadModelCache()
 last_heartbeat = None
 redis_client = RedisClient(host=os.getenv("REDIS_HOST", "redis"))
+metrics = get_metrics()
+tracer = get_tracer("h-bridge")
 surreal_client = SurrealDbClient(
     url=os.getenv("SURREALDB_URL", "ws://surrealdb:8000/rpc"), user="root", password="root"
 )
+# Must stay the same across restarts, so the consumer group resumes where it stopped instead of piling up
+# new ones: deployments set BRIDGE_INSTANCE_ID, the host name is only a fallback (in a container it is the
+# container id, which changes whenever the container is recreated)
+bridge_instance = os.getenv("BRIDGE_INSTANCE_ID") or socket.gethostname()
+bridge_group = f"bridge-{bridge_instance}"
 
 
 async def system_stream_worker():
@@ -53,14 +73,13 @@ async def system_stream_worker():
         global last_heartbeat
         try:
             msg_type = data.get("type")
-            # 1. Broadcast to ALL WebSockets
-            msg_json = json.dumps(data)
-            for ws in list(active_connections):
-                try:
-                    await ws.send_text(msg_json)
-                except:
-                    if ws in active_connections:
-                        active_connections.remove(ws)
+            trace_id, sent_at = trace_context(data)
+            # 1. Broadcast to ALL WebSockets (queued per client; writers send in the background)
+            with metrics.timer("bridge_fanout_seconds", {"stream": "system_stream"}), tracer.span(
+                trace_id, "bridge.fanout", enqueued_at=sent_at, type=msg_type, clients=len(hub)
+            ):
+                hub.broadcast(data, msg_type)
+            read_model.apply_event(data)
 
             # 2. Extract Heartbeat Bundle
             if msg_type == "system.heartbeat":
@@ -91,7 +110,44 @@ async def system_stream_worker():
         except Exception as e:
             logger.error(f"BRIDGE_WORKER_ERR: {e}")
 
-    await redis_client.listen_stream("system_stream", f"bridge-{uuid4().hex[:4]}", "bridge-1", handler, start_id="$")
+    await redis_client.listen_stream(
+        "system_stream",
+        bridge_group,
+        bridge_instance,
+        handler,
+        start_id="$",
+        reclaim_idle_ms=int(os.getenv("BRIDGE_RECLAIM_IDLE_MS", "30000")),
+        with_ids=True,
+    )
+
+
+async def prepare_system_stream():
+    """Drops consumer groups left by dead bridge instances and seeds the replay buffer."""
+    try:
+        await redis_client.cleanup_groups(
+            "system_stream",
+            prefix="bridge-",
+            keep=bridge_group,
+            idle_ms=int(float(os.getenv("BRIDGE_GROUP_ABANDON_S", "3600")) * 1000),
+        )
+        entries = await redis_client.read_latest("system_stream", hub.replay_size)
+        hub.warm(entries, complete=len(entries) < hub.replay_size)
+        logger.info(f"📡 BRIDGE: Group {bridge_group}, replay buffer warmed with {len(entries)} entries.")
+    except Exception as e:
+        logger.error(f"BRIDGE_STREAM_PREP_ERR: {e}")
+
+
+async def prewarm_tts_cache():
+    """Renders the personas' common phrases into the TTS cache so the first "C'est fait." is instant."""
+    if os.getenv("TTS_PREWARM", "true").lower() == "false":
+        return
+    try:
+        # Imported here: the TTS handler pulls in the synthesis engines, which the rest of the bridge never needs
+        from handlers.tts import prewarm_tts
+
+        await prewarm_tts(redis_client, agents_path)
+    except Exception as e:
+        logger.warning(f"TTS_CACHE: Pre-warm skipped: {e}")
 
 
 @app.on_event("startup")
@@ -101,34 +157,56 @@ async def startup():
     await voice_profile_service.initialize()
     await voice_modulation_service.initialize()
     await prosody_service.initialize()
+    await prepare_system_stream()
     asyncio.create_task(system_stream_worker())
+    asyncio.create_task(prewarm_tts_cache())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await http_clients.aclose()
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    active_connections.add(websocket)
+    # Optional filters at connect time: /ws?types=narrative.text,system.status_update&agents=lisa&rooms=kitchen&audio=0
+    hub.register(websocket, Subscription.from_dict(dict(websocket.query_params)))
     if last_heartbeat:
-        await websocket.send_text(json.dumps(last_heartbeat))
+        hub.send_to(websocket, last_heartbeat)
+    # Reconnecting clients pass the last stream id they saw and get only what they missed
+    last_id = websocket.query_params.get("last_id")
+    if last_id:
+        result = hub.replay(websocket, last_id)
+        hub.send_to(websocket, {"type": "client.replayed", "payload": {"content": result}})
     try:
         while True:
             data = await websocket.receive_text()
             logger.info(f"📥 BRIDGE: Received from UI: {data[:100]}...")
             msg = json.loads(data)
+            if msg.get("type") == "client.subscribe":
+                # Local to this connection: changes what the bridge forwards, never reaches Redis
+                subscription = Subscription.from_dict(msg.get("payload", {}).get("content"))
+                hub.subscribe(websocket, subscription)
+                hub.send_to(websocket, {"type": "client.subscribed", "payload": {"content": subscription.to_dict()}})
+                continue
             stream = (
                 "system_stream"
                 if "admin" in msg.get("type", "") or "config" in msg.get("type", "")
                 else "conversation_stream"
             )
             logger.info(f"🚀 BRIDGE: Publishing to {stream}")
-            await redis_client.publish_event(stream, msg)
+            metrics.increment("bridge_ws_messages_total", labels={"stream": stream})
+            # Every UI message starts a trace; its id rides along in metadata to h-core and back.
+            trace_id = start_trace(msg)
+            with tracer.span(trace_id, "bridge.ws_ingress", type=msg.get("type"), stream=stream):
+                await redis_client.publish_event(stream, msg)
     except WebSocketDisconnect:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+        pass
     except Exception as e:
         logger.error(f"WS_ERR: {e}")
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+    finally:
+        hub.unregister(websocket)
 
 
 @app.get("/api/agents")
@@ -136,8 +214,15 @@ async def get_agents():
     return list(discovered_agents.values())
 
 
-@app.get("/api/config")
-async def get_config():
+def _cached_response(view: CachedView, request: Request, response: Response, body):
+    headers = {"ETag": view.etag, "Cache-Control": "no-cache"}
+    if view.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return body
+
+
+async def _load_config() -> dict:
     # 1. Try SurrealDB
     db_config = await surreal_client.get_config("system")
     if db_config:
@@ -156,17 +241,53 @@ async def get_config():
     return {"llm_model": model, "llm_provider": provider, "source": "env"}
 
 
+async def _load_history(limit: int) -> list:
+    # Served by the fact_created_at index; embeddings are never shown, so they are not shipped
+    res = await surreal_client._call(
+        "query", f"SELECT * OMIT embedding FROM fact ORDER BY created_at DESC LIMIT {int(limit)};"
+    )
+    return res[0].get("result", []) if res else []
+
+
+@app.get("/api/config")
+async def get_config(request: Request, response: Response):
+    config = await read_model.get_config(_load_config)
+    return _cached_response(read_model.config, request, response, config)
+
+
 @app.get("/api/history")
-async def get_history():
+async def get_history(request: Request, response: Response):
     if not surreal_client.client:
         return {"messages": [], "status": "connecting"}
     try:
-        res = await surreal_client._call("query", "SELECT * FROM fact ORDER BY created_at DESC LIMIT 50;")
-        messages = res[0].get("result", []) if res else []
-        return {"messages": messages, "status": "ok"}
+        messages = await read_model.get_history(_load_history)
     except Exception as e:
         logger.error(f"History fail: {e}")
         return {"messages": [], "status": "error"}
+    return _cached_response(read_model.history, request, response, {"messages": messages, "status": "ok"})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics_text():
+    return metrics.to_prometheus_text() + "\n"
+
+
+@app.get("/api/traces")
+async def get_traces(limit: int = 20):
+    return {"traces": tracer.recent_traces(limit)}
+
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str, format: str = "json"):
+    # Merge spans exported by h-core (and other services) when a shared export dir is configured
+    export_dir = os.getenv("TRACE_EXPORT_PATH")
+    spans = tracer.get_trace(trace_id)
+    if export_dir and os.path.isdir(export_dir):
+        spans = [s for s in load_spans(export_dir, trace_id) if s.service != tracer.service] + spans
+    rows = build_waterfall(spans)
+    if format == "text":
+        return PlainTextResponse(format_waterfall(rows))
+    return {"trace_id": trace_id, "spans": rows}
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -181,7 +302,13 @@ app.mount("/agents", StaticFiles(directory=agents_path), name="agents")
 
 @app.get("/api/status")
 async def get_status():
-    return {"status": "ok", "heartbeat": last_heartbeat, "agents": len(discovered_agents)}
+    return {
+        "status": "ok",
+        "heartbeat": last_heartbeat,
+        "agents": len(discovered_agents),
+        "connections": hub.stats(),
+        "import_profile": import_profile,
+    }
 
 
 if __name__ == "__main__":
@@ -14,6 +14,8 @@ class MessageType(str, Enum):
     SYSTEM_LOG = "system.log"
     SYSTEM_STATUS_UPDATE = "system.status_update"
     SYSTEM_CONFIG_UPDATE = "system.config_update"
+    MEMORY_FACTS_ADDED = "memory.facts_added"
+    MEMORY_FACTS_REMOVED = "memory.facts_removed"
     EXPERT_COMMAND = "expert.command"
     EXPERT_RESPONSE = "expert.response"
     AGENT_INTERNAL_NOTE = "agent.internal_note"
@@ -40,8 +42,10 @@ class MessageType(str, Enum):
     TTS_START = "tts_start"
     TTS_END = "tts_end"
     TTS_ERROR = "tts_error"
+    TTS_CANCEL = "tts_cancel"
 
 class Priority(str, Enum):
+    LOW = "low"
     NORMAL = "normal"
     HIGH = "high"
     SYSTEM = "system"
@@ -78,6 +82,8 @@ class Metadata(BaseModel):
     priority: Priority = Priority.NORMAL
     correlation_id: UUID | None = None
     ttl: int = Field(default=5, description="Prevent infinite loops")
+    trace_id: str | None = None
+    sent_at: float | None = Field(default=None, description="Epoch seconds when last enqueued, for queue-wait spans")
 
 class HLinkMessage(BaseModel):
     id: UUID = Field(default_factory=uuid4)
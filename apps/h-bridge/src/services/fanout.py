@@ -0,0 +1,453 @@
+"""
+WebSocket fan-out hub for the bridge.
+
+Each connected client gets a bounded outbound queue drained by its own writer
+task, so `broadcast` only serializes once and appends to queues: a slow or
+half-dead client can no longer hold up the others or the Redis consumer.
+
+Clients may also narrow what they receive (event types, agents, rooms, audio
+on/off) with a `Subscription`; the hub keeps a topic-to-subscriber index so
+each event is only queued for the clients that asked for it.
+
+Events carrying a Redis `stream_id` are kept in a bounded replay buffer, so a
+client reconnecting with the last id it saw gets what it missed instead of
+reloading everything.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from itertools import count
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from models.hlink_codec import dumps_text
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Only the latest pending one matters: a newer one replaces it in the queue
+COALESCE_TYPES = {"system.heartbeat", "system.status_update", "wake_word_status"}
+# Shed first when a client falls behind
+DROPPABLE_TYPES = {"system.log", "audio.chunk", "tts_audio_chunk", "transcription_update"}
+
+# Heavy payloads a client can opt out of with audio=false
+AUDIO_TYPES = {"audio.chunk", "tts_audio_chunk", "tts_start", "tts_end"}
+# Never filtered: clients rely on these to render their connection state
+ALWAYS_TYPES = {"system.heartbeat", "client.subscribed"}
+
+_client_ids = count(1)
+
+
+def _as_set(values: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = values.split(",")
+    cleaned = frozenset(v.strip() for v in values if v and v.strip())
+    return cleaned or None
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """What a client wants to receive. None on a dimension means everything."""
+
+    types: Optional[FrozenSet[str]] = None
+    agents: Optional[FrozenSet[str]] = None
+    rooms: Optional[FrozenSet[str]] = None
+    audio: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "Subscription":
+        """From query params or a `client.subscribe` payload: lists or comma-separated strings."""
+        data = data or {}
+        audio = data.get("audio", True)
+        if isinstance(audio, str):
+            audio = audio.lower() not in ("0", "false", "no", "off")
+        return cls(
+            types=_as_set(data.get("types")),
+            agents=_as_set(data.get("agents")),
+            rooms=_as_set(data.get("rooms")),
+            audio=bool(audio),
+        )
+
+    def matches(self, msg_type: Optional[str], agent: Optional[str], room: Optional[str]) -> bool:
+        """Same rule as the hub's index, for a single client."""
+        if msg_type not in ALWAYS_TYPES and msg_type is not None:
+            if self.types is not None and msg_type not in self.types:
+                return False
+            if not self.audio and msg_type in AUDIO_TYPES:
+                return False
+        if agent is not None and self.agents is not None and agent not in self.agents:
+            return False
+        return room is None or self.rooms is None or room in self.rooms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "types": sorted(self.types) if self.types is not None else None,
+            "agents": sorted(self.agents) if self.agents is not None else None,
+            "rooms": sorted(self.rooms) if self.rooms is not None else None,
+            "audio": self.audio,
+        }
+
+
+def parse_stream_id(stream_id: Any) -> Optional[Tuple[int, int]]:
+    """'1700000000000-3' -> (1700000000000, 3); None when it is not a stream id."""
+    if not isinstance(stream_id, str):
+        return None
+    ms, _, seq = stream_id.partition("-")
+    try:
+        return int(ms), int(seq or 0)
+    except ValueError:
+        return None
+
+
+def event_topics(data: Any, msg_type: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(type, agent, room) of an event; agent/room are None when the event is not scoped to one."""
+    if not isinstance(data, dict):
+        return msg_type, None, None
+    agent = room = None
+    sender = data.get("sender")
+    if isinstance(sender, dict) and sender.get("role") == "agent":
+        agent = sender.get("agent_id")
+    payload = data.get("payload")
+    content = payload.get("content") if isinstance(payload, dict) else None
+    if agent is None and isinstance(content, dict):
+        agent = content.get("agent_id")
+    recipient = data.get("recipient")
+    if isinstance(recipient, dict):
+        room = recipient.get("room")
+    if room is None and isinstance(payload, dict):
+        room = payload.get("room_id")
+    if room is None and isinstance(content, dict):
+        room = content.get("room_id") or content.get("room")
+    return msg_type, agent if isinstance(agent, str) else None, room if isinstance(room, str) else None
+
+
+class ClientChannel:
+    """Outbound side of one WebSocket: bounded queue plus writer task."""
+
+    def __init__(self, websocket, hub: "FanoutHub", max_queue: int, send_timeout: float):
+        self.websocket = websocket
+        self.hub = hub
+        self.client_id = f"ws-{next(_client_ids)}"
+        self.max_queue = max_queue
+        self.high_water = max(1, int(max_queue * 0.75))
+        self.send_timeout = send_timeout
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self.subscription = Subscription()
+        # Set by a replay: live events up to this id were already sent
+        self.seen_upto: Optional[Tuple[int, int]] = None
+        # (event type, serialized text); coalescible types are looked up by type
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._coalesced: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def offer(self, msg_type: Optional[str], text: str) -> bool:
+        """Non-blocking enqueue. Returns False when the message was dropped."""
+        if self.closed:
+            return False
+
+        if msg_type in COALESCE_TYPES and msg_type in self._coalesced:
+            # Replace the pending copy in place: same slot, newest content
+            slot = self._coalesced[msg_type]
+            self._queue[slot] = (msg_type, text)
+            self.hub.metrics.increment("bridge_ws_coalesced_total")
+            return True
+
+        if self.backlog >= self.high_water and msg_type in DROPPABLE_TYPES:
+            self.dropped += 1
+            self.hub.metrics.increment("bridge_ws_dropped_total", labels={"type": msg_type})
+            return False
+
+        if self.backlog >= self.max_queue:
+            # Even after shedding, the client cannot keep up with must-deliver traffic
+            self.hub.evict(self, "backlog")
+            return False
+
+        if msg_type in COALESCE_TYPES:
+            self._coalesced[msg_type] = len(self._queue)
+        self._queue.append((msg_type, text))
+        self._wakeup.set()
+        return True
+
+    def _pop(self) -> Tuple[Optional[str], str]:
+        item = self._queue.popleft()
+        # Coalesce slots are queue positions; shift them with the head
+        for key in list(self._coalesced):
+            slot = self._coalesced[key] - 1
+            if slot < 0:
+                del self._coalesced[key]
+            else:
+                self._coalesced[key] = slot
+        return item
+
+    async def _writer(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, text = self._pop()
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+                    self.sent += 1
+                except asyncio.TimeoutError:
+                    self.hub.evict(self, "timeout")
+                except Exception:
+                    self.hub.evict(self, "error")
+        except asyncio.CancelledError:
+            pass
+
+    def close(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        self._coalesced.clear()
+        self._wakeup.set()
+        if self._task and not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.client_id,
+            "backlog": self.backlog,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "subscription": self.subscription.to_dict(),
+            "connected_s": round(time.time() - self.connected_at, 1),
+        }
+
+
+class FanoutHub:
+    """
+    Registry of client channels. `broadcast` is synchronous and O(clients) list
+    appends; sending happens in each client's writer task. A client whose queue
+    fills with must-deliver messages, or whose send blocks longer than
+    BRIDGE_WS_SEND_TIMEOUT_S, is evicted and its socket closed.
+
+    Subscriptions are indexed per dimension (type, agent, room, audio opt-out),
+    and the subscriber set for each (type, agent, room) topic is computed once
+    and memoized until a client registers, leaves or changes its subscription,
+    so routing an event is a dict lookup rather than a scan of every client.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        replay_size: Optional[int] = None,
+    ):
+        self.max_queue = max_queue or int(os.getenv("BRIDGE_WS_QUEUE_SIZE", "256"))
+        self.send_timeout = send_timeout or float(os.getenv("BRIDGE_WS_SEND_TIMEOUT_S", "5"))
+        self.replay_size = replay_size if replay_size is not None else int(os.getenv("BRIDGE_REPLAY_BUFFER", "1000"))
+        # Replay buffer: (parsed id, stream id, topics, text) of must-deliver events, oldest first
+        self._history: Deque[Tuple[Tuple[int, int], str, Tuple, str]] = deque()
+        self._last_id: Optional[Tuple[int, int]] = None
+        # Every replayable event after this id is still in the buffer; None until known
+        self._floor: Optional[Tuple[int, int]] = None
+        self.channels: Dict[Any, ClientChannel] = {}
+        self.metrics = get_metrics()
+        self._by_type: Dict[str, Set[ClientChannel]] = {}
+        self._by_agent: Dict[str, Set[ClientChannel]] = {}
+        self._by_room: Dict[str, Set[ClientChannel]] = {}
+        self._any_type: Set[ClientChannel] = set()
+        self._any_agent: Set[ClientChannel] = set()
+        self._any_room: Set[ClientChannel] = set()
+        self._no_audio: Set[ClientChannel] = set()
+        self._routes: Dict[Tuple[Optional[str], Optional[str], Optional[str]], Tuple[ClientChannel, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def register(self, websocket, subscription: Optional[Subscription] = None) -> ClientChannel:
+        channel = ClientChannel(websocket, self, self.max_queue, self.send_timeout)
+        self.channels[websocket] = channel
+        self._index(channel, subscription or Subscription())
+        channel.start()
+        return channel
+
+    def unregister(self, websocket) -> None:
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            self._unindex(channel)
+            channel.close()
+
+    def subscribe(self, websocket, subscription: Subscription) -> bool:
+        """Replaces a connected client's subscription."""
+        channel = self.channels.get(websocket)
+        if channel is None:
+            return False
+        self._unindex(channel)
+        self._index(channel, subscription)
+        return True
+
+    @staticmethod
+    def _dimension(values, index: Dict[str, Set[ClientChannel]], wildcard: Set[ClientChannel]):
+        return (wildcard,) if values is None else tuple(index.setdefault(v, set()) for v in values)
+
+    def _index(self, channel: ClientChannel, subscription: Subscription) -> None:
+        channel.subscription = subscription
+        for bucket in self._buckets(channel):
+            bucket.add(channel)
+        self._routes.clear()
+
+    def _unindex(self, channel: ClientChannel) -> None:
+        for bucket in self._buckets(channel):
+            bucket.discard(channel)
+        self._routes.clear()
+
+    def _buckets(self, channel: ClientChannel):
+        sub = channel.subscription
+        yield from self._dimension(sub.types, self._by_type, self._any_type)
+        yield from self._dimension(sub.agents, self._by_agent, self._any_agent)
+        yield from self._dimension(sub.rooms, self._by_room, self._any_room)
+        if not sub.audio:
+            yield self._no_audio
+
+    def subscribers(self, msg_type: Optional[str], agent: Optional[str] = None, room: Optional[str] = None):
+        """Channels interested in one topic; memoized until the subscriptions change."""
+        key = (msg_type, agent, room)
+        route = self._routes.get(key)
+        if route is None:
+            if msg_type in ALWAYS_TYPES or msg_type is None:
+                targets = set(self.channels.values())
+            else:
+                targets = self._any_type | self._by_type.get(msg_type, set())
+                if msg_type in AUDIO_TYPES:
+                    targets -= self._no_audio
+            # Events not scoped to an agent or room pass that dimension for everyone
+            if agent is not None:
+                targets &= self._any_agent | self._by_agent.get(agent, set())
+            if room is not None:
+                targets &= self._any_room | self._by_room.get(room, set())
+            route = tuple(targets)
+            self._routes[key] = route
+        return route
+
+    def evict(self, channel: ClientChannel, reason: str) -> None:
+        if channel.closed:
+            return
+        logger.warning(f"BRIDGE_FANOUT: Evicting slow client {channel.client_id} ({reason}, backlog={channel.backlog})")
+        self.metrics.increment("bridge_ws_evicted_total", labels={"reason": reason})
+        self.channels.pop(channel.websocket, None)
+        self._unindex(channel)
+        channel.close()
+        asyncio.ensure_future(self._close_socket(channel.websocket))
+
+    @staticmethod
+    async def _close_socket(websocket) -> None:
+        try:
+            await websocket.close(code=1013)  # try again later
+        except Exception:
+            pass
+
+    def _record(self, sid: Tuple[int, int], stream_id: str, topics: Tuple, text: str) -> None:
+        if self._last_id is not None and sid <= self._last_id:
+            return  # re-delivered after a restart: already buffered
+        self._last_id = sid
+        if topics[0] in COALESCE_TYPES or topics[0] in DROPPABLE_TYPES or self.replay_size <= 0:
+            return  # transient: not worth replaying
+        self._history.append((sid, stream_id, topics, text))
+        while len(self._history) > self.replay_size:
+            self._floor = self._history.popleft()[0]
+
+    def warm(self, entries: Iterable[Tuple[str, Dict[str, Any]]], complete: bool = False) -> None:
+        """
+        Seeds the replay buffer from the stream tail ((stream_id, event) pairs, oldest
+        first), e.g. right after a restart. `complete` means the entries are the whole
+        stream, so any last-seen id can be served.
+        """
+        entries = list(entries)
+        for stream_id, event in entries:
+            sid = parse_stream_id(stream_id)
+            if sid is None:
+                continue
+            event = dict(event, stream_id=stream_id)
+            msg_type = event.get("type")
+            self._record(sid, stream_id, event_topics(event, msg_type), dumps_text(event))
+        if complete:
+            self._floor = (0, 0)
+        elif entries and self._floor is None:
+            self._floor = parse_stream_id(entries[0][0])
+
+    def replay(self, websocket, last_id: str) -> Dict[str, Any]:
+        """
+        Queues the buffered events after `last_id` that match the client's subscription.
+        `complete` is False when events may have been missed (too old, or too many to
+        replay without overflowing the queue): the client should reload its state.
+        """
+        channel = self.channels.get(websocket)
+        after = parse_stream_id(last_id)
+        if channel is None or after is None:
+            return {"count": 0, "complete": False, "last_id": None}
+        complete = self._floor is not None and after >= self._floor
+        sub = channel.subscription
+        missed = [entry for entry in self._history if entry[0] > after and sub.matches(*entry[2])]
+        limit = max(1, self.max_queue // 2)
+        if len(missed) > limit:
+            missed = missed[-limit:]
+            complete = False
+        for _, _, topics, text in missed:
+            channel.offer(topics[0], text)
+        channel.seen_upto = missed[-1][0] if missed else after
+        self.metrics.increment("bridge_ws_replayed_total", value=len(missed))
+        return {"count": len(missed), "complete": complete, "last_id": missed[-1][1] if missed else last_id}
+
+    def broadcast(self, data: Any, msg_type: Optional[str] = None) -> int:
+        """Serializes once and queues for every subscribed client; returns how many accepted it."""
+        if msg_type is None and isinstance(data, dict):
+            msg_type = data.get("type")
+        topics = event_topics(data, msg_type)
+        stream_id = data.get("stream_id") if isinstance(data, dict) else None
+        sid = parse_stream_id(stream_id)
+        text = None
+        if sid is not None:
+            text = dumps_text(data)
+            self._record(sid, stream_id, topics, text)
+        targets = self.subscribers(*topics)
+        filtered = len(self.channels) - len(targets)
+        if filtered:
+            self.metrics.increment("bridge_ws_filtered_total", value=filtered)
+        if not targets:
+            return 0
+        if text is None:
+            text = data if isinstance(data, str) else dumps_text(data)
+        accepted = 0
+        for channel in targets:
+            if sid is not None and channel.seen_upto is not None:
+                if sid <= channel.seen_upto:
+                    continue  # already replayed to this client
+                channel.seen_upto = None
+            if channel.offer(msg_type, text):
+                accepted += 1
+        backlog = max((c.backlog for c in self.channels.values()), default=0)
+        self.metrics.observe("bridge_ws_max_backlog", backlog)
+        return accepted
+
+    def send_to(self, websocket, data: Any) -> bool:
+        channel = self.channels.get(websocket)
+        if channel is None:
+            return False
+        text = data if isinstance(data, str) else dumps_text(data)
+        return channel.offer(data.get("type") if isinstance(data, dict) else None, text)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.channels),
+            "replay_buffer": len(self._history),
+            "per_client": [c.stats() for c in self.channels.values()],
+        }
@@ -0,0 +1,140 @@
+"""
+Read-model cache for the bridge's polled endpoints.
+
+`/api/config` and `/api/history` are polled by every UI. Instead of querying
+SurrealDB per request, the bridge keeps a config snapshot and a window of the
+most recent facts in memory, loads each once, and keeps them current from
+`system_stream` events (config updates, facts added or removed). Each
+view's ETag is a hash of its content, so unchanged polls are a 304, and a tag
+stays valid across bridge restarts and replicas.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CachedView:
+    """One cached value with a version, a content ETag and a safety TTL."""
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.value: Any = None
+        self.version = 0
+        self.digest = ""
+        self.loaded_at = 0.0
+        self.stale = False
+        # Single flight: concurrent polls during a reload share one query
+        self.lock = asyncio.Lock()
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.name}-{self.digest}"'
+
+    @property
+    def fresh(self) -> bool:
+        if self.value is None or self.stale:
+            return False
+        return self.ttl <= 0 or time.monotonic() - self.loaded_at < self.ttl
+
+    def set(self, value: Any) -> None:
+        if value != self.value:
+            self.version += 1
+            raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+            self.digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+        self.value = value
+        self.loaded_at = time.monotonic()
+        self.stale = False
+
+    def invalidate(self) -> None:
+        self.stale = True
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match or self.value is None:
+            return False
+        return if_none_match.strip() == "*" or self.etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+class ReadModelCache:
+    """
+    Config snapshot plus recent-facts window. Loaders are only called on first
+    use, after an invalidation, or once the safety TTL (BRIDGE_READ_MODEL_TTL_S,
+    default 300s) expires in case an update event was missed.
+    """
+
+    def __init__(self, history_size: Optional[int] = None, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else float(os.getenv("BRIDGE_READ_MODEL_TTL_S", "300"))
+        self.history_size = history_size or int(os.getenv("BRIDGE_HISTORY_SIZE", "50"))
+        self.config = CachedView("config", ttl)
+        self.history = CachedView("history", ttl)
+        self._facts: Deque[Dict[str, Any]] = deque(maxlen=self.history_size)
+        self.metrics = get_metrics()
+
+    async def get_config(self, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        if not self.config.fresh:
+            async with self.config.lock:
+                if not self.config.fresh:
+                    self.metrics.increment("bridge_read_model_total", labels={"view": "config", "outcome": "load"})
+                    self.config.set(await loader())
+                    return self.config.value
+        self.metrics.increment("bridge_read_model_total", labels={"view": "config", "outcome": "hit"})
+        return self.config.value
+
+    async def get_history(self, loader: Callable[[int], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Most recent facts first, as `SELECT ... ORDER BY created_at DESC LIMIT n` would return them."""
+        if not self.history.fresh:
+            async with self.history.lock:
+                if not self.history.fresh:
+                    self.metrics.increment("bridge_read_model_total", labels={"view": "history", "outcome": "load"})
+                    facts = (await loader(self.history_size))[: self.history_size]
+                    self._facts = deque(reversed(facts), maxlen=self.history_size)
+                    self.history.set(list(facts))
+                    return self.history.value
+        self.metrics.increment("bridge_read_model_total", labels={"view": "history", "outcome": "hit"})
+        return self.history.value
+
+    def apply_event(self, data: Dict[str, Any]) -> None:
+        """Updates the views from a `system_stream` event; unrelated events are ignored."""
+        msg_type = data.get("type")
+        if msg_type not in ("system.config_update", "memory.facts_added", "memory.facts_removed"):
+            return
+        if msg_type == "memory.facts_removed":
+            # The event does not say which facts went, and the window has to be refilled from below anyway
+            self.history.invalidate()
+            return
+        payload = data.get("payload") or {}
+        content = payload.get("content") if isinstance(payload, dict) else None
+        if not isinstance(content, dict):
+            return
+
+        if msg_type == "system.config_update":
+            llm = content.get("llm_config")
+            if not isinstance(llm, dict) or self.config.value is None:
+                return
+            current = dict(self.config.value)
+            if "model" in llm:
+                current["llm_model"] = llm["model"]
+            if "provider" in llm:
+                current["llm_provider"] = llm["provider"]
+            current["source"] = "db"
+            self.config.set(current)
+            return
+
+        facts = content.get("facts")
+        if not isinstance(facts, list) or self.history.value is None:
+            # Nothing loaded yet: the first request reads the table anyway
+            return
+        for fact in facts:
+            if isinstance(fact, dict):
+                self._facts.append(fact)
+        self.history.set(list(reversed(self._facts)))
@@ -0,0 +1,158 @@
+"""
+Content-addressed cache for synthesized speech.
+
+The TTS worker threads look each sentence up by (text, voice, engine,
+prosody/modulation params) before calling the engine, so routine utterances
+("C'est fait.", "Bien reçu.") are replayed from memory or disk instead of being
+paid for again. Same layout as h-core's TtsCache: a small in-memory LRU in
+front of `<key>.audio` files under TTS_CACHE_DIR, least-recently-used files
+evicted once TTS_CACHE_MAX_BYTES is exceeded. Only short texts are cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# French typography puts a (narrow) space before ?!:; — it does not change the audio
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([?!:;])")
+
+# TTS params that change the rendered audio; request bookkeeping (trace ids, timestamps...) stays out of the key
+VOICE_PARAMS = ("pitch", "rate", "volume", "language", "emotion", "intonation", "emphasis")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("’", "'").replace("…", "...")
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", _WHITESPACE.sub(" ", text))
+    return text.strip()
+
+
+def cache_key(text: str, voice_id: Optional[str], engine: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of one synthesized utterance: text, voice, engine and prosody/modulation params."""
+    voice = {
+        k: round(v, 3) if isinstance(v, float) else v for k, v in (params or {}).items() if k in VOICE_PARAMS
+    }
+    material = json.dumps([normalize_text(text), voice_id, engine, voice], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    """Two-tier audio store, safe to call from several synthesis threads."""
+
+    SUFFIX = ".audio"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        hot_entries: Optional[int] = None,
+        max_text_chars: Optional[int] = None,
+    ):
+        self.directory = directory or os.getenv("TTS_CACHE_DIR", "/tmp/hairem/tts_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 2**20)))
+        self.hot_entries = hot_entries if hot_entries is not None else int(os.getenv("TTS_CACHE_HOT_ENTRIES", "128"))
+        self.max_text_chars = max_text_chars or int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "200"))
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        # path -> size, least recently used first; loaded from disk on first use
+        self._files: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._metrics = get_metrics()
+        self.disk_enabled = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"TTS_CACHE: Disk tier disabled ({self.directory}: {e})")
+            self.disk_enabled = False
+
+    def cacheable(self, text: str) -> bool:
+        return bool(text) and len(text) <= self.max_text_chars
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._files is None:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(self.SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_atime, entry.path, stat.st_size))
+            self._files = OrderedDict((path, size) for _, path, size in sorted(entries))
+            self._total_bytes = sum(self._files.values())
+        return self._files
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        self._hot[key] = audio
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._hot.get(key)
+            if audio is not None:
+                self._hot.move_to_end(key)
+                self._metrics.increment("tts_cache_total", labels={"outcome": "hit_memory"})
+                return audio
+            if self.disk_enabled:
+                path = self._path(key)
+                try:
+                    with open(path, "rb") as f:
+                        audio = f.read()
+                    os.utime(path)  # LRU order survives restarts
+                    files = self._load_index()
+                    self._total_bytes += len(audio) - files.pop(path, 0)
+                    files[path] = len(audio)
+                except FileNotFoundError:
+                    audio = None
+                except OSError as e:
+                    logger.warning(f"TTS_CACHE: Read failed for {key}: {e}")
+                    audio = None
+                if audio:
+                    self._remember(key, audio)
+                    self._metrics.increment("tts_cache_total", labels={"outcome": "hit_disk"})
+                    return audio
+            self._metrics.increment("tts_cache_total", labels={"outcome": "miss"})
+            return None
+
+    def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        with self._lock:
+            self._remember(key, audio)
+            if not self.disk_enabled or len(audio) > self.max_bytes:
+                return  # a clip bigger than the whole budget would only evict itself
+            path = self._path(key)
+            try:
+                files = self._load_index()
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp, path)
+                self._total_bytes += len(audio) - files.pop(path, 0)
+                files[path] = len(audio)
+                while self._total_bytes > self.max_bytes and files:
+                    oldest, size = files.popitem(last=False)
+                    self._total_bytes -= size
+                    try:
+                        os.remove(oldest)
+                    except FileNotFoundError:
+                        pass
+            except OSError as e:
+                logger.warning(f"TTS_CACHE: Write failed for {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hot_entries": len(self._hot), "disk_bytes": self._total_bytes if self._files is not None else None}
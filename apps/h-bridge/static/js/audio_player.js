@@ -10,6 +10,8 @@ class AudioPlayer {
         this.audioQueue = [];
         this.startTime = 0;
         this.bufferTime = 0.1; // 100ms buffer
+        this.nextIndex = 0;
+        this.decoded = new Map(); // chunk index -> AudioBuffer waiting for its predecessors
     }
     
     initialize() {
@@ -32,6 +34,8 @@ class AudioPlayer {
         }
         this.audioQueue = [];
         this.startTime = 0;
+        this.nextIndex = 0;
+        this.decoded.clear();
         this.updateStatus('ready');
     }
     
@@ -50,11 +54,14 @@ class AudioPlayer {
         if (type === 'tts_start') {
             console.log('TTS Started:', content.text);
             this.audioQueue = [];
+            this.nextIndex = 0;
+            this.decoded.clear();
             this.startTime = this.audioContext.currentTime + this.bufferTime;
             this.updateStatus('speaking');
         } 
         else if (type === 'tts_audio_chunk') {
-            this.queueAudioChunk(content.audio_chunk);
+            // An empty chunk only marks the end of the utterance
+            if (content.audio_chunk) this.queueAudioChunk(content.audio_chunk, content.index);
         }
         else if (type === 'tts_end') {
             console.log('TTS Ended');
@@ -65,7 +72,7 @@ class AudioPlayer {
         }
     }
     
-    async queueAudioChunk(base64Data) {
+    async queueAudioChunk(base64Data, index) {
         try {
             // Convert base64 to array buffer
             const binaryString = window.atob(base64Data);
@@ -77,7 +84,17 @@ class AudioPlayer {
             
             // Decode audio data
             const audioBuffer = await this.audioContext.decodeAudioData(bytes.buffer);
-            this.playBuffer(audioBuffer);
+            if (index === undefined) {
+                this.playBuffer(audioBuffer);
+                return;
+            }
+            // Decoding is async: schedule sentences strictly by index, not by decode completion
+            this.decoded.set(index, audioBuffer);
+            while (this.decoded.has(this.nextIndex)) {
+                this.playBuffer(this.decoded.get(this.nextIndex));
+                this.decoded.delete(this.nextIndex);
+                this.nextIndex++;
+            }
             
         } catch (e) {
             console.error('Error decoding audio chunk:', e);
@@ -5,13 +5,31 @@
 
 class NetworkClient {
     constructor(url = `ws://${window.location.hostname}:${window.location.port}/ws`) {
-        this.url = url;
+        this.url = url + NetworkClient.subscriptionQuery();
+        // Last system_stream id seen; sent on reconnect so the bridge replays only what was missed
+        this.lastStreamId = null;
         this.socket = null;
         this.agentMetadata = [];
         this.isFetchingMetadata = false;
         this.connect();
     }
 
+    // Wall panels and phones can narrow the stream from the page URL, e.g. /?rooms=kitchen&audio=0
+    static subscriptionQuery() {
+        const page = new URLSearchParams(window.location.search);
+        const params = new URLSearchParams();
+        for (const key of ['types', 'agents', 'rooms', 'audio']) {
+            if (page.has(key)) params.set(key, page.get(key));
+        }
+        const query = params.toString();
+        return query ? `?${query}` : '';
+    }
+
+    // Changes the server-side filter without reconnecting; null on a field means "everything"
+    subscribe({ types = null, agents = null, rooms = null, audio = true } = {}) {
+        this.send('client.subscribe', { types, agents, rooms, audio });
+    }
+
     async fetchGlobalConfig() {
         try {
             const response = await fetch('/api/config');
@@ -89,7 +107,12 @@ class NetworkClient {
             window.renderer.updateSystemStatus('ws', 'checking');
         }
         
-        this.socket = new WebSocket(this.url);
+        let url = this.url;
+        if (this.lastStreamId) {
+            url += `${url.includes('?') ? '&' : '?'}last_id=${encodeURIComponent(this.lastStreamId)}`;
+        }
+        this.socket = new WebSocket(url);
+        const resuming = Boolean(this.lastStreamId);
 
         this.socket.onopen = () => {
             console.log("Connected to H-Core bus.");
@@ -102,7 +125,8 @@ class NetworkClient {
             this.send('system.config_update', { log_level: savedLevel });
 
             this.fetchMetadata();
-            this.fetchHistory();
+            // On resume the bridge replays missed events; history is reloaded only if it says it could not
+            if (!resuming) this.fetchHistory();
             this.fetchGlobalConfig();
 
             setTimeout(() => {
@@ -137,6 +161,13 @@ class NetworkClient {
 
     handleMessage(message) {
         // console.log(`NETWORK: Received ${message.type}`);
+        if (message.stream_id) this.lastStreamId = message.stream_id;
+        if (message.type === "client.replayed") {
+            const result = message.payload.content || {};
+            console.log(`Replayed ${result.count} missed events (complete: ${result.complete}).`);
+            if (!result.complete) this.fetchHistory();
+            return;
+        }
         
         if ((message.type === "narrative.text" || message.type === "narrative.chunk" || message.type === "expert.response") && window.renderer && window.renderer.setProcessingState) {
             window.renderer.setProcessingState(false);
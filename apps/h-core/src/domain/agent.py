@@ -5,15 +5,18 @@ import logging
 import os
 import random
 import re
+import time
 from collections.abc import Callable
 from functools import wraps
 from typing import Any
 from uuid import uuid4
 
 from src.infrastructure.llm import LlmClient
+from src.infrastructure.rate_governor import PRIORITY_DISCUSSION, PRIORITY_INTERACTIVE
 from src.infrastructure.redis import RedisClient
 from src.models.agent import AgentConfig
 from src.models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
+from src.services.tracing import get_tracer, trace_context
 from src.utils.visual import extract_poses, pose_asset_exists, save_agent_image, count_pose_variations
 from src.utils.prompts import MultiLayerPromptBuilder, build_agent_prompt
 from src.features.admin.token_tracking.pricing import calculate_cost
@@ -80,6 +83,11 @@ class BaseAgent:
         self.command_handlers: dict[str, Callable] = {}
         self.tools: dict[str, dict[str, Any]] = {}
         self._tasks: list[asyncio.Task] = []
+        # Hot-reload bookkeeping: messages being handled and whether a replacement took over
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._retiring = False
         self.setup()
 
     def spawn_task(self, coro):
@@ -308,11 +316,11 @@ class BaseAgent:
         # FIX: Robustly handle mock/real redis subscribe
         # Real redis returns coroutine, Mock usually returns AsyncMock
         try:
-            res = self.redis.subscribe(channel, self.on_message)
+            res = self.redis.subscribe(channel, self._dispatch)
             if inspect.isawaitable(res):
                 self._own_task = asyncio.create_task(res)
 
-            res_bc = self.redis.subscribe(broadcast_channel, self.on_message)
+            res_bc = self.redis.subscribe(broadcast_channel, self._dispatch)
             if inspect.isawaitable(res_bc):
                 self._broadcast_task = asyncio.create_task(res_bc)
         except Exception as e:
@@ -369,6 +377,30 @@ class BaseAgent:
 
         logger.info(f"AGENT {self.config.name}: Stopped.")
 
+    async def _dispatch(self, message: Any):
+        """Subscription entry point. Tracks in-flight work so a hot reload can drain it."""
+        if self._retiring:
+            return
+        self._inflight += 1
+        self._idle.clear()
+        trace_id, sent_at = trace_context(message)
+        try:
+            with get_tracer().span(trace_id, "agent.handle", enqueued_at=sent_at, agent=self.config.name):
+                await self.on_message(message)
+        finally:
+            self._inflight -= 1
+            if self._inflight == 0:
+                self._idle.set()
+
+    async def retire(self, timeout: float = 30.0):
+        """Stops taking new messages, waits for in-flight ones to finish, then stops."""
+        self._retiring = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"AGENT {self.config.name}: {self._inflight} message(s) still in flight after {timeout}s.")
+        await self.stop()
+
     async def on_message(self, message: Any):
         """Core message processing loop."""
         if not self.is_active:
@@ -523,10 +555,16 @@ class BaseAgent:
         except Exception:
             pass
 
+        tracer = get_tracer()
+        trace_id = trigger_message.metadata.trace_id
         try:
-            messages = await self._assemble_payload(trigger_message)
+            with tracer.span(trace_id, "agent.assemble_payload", agent=self.config.name):
+                messages = await self._assemble_payload(trigger_message)
 
-            response = await self.llm.get_completion(messages, return_full_object=True)
+            with tracer.span(trace_id, "agent.llm", agent=self.config.name, model=self.llm.model):
+                # Replies to a person go first; replies to another agent yield to them
+                priority = PRIORITY_INTERACTIVE if trigger_message.sender.role == "user" else PRIORITY_DISCUSSION
+                response = await self.llm.get_completion(messages, return_full_object=True, priority=priority)
 
             usage = self.llm.get_usage_from_response(response)
             self.ctx.prompt_tokens = usage.get("input_tokens", 0)
@@ -557,6 +595,7 @@ class BaseAgent:
                     type=MessageType.NARRATIVE_TEXT,
                     content=response_text,
                     correlation_id=str(trigger_message.id),
+                    trace_id=trace_id,
                 )
         except Exception as e:
             logger.error(f"AGENT {self.config.name}: Response generation failed: {e}")
@@ -571,16 +610,29 @@ class BaseAgent:
                 type=MessageType.NARRATIVE_TEXT,
                 content=error_text,
                 correlation_id=str(trigger_message.id),
+                trace_id=trace_id,
             )
 
-    async def send_message(self, target: str, type: MessageType, content: Any, correlation_id: str | None = None):
+    async def send_message(
+        self,
+        target: str,
+        type: MessageType,
+        content: Any,
+        correlation_id: str | None = None,
+        trace_id: str | None = None,
+    ):
         """Sends a structured H-Link message via both Pub/Sub and Streams."""
+        metadata: dict[str, Any] = {"sent_at": time.time()}
+        if correlation_id:
+            metadata["correlation_id"] = correlation_id
+        if trace_id:
+            metadata["trace_id"] = trace_id
         msg = HLinkMessage(
             type=type,
             sender=Sender(agent_id=self.config.name, role=self.config.role),
             recipient=Recipient(target=target),
             payload=Payload(content=content),
-            metadata={"correlation_id": correlation_id} if correlation_id else {},  # type: ignore
+            metadata=metadata,  # type: ignore
         )
 
         # 1. Legacy Pub/Sub for internal agent-to-agent talk
@@ -1,11 +1,17 @@
+import asyncio
+import hashlib
 import json
 import logging
+from collections import deque
+from datetime import datetime, timezone
 from typing import Any
 
 from src.infrastructure.llm import LlmClient
+from src.infrastructure.rate_governor import PRIORITY_BACKGROUND
 from src.infrastructure.redis import RedisClient
 from src.infrastructure.surrealdb import SurrealDbClient
 from src.models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
+from src.services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +43,9 @@ class ConflictResolver:
 
     async def resolve(self, old_fact: str, new_fact: str) -> dict[str, Any]:
         prompt = self.RESOLUTION_PROMPT.format(old_fact=old_fact, new_fact=new_fact)
-        response = await self.llm.get_completion([{"role": "system", "content": prompt}], stream=False)
+        response = await self.llm.get_completion(
+            [{"role": "system", "content": prompt}], stream=False, priority=PRIORITY_BACKGROUND, cacheable=True
+        )
 
         # Clean response
         clean_json = response.strip()  # type: ignore
@@ -82,11 +90,24 @@ class MemoryConsolidator:
     ---
     """
 
+    BACKSTORY_PROMPT = """
+    You are the Backstory Generator for hAIrem.
+    Create 5 short, atomic past memories for an AI character named {agent_name} (Role: {agent_role}).
+    Persona description: {description}
+    These memories should be consistent with their personality and role.
+
+    Output format: JSON list of facts.
+    Example: ["I remember helping the user with their first python script", "I feel a strong bond with the other crew members"]
+    """
+
     def __init__(self, surreal_client: SurrealDbClient, llm_client: LlmClient, redis_client: RedisClient):
         self.surreal = surreal_client
         self.llm = llm_client
         self.redis = redis_client
         self.resolver = ConflictResolver(llm_client)
+        self._backstory_queue: deque[tuple[str, str, str | None]] = deque()
+        self._backstory_pending: set[str] = set()
+        self._backstory_worker: asyncio.Task | None = None
 
     async def consolidate(self, limit: int = 20) -> int:
         """Run a consolidation cycle."""
@@ -125,7 +146,9 @@ class MemoryConsolidator:
         # 3. Call LLM to extract facts
         prompt = self.CONSOLIDATION_PROMPT.format(conversation=conversation_text)
         try:
-            response = await self.llm.get_completion([{"role": "system", "content": prompt}], stream=False)
+            response = await self.llm.get_completion(
+                [{"role": "system", "content": prompt}], stream=False, priority=PRIORITY_BACKGROUND, cacheable=True
+            )
 
             # Clean response if it contains markdown code blocks
             clean_json = response.strip()  # type: ignore
@@ -170,6 +193,7 @@ class MemoryConsolidator:
                         await self.surreal.merge_or_override_fact(old_fact["id"], fact_data, resolution)
                         continue  # Fact handled by resolver
 
+                # Announced on system_stream by the client; read models such as the bridge's history follow it
                 await self.surreal.insert_graph_memory(fact_data)
 
             # 4b. Store Causal Links
@@ -233,29 +257,36 @@ class MemoryConsolidator:
         )
         await self.redis.publish("broadcast", msg)
 
-    async def generate_backstory(self, agent_name: str, agent_role: str):
+    async def generate_backstory(self, agent_name: str, agent_role: str, description: str | None = None) -> bool:
         """
         FR18.1: Backstory Generator (Epic 18).
         Generates consistent past memories for an agent at startup.
-        """
-        logger.info(f"MEMORY: Generating backstory for {agent_name}...")
 
-        prompt = f"""
-        You are the Backstory Generator for hAIrem.
-        Create 5 short, atomic past memories for an AI character named {agent_name} (Role: {agent_role}).
-        These memories should be consistent with their personality and role.
-        
-        Output format: JSON list of facts.
-        Example: ["I remember helping the user with their first python script", "I feel a strong bond with the other crew members"]
+        Idempotent: the agent subject stores a hash of the persona inputs, and an
+        unchanged persona costs one lookup. A changed persona gets a new backstory
+        that supersedes the old one. Returns True when new facts were written.
         """
+        persona_hash = self.backstory_hash(agent_name, agent_role, description)
+        if await self.surreal.get_backstory_hash(agent_name) == persona_hash:
+            logger.info(f"MEMORY: Backstory for {agent_name} is up to date, skipping.")
+            get_metrics().increment("backstory_total", labels={"outcome": "skipped"})
+            return False
+
+        logger.info(f"MEMORY: Generating backstory for {agent_name}...")
+        prompt = self.BACKSTORY_PROMPT.format(
+            agent_name=agent_name, agent_role=agent_role, description=description or "(none)"
+        )
 
         try:
-            response = await self.llm.get_completion([{"role": "system", "content": prompt}], stream=False)
+            response = await self.llm.get_completion(
+                [{"role": "system", "content": prompt}], stream=False, priority=PRIORITY_BACKGROUND, cacheable=True
+            )
             clean_json = response.strip()
             if "```json" in clean_json:
                 clean_json = clean_json.split("```json")[1].split("```")[0].strip()
 
             memories = json.loads(clean_json)
+            new_ids = []
             for m in memories:
                 fact_data = {
                     "fact": m,
@@ -263,10 +294,44 @@ class MemoryConsolidator:
                     "agent": agent_name,
                     "confidence": 1.0,
                     "permanent": True,  # Backstory doesn't decay
+                    "source": "backstory",
                 }
                 embedding = await self.llm.get_embedding(m)
                 fact_data["embedding"] = embedding
-                await self.surreal.insert_graph_memory(fact_data)
+                fid = await self.surreal.insert_graph_memory(fact_data)
+                if fid:
+                    new_ids.append(fid)
+            if not new_ids:
+                raise ValueError("no backstory fact was stored")
+            if not await self.surreal.supersede_backstory(agent_name, persona_hash, new_ids):
+                raise RuntimeError("the previous backstory could not be superseded")
+            get_metrics().increment("backstory_total", labels={"outcome": "generated"})
             logger.info(f"MEMORY: {agent_name} now has a past.")
+            return True
         except Exception as e:
+            get_metrics().increment("backstory_total", labels={"outcome": "failed"})
             logger.error(f"Backstory generation failed for {agent_name}: {e}")
+            return False
+
+    @classmethod
+    def backstory_hash(cls, agent_name: str, agent_role: str, description: str | None = None) -> str:
+        """Fingerprint of everything the backstory is generated from, prompt included."""
+        material = json.dumps([cls.BACKSTORY_PROMPT, agent_name, agent_role, description or ""], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def schedule_backstory(self, agent_name: str, agent_role: str, description: str | None = None):
+        """Queues backstory seeding; one worker drains the queue so startup never fans out N generations."""
+        if agent_name in self._backstory_pending:
+            return
+        self._backstory_pending.add(agent_name)
+        self._backstory_queue.append((agent_name, agent_role, description))
+        if self._backstory_worker is None or self._backstory_worker.done():
+            self._backstory_worker = asyncio.create_task(self._drain_backstories())
+
+    async def _drain_backstories(self):
+        while self._backstory_queue:
+            agent_name, agent_role, description = self._backstory_queue.popleft()
+            try:
+                await self.generate_backstory(agent_name, agent_role, description)
+            finally:
+                self._backstory_pending.discard(agent_name)
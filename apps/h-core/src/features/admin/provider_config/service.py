@@ -6,11 +6,10 @@ from typing import Any
 from src.features.admin.agent_config.models import LLMProviderConfig, AgentParameters
 from src.features.admin.provider_config.models import get_provider_info, list_providers, SUPPORTED_PROVIDERS
 
-try:
-    import litellm
-    LITELLM_AVAILABLE = True
-except ImportError:
-    LITELLM_AVAILABLE = False
+from src.utils.lazy import is_available, lazy_import
+
+LITELLM_AVAILABLE = is_available("litellm")
+litellm = lazy_import("litellm")
 
 logger = logging.getLogger(__name__)
 
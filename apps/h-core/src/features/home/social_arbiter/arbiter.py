@@ -1,6 +1,8 @@
 import logging
 from typing import Any
 
+from src.services.metrics import get_metrics
+
 from .models import AgentProfile
 from .scoring import ScoringEngine
 from .tiebreaker import Tiebreaker
@@ -117,6 +119,25 @@ class SocialArbiter:
         discussion_turn: int = 0,
     ) -> list[AgentProfile] | None:
         """Determines which agents should respond using LLM scoring (ADR-10)."""
+        with get_metrics().timer("arbiter_decision_seconds"):
+            return await self._determine_responder_async(
+                message_content,
+                emotional_context,
+                mentioned_agents,
+                allow_suppression,
+                min_threshold_override,
+                discussion_turn,
+            )
+
+    async def _determine_responder_async(
+        self,
+        message_content: str,
+        emotional_context: dict[str, Any] | None = None,
+        mentioned_agents: list[str] | None = None,
+        allow_suppression: bool = True,
+        min_threshold_override: float | None = None,
+        discussion_turn: int = 0,
+    ) -> list[AgentProfile] | None:
         mentioned_agents = mentioned_agents or []
         threshold = min_threshold_override or 0.75  # Default activation threshold
 
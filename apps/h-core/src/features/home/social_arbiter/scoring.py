@@ -76,7 +76,10 @@ class ScoringEngine:
 
         try:
             logger.info(f"LLM_ARBITER: Requesting scores for {len(agent_profiles)} agents...")
-            response = await self.llm.get_completion([{"role": "system", "content": prompt}], stream=False)
+            # Same message, same cast, same scores: replays and near-identical phrasings reuse the answer
+            response = await self.llm.get_completion(
+                [{"role": "system", "content": prompt}], stream=False, cacheable=True, cache_hint=text
+            )
             logger.info(f"LLM_ARBITER: Raw response: {response}")
 
             clean_json = response.strip()
@@ -1,20 +1,46 @@
 import logging
-from typing import Optional, List
-from datetime import datetime
+import os
+import weakref
+from typing import Any, Dict, Optional, List
+from datetime import datetime, timedelta, UTC
 
 from src.features.home.spatial.location.models import AgentLocation, LocationConfidence
 
 logger = logging.getLogger(__name__)
 
+# One current-location cache per database client, shared by every repository built on it
+_current_caches: "weakref.WeakKeyDictionary[Any, Dict[str, Optional[AgentLocation]]]" = weakref.WeakKeyDictionary()
+
 
 class LocationRepository:
+    """
+    Dual-model location store.
+
+    `agent_location_current` holds exactly one upserted row per agent and backs
+    `get_current_location` (served from memory after the first read, including
+    "no location yet"), while
+    `agent_location` stays the append-only history, kept small by
+    `compact_history` (retention plus downsampling of old entries).
+    """
+
     TABLE_NAME = "agent_location"
+    CURRENT_TABLE = "agent_location_current"
+    UPSERT_CURRENT = (
+        f"INSERT INTO {CURRENT_TABLE} {{ id: $agent_id, agent_id: $agent_id, room_id: $room_id, "
+        "timestamp: $timestamp, confidence: $confidence } ON DUPLICATE KEY UPDATE room_id = $room_id, "
+        "timestamp = $timestamp, confidence = $confidence;"
+    )
 
     def __init__(self, surreal_client):
         self.surreal = surreal_client
+        try:
+            self._cache = _current_caches.setdefault(surreal_client, {})
+        except TypeError:
+            self._cache = {}
 
-    async def save_location(self, location: AgentLocation) -> AgentLocation:
-        data = {
+    @staticmethod
+    def _serialize(location: AgentLocation) -> dict:
+        return {
             "agent_id": location.agent_id,
             "room_id": location.room_id,
             "timestamp": location.timestamp.isoformat() if isinstance(location.timestamp, datetime) else location.timestamp,
@@ -23,37 +49,89 @@ class LocationRepository:
                 "reason": location.confidence.reason if location.confidence else None
             } if location.confidence else None
         }
-        await self.surreal._call("create", self.TABLE_NAME, data)
+
+    @staticmethod
+    def _records(result) -> list:
+        if result and isinstance(result, list) and len(result) > 0:
+            return result[0].get("result", []) if isinstance(result[0], dict) else result
+        return []
+
+    @staticmethod
+    def _to_location(record: dict) -> AgentLocation:
+        confidence = None
+        if record.get("confidence"):
+            confidence = LocationConfidence(
+                level=record["confidence"].get("level", "high"),
+                reason=record["confidence"].get("reason")
+            )
+        return AgentLocation(
+            agent_id=record.get("agent_id"),
+            room_id=record.get("room_id"),
+            timestamp=record.get("timestamp"),
+            confidence=confidence
+        )
+
+    async def save_location(self, location: AgentLocation) -> AgentLocation:
+        data = self._serialize(location)
+        # Upsert the current row and append to the history in a single round trip
+        await self.surreal._call(
+            "query",
+            f"{self.UPSERT_CURRENT} CREATE {self.TABLE_NAME} CONTENT $data;",
+            {**data, "data": data},
+        )
+        self._cache[location.agent_id] = location
         logger.info(f"LocationRepository: Saved location for agent {location.agent_id} at {location.room_id}")
         return location
 
     async def get_current_location(self, agent_id: str) -> Optional[AgentLocation]:
+        if agent_id in self._cache:
+            return self._cache[agent_id]
         try:
-            result = await self.surreal._call(
+            records = self._records(await self.surreal._call(
                 "query",
-                f"SELECT * FROM {self.TABLE_NAME} WHERE agent_id = $agent_id ORDER BY timestamp DESC LIMIT 1;",
+                f"SELECT * FROM type::thing('{self.CURRENT_TABLE}', $agent_id);",
                 {"agent_id": agent_id}
-            )
-            if result and isinstance(result, list) and len(result) > 0:
-                records = result[0].get("result", []) if isinstance(result[0], dict) else result
-                if records and len(records) > 0:
-                    record = records[0]
-                    confidence = None
-                    if record.get("confidence"):
-                        confidence = LocationConfidence(
-                            level=record["confidence"].get("level", "high"),
-                            reason=record["confidence"].get("reason")
-                        )
-                    return AgentLocation(
-                        agent_id=record.get("agent_id"),
-                        room_id=record.get("room_id"),
-                        timestamp=record.get("timestamp"),
-                        confidence=confidence
+            ))
+            if not records:
+                # Agents that have not moved since the current table was introduced
+                fallback = await self.surreal._call(
+                    "query",
+                    f"SELECT * FROM {self.TABLE_NAME} WHERE agent_id = $agent_id ORDER BY timestamp DESC LIMIT 1;",
+                    {"agent_id": agent_id}
+                )
+                records = self._records(fallback)
+                if records:
+                    # Backfill the current row so the next cold read is a point lookup
+                    await self.surreal._call(
+                        "query", self.UPSERT_CURRENT, self._serialize(self._to_location(records[0]))
                     )
+                elif fallback is None:
+                    return None  # Failed query, not a known absence: do not cache it
+            location = self._to_location(records[0]) if records else None
+            self._cache[agent_id] = location
+            return location
         except Exception as e:
             logger.error(f"LocationRepository: Failed to get current location for agent {agent_id}: {e}")
         return None
 
+    async def warm_cache(self) -> int:
+        """Loads every agent's current location in one query."""
+        try:
+            records = self._records(await self.surreal._call("query", f"SELECT * FROM {self.CURRENT_TABLE};"))
+            for record in records:
+                if record.get("agent_id") and record.get("room_id"):
+                    self._cache[record["agent_id"]] = self._to_location(record)
+            return len(records)
+        except Exception as e:
+            logger.error(f"LocationRepository: Failed to warm current location cache: {e}")
+            return 0
+
+    def invalidate(self, agent_id: Optional[str] = None):
+        if agent_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(agent_id, None)
+
     async def get_location_history(self, agent_id: str, limit: int = 10) -> List[AgentLocation]:
         try:
             result = await self.surreal._call(
@@ -61,23 +139,7 @@ class LocationRepository:
                 f"SELECT * FROM {self.TABLE_NAME} WHERE agent_id = $agent_id ORDER BY timestamp DESC LIMIT $limit;",
                 {"agent_id": agent_id, "limit": limit}
             )
-            if result and isinstance(result, list) and len(result) > 0:
-                records = result[0].get("result", []) if isinstance(result[0], dict) else result
-                locations = []
-                for record in records:
-                    confidence = None
-                    if record.get("confidence"):
-                        confidence = LocationConfidence(
-                            level=record["confidence"].get("level", "high"),
-                            reason=record["confidence"].get("reason")
-                        )
-                    locations.append(AgentLocation(
-                        agent_id=record.get("agent_id"),
-                        room_id=record.get("room_id"),
-                        timestamp=record.get("timestamp"),
-                        confidence=confidence
-                    ))
-                return locations
+            return [self._to_location(record) for record in self._records(result)]
         except Exception as e:
             logger.error(f"LocationRepository: Failed to get location history for agent {agent_id}: {e}")
         return []
@@ -89,23 +151,78 @@ class LocationRepository:
                 f"SELECT * FROM {self.TABLE_NAME} WHERE agent_id = $agent_id AND timestamp >= $since ORDER BY timestamp DESC;",
                 {"agent_id": agent_id, "since": since.isoformat()}
             )
-            if result and isinstance(result, list) and len(result) > 0:
-                records = result[0].get("result", []) if isinstance(result[0], dict) else result
-                locations = []
-                for record in records:
-                    confidence = None
-                    if record.get("confidence"):
-                        confidence = LocationConfidence(
-                            level=record["confidence"].get("level", "high"),
-                            reason=record["confidence"].get("reason")
-                        )
-                    locations.append(AgentLocation(
-                        agent_id=record.get("agent_id"),
-                        room_id=record.get("room_id"),
-                        timestamp=record.get("timestamp"),
-                        confidence=confidence
-                    ))
-                return locations
+            return [self._to_location(record) for record in self._records(result)]
         except Exception as e:
             logger.error(f"LocationRepository: Failed to get recent locations for agent {agent_id}: {e}")
         return []
+
+    async def compact_history(
+        self,
+        retention_days: Optional[int] = None,
+        downsample_after_hours: Optional[int] = None,
+        bucket_minutes: Optional[int] = None,
+    ) -> dict:
+        """
+        Keeps the history table bounded.
+
+        Entries older than `retention_days` are deleted. Entries older than
+        `downsample_after_hours` are thinned to the last position per agent per
+        `bucket_minutes`, and buckets that did not change room are dropped, so
+        only room transitions survive. The current-location table is untouched.
+        """
+        retention_days = retention_days or int(os.getenv("LOCATION_HISTORY_RETENTION_DAYS", "30"))
+        downsample_after_hours = downsample_after_hours or int(os.getenv("LOCATION_DOWNSAMPLE_AFTER_HOURS", "24"))
+        bucket_seconds = (bucket_minutes or int(os.getenv("LOCATION_DOWNSAMPLE_MINUTES", "15"))) * 60
+
+        now = datetime.now(UTC)
+        cutoff = (now - timedelta(days=retention_days)).isoformat()
+        boundary = (now - timedelta(hours=downsample_after_hours)).isoformat()
+        stats = {"expired": 0, "downsampled": 0}
+        try:
+            expired = self._records(await self.surreal._call(
+                "query", f"DELETE {self.TABLE_NAME} WHERE timestamp < $cutoff RETURN BEFORE;", {"cutoff": cutoff}
+            ))
+            stats["expired"] = len(expired)
+
+            old = self._records(await self.surreal._call(
+                "query",
+                f"SELECT id, agent_id, room_id, timestamp FROM {self.TABLE_NAME} "
+                "WHERE timestamp < $boundary ORDER BY agent_id, timestamp ASC;",
+                {"boundary": boundary}
+            ))
+            doomed = self._downsample(old, bucket_seconds)
+            if doomed:
+                # Ids may come back as plain "table:key" strings, which DELETE would not treat as records
+                keys = [str(record_id).partition(":")[2].strip("`⟨⟩") for record_id in doomed]
+                await self.surreal._call(
+                    "query",
+                    f"FOR $key IN $keys {{ DELETE type::thing('{self.TABLE_NAME}', $key); }};",
+                    {"keys": keys},
+                )
+            stats["downsampled"] = len(doomed)
+        except Exception as e:
+            logger.error(f"LocationRepository: History compaction failed: {e}")
+        logger.info(f"LocationRepository: Compacted history ({stats['expired']} expired, {stats['downsampled']} downsampled)")
+        return stats
+
+    @staticmethod
+    def _downsample(records: list, bucket_seconds: int) -> list:
+        """Ids to delete from time-ordered records: all but the last per bucket, then repeated rooms."""
+        parsed = []
+        last_in_bucket: Dict[tuple, dict] = {}
+        for record in records:
+            try:
+                epoch = datetime.fromisoformat(str(record.get("timestamp")).replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                continue
+            parsed.append(record)
+            last_in_bucket[(record.get("agent_id"), int(epoch // bucket_seconds))] = record
+
+        kept_ids = set()
+        previous_room: Dict[str, Any] = {}
+        for (agent_id, _), record in last_in_bucket.items():
+            if previous_room.get(agent_id) != record.get("room_id"):
+                kept_ids.add(record.get("id"))
+                previous_room[agent_id] = record.get("room_id")
+        return [r.get("id") for r in parsed if r.get("id") not in kept_ids]
+
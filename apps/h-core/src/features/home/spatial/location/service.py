@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import os
 from typing import Optional, List
 from datetime import datetime, timedelta, UTC
 
@@ -15,6 +17,21 @@ class LocationService:
 
     async def initialize(self):
         logger.info("LocationService: Initializing...")
+        loaded = await self.repository.warm_cache()
+        logger.info(f"LocationService: Loaded current location for {loaded} agents")
+
+    async def compact_history(self) -> dict:
+        return await self.repository.compact_history()
+
+    async def run_compaction_loop(self, interval: Optional[float] = None):
+        """Periodic history compaction; meant to run as a background task."""
+        interval = interval or float(os.getenv("LOCATION_COMPACTION_INTERVAL_S", "3600"))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.compact_history()
+            except Exception as e:
+                logger.error(f"LocationService: History compaction failed: {e}")
 
     async def update_agent_location(
         self,
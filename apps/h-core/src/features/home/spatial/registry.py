@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Optional
 
@@ -21,6 +22,7 @@ class SpatialRegistry:
         self.locations = location_service
         self.exterior = exterior_service
         self.themes = theme_service
+        self._compaction_task: Optional[asyncio.Task] = None
 
     async def initialize(self):
         logger.info("SpatialRegistry: Initializing...")
@@ -32,6 +34,15 @@ class SpatialRegistry:
             await self.rooms.initialize()
         if self.locations:
             await self.locations.initialize()
+            if self._compaction_task is None or self._compaction_task.done():
+                self._compaction_task = asyncio.create_task(self.locations.run_compaction_loop())
+
+    async def close(self):
+        """Stops the background location-history compaction."""
+        if self._compaction_task:
+            self._compaction_task.cancel()
+            await asyncio.gather(self._compaction_task, return_exceptions=True)
+            self._compaction_task = None
 
     def get_theme_service(self) -> Optional[WorldThemeService]:
         return self.themes
@@ -0,0 +1,106 @@
+"""
+Preallocated audio ring buffer shared by the wakeword capture and inference threads.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Single-producer / single-consumer ring of int16 samples.
+
+    The capture thread only advances `written` and the inference thread only
+    advances `read`; both are plain integer stores (atomic under the GIL), so no
+    lock is taken on the audio path. Positions are absolute sample counts, which
+    makes it possible to address "the audio since the wake word" later on.
+
+    The producer never blocks: when the consumer falls more than `capacity`
+    samples behind, the oldest audio is overwritten and the consumer records an
+    overrun the next time it reads.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self._scratch = np.zeros(capacity, dtype=dtype)
+        self.written = 0
+        self.read = 0
+        self.overruns = 0
+        self.dropped_samples = 0
+
+    def write(self, samples) -> None:
+        """Copies `samples` (array or raw int16 bytes) into the ring; called from the capture thread."""
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=self._buf.dtype)
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            start = (self.written + n - self.capacity) % self.capacity
+            n_kept = self.capacity
+        else:
+            start = self.written % self.capacity
+            n_kept = n
+        first = min(n_kept, self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        if first < n_kept:
+            self._buf[:n_kept - first] = samples[first:]
+        self.written += n
+
+    def available(self) -> int:
+        return self.written - self.read
+
+    def _catch_up(self) -> None:
+        lag = self.written - self.read
+        if lag > self.capacity:
+            self.overruns += 1
+            self.dropped_samples += lag - self.capacity
+            self.read = self.written - self.capacity
+
+    def _view(self, start: int, length: int) -> np.ndarray:
+        """`length` samples from absolute position `start`: a view when contiguous, else a copy in scratch."""
+        offset = start % self.capacity
+        if offset + length <= self.capacity:
+            return self._buf[offset:offset + length]
+        head = self.capacity - offset
+        self._scratch[:head] = self._buf[offset:]
+        self._scratch[head:length] = self._buf[:length - head]
+        return self._scratch[:length]
+
+    def read_frame(self, frame_size: int, hop_size: int = None):
+        """
+        Next `frame_size` samples, advancing by `hop_size` (defaults to the frame size;
+        smaller values give overlapping frames). Returns None until a full frame is
+        buffered. The array is only valid until the next call.
+        """
+        self._catch_up()
+        if self.available() < frame_size:
+            return None
+        frame = self._view(self.read, frame_size)
+        self.read += hop_size or frame_size
+        return frame
+
+    def segments(self, start: int, end: int = None) -> Tuple[np.ndarray, ...]:
+        """
+        Zero-copy views of the samples between absolute positions `start` and `end`
+        (defaults to now), clamped to what is still in the ring. Up to two segments
+        when the range wraps around.
+        """
+        end = self.written if end is None else min(end, self.written)
+        start = max(start, end - self.capacity, 0)
+        if end <= start:
+            return ()
+        offset = start % self.capacity
+        length = end - start
+        if offset + length <= self.capacity:
+            return (self._buf[offset:offset + length],)
+        head = self.capacity - offset
+        return self._buf[offset:], self._buf[:length - head]
+
+    def latest(self, n: int) -> Tuple[np.ndarray, ...]:
+        """Views of the last `n` samples, e.g. the pre-trigger window once a wake word fires."""
+        return self.segments(self.written - n)
+
+    def to_bytes(self, start: int, end: int = None) -> bytes:
+        return b"".join(segment.tobytes() for segment in self.segments(start, end))
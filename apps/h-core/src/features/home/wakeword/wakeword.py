@@ -7,7 +7,6 @@ Supports "Hey Lisa" wakeword for voice activation.
 import asyncio
 import logging
 import numpy as np
-import queue
 import threading
 import time
 from typing import Optional, Callable, Dict, Any
@@ -29,6 +28,8 @@ except ImportError:
     OPENWAKEWORD_AVAILABLE = False
     logging.warning("openWakeWord not available, wakeword detection disabled")
 
+from src.features.home.wakeword.ring_buffer import AudioRingBuffer
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,7 +46,6 @@ class WakewordEngine:
         self.audio_stream = None
         self.is_running = False
         self.detection_callback: Optional[Callable] = None
-        self.audio_queue = queue.Queue(maxsize=100)
         self.processing_thread: Optional[threading.Thread] = None
         self.capture_thread: Optional[threading.Thread] = None
 
@@ -56,6 +56,15 @@ class WakewordEngine:
         self.sample_rate = 16000
         self.channels = 1
 
+        # Capture -> inference hand-off. openWakeWord keeps its own streaming context,
+        # so frames do not overlap by default; a smaller hop_size re-scores shared audio.
+        self.hop_size = config.get("hop_size", self.chunk_size)
+        self.pre_trigger_ms = config.get("pre_trigger_ms", 1500)
+        self.ring = AudioRingBuffer(int(self.sample_rate * config.get("ring_seconds", 10)))
+        self._frame_float = np.zeros(self.chunk_size, dtype=np.float32)
+        self._data_ready = threading.Event()
+        self.last_trigger_position: Optional[int] = None
+
         if not OPENWAKEWORD_AVAILABLE or not PYAUDIO_AVAILABLE:
             logger.error("Cannot initialize WakewordEngine: required libraries not available")
             return
@@ -169,18 +178,9 @@ class WakewordEngine:
             return (None, pyaudio.paContinue)
 
         try:
-            # Convert audio data to numpy array
-            audio_data = np.frombuffer(in_data, dtype=np.int16)
-
-            # Convert to float32 for openWakeWord
-            audio_float = audio_data.astype(np.float32) / 32768.0
-
-            # Add to processing queue
-            if not self.audio_queue.full():
-                self.audio_queue.put(audio_float)
-            else:
-                logger.warning("Audio queue full, dropping audio chunk")
-
+            # Straight copy of the int16 frame into the preallocated ring; never blocks
+            self.ring.write(np.frombuffer(in_data, dtype=np.int16))
+            self._data_ready.set()
         except Exception as e:
             logger.error(f"Error in audio callback: {e}")
 
@@ -188,35 +188,68 @@ class WakewordEngine:
 
     def _processing_loop(self) -> None:
         """Main processing loop for wakeword detection."""
+        overruns = 0
         while self.is_running:
             try:
-                # Get audio chunk
-                audio_data = self.audio_queue.get(timeout=0.1)
-                if audio_data is None:
+                frame = self.ring.read_frame(self.chunk_size, self.hop_size)
+                if frame is None:
+                    self._data_ready.wait(timeout=0.1)
+                    self._data_ready.clear()
                     continue
+                if self.ring.overruns != overruns:
+                    logger.warning(f"Wakeword inference fell behind, {self.ring.dropped_samples} samples dropped so far")
+                    overruns = self.ring.overruns
 
-                # Predict wakeword
-                prediction = self.model.predict(audio_data)
+                # float32 for openWakeWord, converted into a reused buffer
+                np.multiply(frame, 1 / 32768.0, out=self._frame_float, casting="unsafe")
+                prediction = self.model.predict(self._frame_float)
 
                 # Check for wakeword detection
                 wakeword_prediction = prediction.get(self.wakeword, 0.0)
                 if wakeword_prediction > self.threshold:
                     # Wakeword detected!
-                    detection_info = {
-                        "wakeword": self.wakeword,
-                        "confidence": wakeword_prediction,
-                        "timestamp": time.time(),
-                    }
+                    frame_end = self.ring.read - (self.hop_size or self.chunk_size) + self.chunk_size
+                    detection_info = self._detection_info(wakeword_prediction, frame_end)
 
                     # Call callback in main thread
                     if self.detection_callback:
                         asyncio.run(self.detection_callback(detection_info))
 
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error in wakeword processing: {e}")
 
+    def _detection_info(self, confidence: float, frame_end: int) -> Dict[str, Any]:
+        """
+        Detection payload. `stream_position` marks where the pre-trigger window starts, so
+        `audio_since(stream_position)` later returns everything said from the wake word on,
+        including the first syllable spoken before STT took over the microphone.
+        """
+        window = int(self.sample_rate * self.pre_trigger_ms / 1000)
+        # Anchored on the frame that fired, not on how far capture has got since
+        self.last_trigger_position = max(0, frame_end - window)
+        return {
+            "wakeword": self.wakeword,
+            "confidence": confidence,
+            "timestamp": time.time(),
+            "stream_position": self.last_trigger_position,
+            "sample_rate": self.sample_rate,
+        }
+
+    def audio_segments_since(self, position: int):
+        """Zero-copy views of the ring from absolute sample `position` to now, for in-process STT."""
+        return self.ring.segments(position)
+
+    def audio_since(self, position: int) -> bytes:
+        """int16 PCM captured from absolute sample `position` up to now (bounded by the ring size)."""
+        return self.ring.to_bytes(position)
+
+    def get_buffer_stats(self) -> Dict[str, int]:
+        return {
+            "overruns": self.ring.overruns,
+            "dropped_samples": self.ring.dropped_samples,
+            "buffered_samples": self.ring.available(),
+        }
+
     async def __aenter__(self):
         """Async context manager entry."""
         return self
@@ -286,8 +319,11 @@ class WakewordDetector:
 
     async def get_status(self) -> Dict[str, Any]:
         """Get current status of wakeword detection."""
-        return {
+        status = {
             "active": self.engine is not None and self.engine.is_running,
             "wakeword": self.config.get("wakeword", "hey_lisa"),
             "threshold": self.config.get("threshold", 0.5),
         }
+        if self.engine is not None and hasattr(self.engine, "ring"):
+            status.update(self.engine.get_buffer_stats())
+        return status
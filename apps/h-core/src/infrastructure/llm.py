@@ -2,34 +2,53 @@ import asyncio
 import json
 import logging
 import os
+import time
 from collections.abc import AsyncGenerator
 from typing import Any
 
-try:
-    import litellm
-    from litellm import acompletion
-
-    LITELLM_AVAILABLE = True
-except ImportError:
-    litellm = None  # type: ignore
-    acompletion = None
-    LITELLM_AVAILABLE = False
+from src.infrastructure.llm_resilience import backoff_delay, get_provider_health, is_transient_error
+from src.infrastructure.llm_response_cache import cache_key, get_response_cache, scope_key
+from src.infrastructure.rate_governor import (
+    PRIORITY_INTERACTIVE,
+    estimate_tokens,
+    get_rate_governor,
+    is_rate_limit_error,
+)
+from src.services.metrics import get_metrics
+from src.utils.lazy import is_available, lazy_import
+
+# Heavy SDKs are only located here; they are imported on first use (or by LlmClient.warm_up).
+LITELLM_AVAILABLE = is_available("litellm")
+if not LITELLM_AVAILABLE:
     print("WARNING: litellm library not found. LLM features will be disabled.")
 
-try:
-    from fastembed import TextEmbedding
-
-    FASTEMBED_AVAILABLE = True
-except ImportError:
-    FASTEMBED_AVAILABLE = False
+FASTEMBED_AVAILABLE = is_available("fastembed")
+if not FASTEMBED_AVAILABLE:
     print("WARNING: fastembed library not found. Local embeddings will be disabled.")
 
+litellm = None
+acompletion = None
+
 logger = logging.getLogger(__name__)
 
-if LITELLM_AVAILABLE:
-    litellm.drop_params = True
-    litellm.success_callback = []
-    litellm.failure_callback = []
+EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def _load_litellm():
+    """Imports and configures litellm once, returning `acompletion` (None when unavailable)."""
+    global litellm, acompletion
+    if acompletion is not None or not LITELLM_AVAILABLE:
+        return acompletion
+
+    module = lazy_import("litellm").load()
+    if module is None:
+        return None
+    module.drop_params = True
+    module.success_callback = []
+    module.failure_callback = []
+    litellm = module
+    acompletion = module.acompletion
+    return acompletion
 
 
 class LlmClient:
@@ -113,59 +132,250 @@ class LlmClient:
         stream: bool = False,
         tools: list[dict[str, Any]] | None = None,
         return_full_object: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+        cacheable: bool = False,
+        cache_hint: str | None = None,
     ) -> str | AsyncGenerator[str, None] | Any:
         """
         Get completion from the LLM using litellm with automatic fallback.
+
+        Each attempt waits for a slot from the shared rate governor of its model;
+        `priority` orders the wait (see rate_governor: interactive, discussion, background).
+        Timeouts, retries and circuit breaking per provider come from llm_resilience;
+        with LLM_HEDGE=true a non-streaming call that outlives its provider's p95 is
+        raced against the next fallback.
+
+        `cacheable=True` marks a call whose answer is a pure function of its input
+        (see llm_response_cache); `cache_hint` is the variable part of the prompt,
+        used to match near-duplicates. Streams and full response objects are never cached.
         """
-        if not LITELLM_AVAILABLE:
+        if _load_litellm() is None:
             err_msg = "Mon cerveau (LLM) n'est pas encore branché."
             return self._error_generator(err_msg) if stream else err_msg
 
         self._reset_fallback_index()
 
-        provider_config = self._get_current_provider_config()
-
-        while True:
-            try:
-                kwargs = {"model": provider_config["model"], "messages": messages, "stream": stream}
-
-                if provider_config.get("api_key"):
-                    kwargs["api_key"] = provider_config["api_key"]
-                if provider_config.get("base_url"):
-                    kwargs["base_url"] = provider_config["base_url"]
-                if self.temperature is not None:
-                    kwargs["temperature"] = float(self.temperature)
-
-                if tools:
-                    kwargs["tools"] = tools
+        response_cache = None
+        if cacheable and not stream and not return_full_object and get_response_cache().enabled:
+            response_cache = get_response_cache()
+            params = {"temperature": self.temperature, "tools": tools}
+            key = cache_key(self.model, messages, params)
+            scope = scope_key(self.model, messages, cache_hint, params) if cache_hint else None
+            hint_embedding = None
+            if scope and response_cache.similarity > 0 and (self.embedding_model or FASTEMBED_AVAILABLE):
+                hint_embedding = await self.get_embedding(cache_hint) or None
+            cached = await response_cache.get(key, self.model, scope, hint_embedding)
+            if cached is not None:
+                return cached
 
-                logger.info(
-                    f"LLM_CALL: Model={provider_config['model']}, Tools={len(tools) if tools else 0}, FallbackIndex={self._fallback_index}"
-                )
-                response = await asyncio.wait_for(acompletion(**kwargs), timeout=120.0)
+        provider_config = self._get_current_provider_config()
+        estimated = estimate_tokens(messages)
+        max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        hedge = os.getenv("LLM_HEDGE", "false").lower() == "true" and not stream
+        # Retries and fallbacks together never hold a turn longer than this
+        deadline = time.monotonic() + float(os.getenv("LLM_DEADLINE_S", "180"))
+        last_error: Exception | None = None
+
+        while provider_config is not None and time.monotonic() < deadline:
+            model = provider_config["model"]
+            health = get_provider_health(model)
+            attempt = 0
+            while health.allow():
+                try:
+                    if hedge and attempt == 0:
+                        provider_config, response = await self._hedged_call(
+                            provider_config, messages, stream, tools, priority, estimated, deadline
+                        )
+                    else:
+                        response = await self._call(
+                            provider_config, messages, stream, tools, priority, estimated, deadline
+                        )
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"LLM_CALL failed with provider {model}: {e!r}")
+                    # A 429 already pauses this provider in the governor, and a timeout already cost a
+                    # full budget: prefer moving on to the next provider when there is one
+                    move_on = is_rate_limit_error(e) or isinstance(e, asyncio.TimeoutError)
+                    if (
+                        attempt < max_retries
+                        and is_transient_error(e)
+                        and not (move_on and self._has_fallback())
+                        and time.monotonic() < deadline
+                    ):
+                        delay = min(backoff_delay(attempt), max(0.0, deadline - time.monotonic()))
+                        attempt += 1
+                        get_metrics().increment("llm_retries_total", labels={"provider": model.split("/", 1)[0]})
+                        logger.info(f"LLM_RETRY: {model} attempt {attempt}/{max_retries} in {delay:.2f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    break
 
                 self._current_provider = provider_config
-
                 if stream:
-                    return self._stream_generator(response)
-
+                    return response
                 if return_full_object:
                     return response
-                else:
-                    return response.choices[0].message.content
-
-            except Exception as e:
-                error_msg = str(e)
-                logger.warning(f"LLM_CALL failed with provider {provider_config.get('model')}: {error_msg}")
-
-                fallback_config = self._get_next_fallback()
-                if fallback_config:
-                    logger.info(f"Attempting fallback to provider: {fallback_config['model']}")
-                    provider_config = fallback_config
-                else:
-                    logger.error(f"All providers exhausted, last error: {error_msg}")
-                    err_msg = f"Erreur de communication avec mon cerveau: {error_msg}"
-                    return self._error_generator(err_msg) if stream else err_msg
+                content = response.choices[0].message.content
+                # Entries are keyed on the configured model: an answer from a fallback or the hedge is not stored
+                # under it, or the primary's later lookups would replay the substitute's answer
+                answered_by_primary = provider_config["model"] == self.model
+                if response_cache is not None and answered_by_primary and isinstance(content, str) and content:
+                    await response_cache.set(key, self.model, content, scope, hint_embedding)
+                return content
+            else:
+                logger.warning(f"LLM_BREAKER: Skipping {model}, circuit is {health.state}.")
+                get_metrics().increment("llm_breaker_skipped_total", labels={"model": model})
+                last_error = last_error or RuntimeError(f"circuit open for {model}")
+
+            provider_config = self._get_next_fallback()
+            if provider_config:
+                logger.info(f"Attempting fallback to provider: {provider_config['model']}")
+
+        if last_error is None:
+            last_error = asyncio.TimeoutError("LLM deadline exceeded")
+        error_msg = str(last_error) or type(last_error).__name__
+        logger.error(f"All providers exhausted, last error: {error_msg}")
+        err_msg = f"Erreur de communication avec mon cerveau: {error_msg}"
+        return self._error_generator(err_msg) if stream else err_msg
+
+    def _has_fallback(self) -> bool:
+        return self._fallback_index < len(self._fallback_providers)
+
+    async def _call(
+        self,
+        provider_config: dict[str, Any],
+        messages: list[dict[str, str]],
+        stream: bool,
+        tools: list[dict[str, Any]] | None,
+        priority: int,
+        estimated: int,
+        deadline: float | None = None,
+    ) -> Any:
+        """One request to one provider: governor slot, learned timeout, health bookkeeping."""
+        model = provider_config["model"]
+        health = get_provider_health(model)
+        kwargs = {"model": model, "messages": messages, "stream": stream}
+
+        if provider_config.get("api_key"):
+            kwargs["api_key"] = provider_config["api_key"]
+        if provider_config.get("base_url"):
+            kwargs["base_url"] = provider_config["base_url"]
+        if self.temperature is not None:
+            kwargs["temperature"] = float(self.temperature)
+
+        if tools:
+            kwargs["tools"] = tools
+
+        # Until the request is sent there is no verdict on the provider: any exit hands back a half-open probe
+        try:
+            acquire = get_rate_governor().acquire(model, priority, estimated)
+            if deadline is None:
+                lease = await acquire
+            else:
+                # Time queued in the governor counts against the overall deadline
+                lease = await asyncio.wait_for(acquire, max(0.0, deadline - time.monotonic()))
+        except BaseException as e:
+            health.release_probe()
+            if isinstance(e, asyncio.TimeoutError):
+                raise asyncio.TimeoutError(f"LLM deadline exceeded before calling {model}") from e
+            raise
+
+        timeout = health.timeout()
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                error = asyncio.TimeoutError(f"LLM deadline exceeded before calling {model}")
+                lease.release(0, error=error)
+                health.release_probe()
+                raise error
+        logger.info(
+            f"LLM_CALL: Model={model}, Tools={len(tools) if tools else 0}, "
+            f"FallbackIndex={self._fallback_index}, Timeout={timeout:.0f}s"
+        )
+        labels = {"provider": model.split("/", 1)[0], "stream": str(stream).lower()}
+        started = time.monotonic()
+        try:
+            with get_metrics().timer("llm_request_seconds", labels):
+                response = await asyncio.wait_for(acompletion(**kwargs), timeout=timeout)
+        except asyncio.CancelledError as e:
+            # Lost a hedge race (or the caller went away): no verdict on the provider
+            lease.release(error=e)
+            health.release_probe()
+            raise
+        except Exception as e:
+            lease.release(error=e)
+            get_metrics().increment("llm_errors_total", labels={"provider": labels["provider"]})
+            if is_transient_error(e):
+                health.record_failure()
+            else:
+                health.release_probe()
+            raise
+
+        if stream:
+            # Time to first byte is not comparable with full completions: only the breaker learns from it
+            health.record_success(None)
+            # The slot is held until the stream is consumed
+            return self._stream_generator(response, lease)
+
+        health.record_success(time.monotonic() - started)
+        used = self.get_usage_from_response(response)["total_tokens"]
+        lease.release(used if isinstance(used, int) and used > 0 else None)
+        return response
+
+    async def _hedged_call(
+        self,
+        provider_config: dict[str, Any],
+        messages: list[dict[str, str]],
+        stream: bool,
+        tools: list[dict[str, Any]] | None,
+        priority: int,
+        estimated: int,
+        deadline: float | None = None,
+    ) -> tuple[dict[str, Any], Any]:
+        """
+        Runs the call and, once it is slower than the provider's p95, also sends it to
+        the next fallback; the first success wins and the other request is cancelled.
+        Returns the winning provider config with its response.
+        """
+        primary = asyncio.create_task(
+            self._call(provider_config, messages, stream, tools, priority, estimated, deadline)
+        )
+        delay = get_provider_health(provider_config["model"]).hedge_delay()
+        if delay is None or not self._has_fallback():
+            return provider_config, await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return provider_config, primary.result()
+
+        hedge_config = self._get_next_fallback()
+        if not get_provider_health(hedge_config["model"]).allow():
+            return provider_config, await primary
+
+        logger.info(f"LLM_HEDGE: {provider_config['model']} exceeded {delay:.1f}s, racing {hedge_config['model']}")
+        get_metrics().increment("llm_hedged_total", labels={"model": provider_config["model"]})
+        hedge = asyncio.create_task(self._call(hedge_config, messages, stream, tools, priority, estimated, deadline))
+        configs = {primary: provider_config, hedge: hedge_config}
+        pending = {primary, hedge}
+        errors: dict[asyncio.Task, BaseException] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            get_metrics().increment("llm_hedge_wins_total", labels={"model": hedge_config["model"]})
+                        return configs[task], task.result()
+                    errors[task] = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            if hedge in pending:
+                # Cancelled before it ever ran, _call could not hand back the probe taken above
+                get_provider_health(hedge_config["model"]).release_probe()
+        raise errors.get(primary) or errors[hedge]
 
     def get_usage_from_response(self, response) -> dict:
         """Extract token usage from LLM response."""
@@ -188,14 +398,35 @@ class LlmClient:
     async def _error_generator(self, msg: str):
         yield msg
 
-    async def _stream_generator(self, response):
+    async def _stream_generator(self, response, lease=None):
         """Helper to yield content chunks from the stream."""
-        async for chunk in response:
-            delta = chunk.choices[0].delta
-            if hasattr(delta, "content") and delta.content is not None:
-                yield delta.content
-            elif hasattr(delta, "reasoning_content") and delta.reasoning_content is not None:
-                yield delta.reasoning_content
+        try:
+            async for chunk in response:
+                delta = chunk.choices[0].delta
+                if hasattr(delta, "content") and delta.content is not None:
+                    yield delta.content
+                elif hasattr(delta, "reasoning_content") and delta.reasoning_content is not None:
+                    yield delta.reasoning_content
+        finally:
+            if lease is not None:
+                lease.release()
+
+    def _load_embedding_model(self):
+        if LlmClient.embedding_model is None:
+            try:
+                fastembed = lazy_import("fastembed")
+                LlmClient.embedding_model = fastembed.TextEmbedding(model_name=EMBEDDING_MODEL_NAME)
+                logger.info("FastEmbed initialized on demand.")
+            except Exception as e:
+                logger.error(f"Failed to lazy-load FastEmbed: {e}")
+        self.embedding_model = LlmClient.embedding_model
+
+    async def warm_up(self, embeddings: bool = True):
+        """Pays the litellm import and embedding model load off the event loop, ahead of the first request."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _load_litellm)
+        if embeddings and FASTEMBED_AVAILABLE:
+            await loop.run_in_executor(None, self._load_embedding_model)
 
     async def get_embedding(self, text: str) -> list[float]:
         """
@@ -215,15 +446,7 @@ class LlmClient:
         # 2. Generate Locally
         # LAZY INITIALIZATION
         if not self.embedding_model and FASTEMBED_AVAILABLE:
-            try:
-                from fastembed import TextEmbedding
-
-                self.embedding_model = TextEmbedding(
-                    model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-                )
-                logger.info("FastEmbed initialized on demand.")
-            except Exception as e:
-                logger.error(f"Failed to lazy-load FastEmbed: {e}")
+            self._load_embedding_model()
 
         if self.embedding_model:
             try:
@@ -0,0 +1,161 @@
+"""
+Per-provider health for LlmClient: learned timeouts, retry policy and a
+circuit breaker, shared by every client in the process.
+
+- Timeouts follow recent latency: LLM_TIMEOUT_P95_FACTOR x the p95 of the
+  last successful calls, clamped to [LLM_TIMEOUT_MIN_S, LLM_TIMEOUT_MAX_S].
+  Until enough samples exist the maximum applies.
+- Transient failures (timeouts, 429, 5xx, connection errors) are retried up
+  to LLM_MAX_RETRIES times with full-jitter exponential backoff; anything
+  else (auth, bad request) moves straight to the next provider. Timeouts and
+  429s also move on when a fallback is left, and LLM_DEADLINE_S caps one
+  get_completion across all retries and fallbacks.
+- After LLM_BREAKER_FAILURES consecutive failures a provider is skipped for
+  LLM_BREAKER_COOLDOWN_S, then a single probe request decides whether it
+  closes again.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from src.infrastructure.rate_governor import is_rate_limit_error
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_TRANSIENT_NAMES = ("Timeout", "RateLimit", "ServiceUnavailable", "InternalServer", "APIConnection", "Connection")
+
+
+def is_transient_error(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if is_rate_limit_error(error):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status in (408, 409)
+    name = type(error).__name__
+    return any(part in name for part in _TRANSIENT_NAMES)
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)]."""
+    base = base if base is not None else float(os.getenv("LLM_RETRY_BASE_S", "0.5"))
+    cap = cap if cap is not None else float(os.getenv("LLM_RETRY_MAX_S", "8"))
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class ProviderHealth:
+    def __init__(
+        self,
+        key: str,
+        window: int = 50,
+        min_samples: int = 5,
+        timeout_factor: Optional[float] = None,
+        min_timeout: Optional[float] = None,
+        max_timeout: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+    ):
+        self.key = key
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.timeout_factor = timeout_factor or float(os.getenv("LLM_TIMEOUT_P95_FACTOR", "3"))
+        self.min_timeout = min_timeout or float(os.getenv("LLM_TIMEOUT_MIN_S", "10"))
+        self.max_timeout = max_timeout or float(os.getenv("LLM_TIMEOUT_MAX_S", "120"))
+        self.failure_threshold = failure_threshold or int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv("LLM_BREAKER_COOLDOWN_S", "30"))
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._metrics = get_metrics()
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor))
+
+    def hedge_delay(self) -> Optional[float]:
+        """When to start a hedge: once this call is slower than the provider's usual tail."""
+        return self.p95()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; in half-open state only one probe at a time."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = HALF_OPEN
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: Optional[float]) -> None:
+        if latency is not None:
+            self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            logger.info(f"LLM_BREAKER: {self.key} recovered, closing circuit.")
+            self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        probe_failed = self.state == HALF_OPEN
+        self._probe_in_flight = False
+        if probe_failed or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"LLM_BREAKER: {self.key} opened after {self.consecutive_failures} failures.")
+                self._metrics.increment("llm_breaker_open_total", labels={"model": self.key})
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """A probe that ended without a verdict (e.g. cancelled by a winning hedge)."""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "p95_s": round(p95, 2) if p95 is not None else None,
+            "timeout_s": round(self.timeout(), 1),
+            "failures": self.consecutive_failures,
+        }
+
+
+_health: Dict[str, ProviderHealth] = {}
+
+
+def get_provider_health(model: str) -> ProviderHealth:
+    health = _health.get(model)
+    if health is None:
+        health = _health[model] = ProviderHealth(model)
+    return health
+
+
+def reset_provider_health() -> None:
+    _health.clear()
+
+
+def provider_health_stats() -> Dict[str, Dict[str, object]]:
+    return {key: health.stats() for key, health in _health.items()}
@@ -0,0 +1,240 @@
+"""
+Response cache for deterministic LLM calls (fact extraction, conflict
+resolution, relevance scoring, backstories).
+
+Strictly opt-in: `LlmClient.get_completion(..., cacheable=True)`. Persona chat
+never passes it and is never cached. Set LLM_RESPONSE_CACHE=false to turn the
+cache off everywhere.
+
+- Exact tier: key = model + normalized messages + parameters (temperature,
+  tools). Whitespace and Unicode forms do not change the key.
+- Similarity tier: when the caller passes `cache_hint` (the variable part of
+  the prompt, e.g. the user message), entries whose prompt is otherwise
+  identical are compared on the embedding of that hint; a cosine at or above
+  LLM_CACHE_SIMILARITY (0 = tier disabled) counts as a hit.
+- Entries live in a local SQLite file (LLM_CACHE_PATH) with a TTL
+  (LLM_CACHE_TTL_S) and an entry cap (LLM_CACHE_MAX_ENTRIES, least recently
+  used evicted), so they survive restarts and stream replays.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_HINT_MARK = "\x00hint\x00"
+
+
+def normalize_content(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _normalized_messages(messages: List[Dict[str, Any]]) -> List[List[str]]:
+    return [[str(m.get("role", "")), normalize_content(str(m.get("content") or ""))] for m in messages]
+
+
+def _digest(material: Any) -> str:
+    raw = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+    """Exact-tier key: model, normalized messages and call parameters."""
+    return _digest([model, _normalized_messages(messages), params or {}])
+
+
+def scope_key(model: str, messages: List[Dict[str, Any]], hint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Similarity-tier scope: the prompt with the hint cut out, so only same-template entries compete."""
+    normalized_hint = normalize_content(hint)
+    templated = [
+        [role, content.replace(normalized_hint, _HINT_MARK) if normalized_hint else content]
+        for role, content in _normalized_messages(messages)
+    ]
+    return _digest([model, templated, params or {}])
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class LlmResponseCache:
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS llm_response (
+            key TEXT PRIMARY KEY,
+            scope TEXT,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            embedding TEXT,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS llm_response_scope ON llm_response (scope, accessed_at);
+        CREATE INDEX IF NOT EXISTS llm_response_accessed ON llm_response (accessed_at);
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        similarity: Optional[float] = None,
+        scan_limit: int = 200,
+    ):
+        self.path = path or os.getenv("LLM_CACHE_PATH", "/tmp/hairem/llm_cache.sqlite3")
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL_S", str(7 * 86400)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        self.similarity = similarity if similarity is not None else float(os.getenv("LLM_CACHE_SIMILARITY", "0.97"))
+        self.scan_limit = scan_limit
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._metrics = get_metrics()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None:
+            try:
+                if self.path != ":memory:":
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.executescript(self._SCHEMA)
+                db.execute("DELETE FROM llm_response WHERE expires_at < ?", (time.time(),))
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"LLM_CACHE: Store unavailable ({self.path}: {e}); caching disabled.")
+                self.path = None
+        return self._db
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None and os.getenv("LLM_RESPONSE_CACHE", "true").lower() != "false"
+
+    # --- blocking store access, run in the default executor ---
+
+    def _lookup_exact(self, key: str) -> Optional[str]:
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            now = time.time()
+            row = db.execute(
+                "SELECT response FROM llm_response WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE llm_response SET accessed_at = ? WHERE key = ?", (now, key))
+                db.commit()
+            return row[0] if row else None
+
+    def _lookup_similar(self, scope: str, embedding: List[float]) -> Tuple[Optional[str], float]:
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None, 0.0
+            rows = db.execute(
+                "SELECT key, response, embedding FROM llm_response WHERE scope = ? AND expires_at >= ? "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (scope, time.time(), self.scan_limit),
+            ).fetchall()
+        best_key, best_response, best_score = None, None, 0.0
+        for key, response, raw in rows:
+            score = cosine(embedding, json.loads(raw)) if raw else 0.0
+            if score > best_score:
+                best_key, best_response, best_score = key, response, score
+        if best_key is None or best_score < self.similarity:
+            return None, best_score
+        with self._lock:
+            self._db.execute("UPDATE llm_response SET accessed_at = ? WHERE key = ?", (time.time(), best_key))
+            self._db.commit()
+        return best_response, best_score
+
+    def _store(self, key: str, model: str, response: str, scope: Optional[str], embedding: Optional[List[float]]):
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            now = time.time()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_response (key, scope, model, response, embedding, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, model, response, json.dumps(embedding) if embedding else None, now + self.ttl, now),
+            )
+            excess = db.execute("SELECT COUNT(*) FROM llm_response").fetchone()[0] - self.max_entries
+            if excess > 0:
+                db.execute(
+                    "DELETE FROM llm_response WHERE key IN "
+                    "(SELECT key FROM llm_response ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+            db.commit()
+
+    # --- async API ---
+
+    def _count(self, outcome: str, model: str) -> None:
+        self._metrics.increment("llm_cache_total", labels={"outcome": outcome, "provider": model.split("/", 1)[0]})
+
+    async def get(self, key: str, model: str, scope: Optional[str] = None, embedding: Optional[List[float]] = None):
+        """Cached response text for the exact key, else the closest entry in `scope`; None on a miss."""
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(None, self._lookup_exact, key)
+            if response is not None:
+                self.hits += 1
+                self._count("hit_exact", model)
+                return response
+            if scope and embedding and self.similarity > 0:
+                response, score = await loop.run_in_executor(None, self._lookup_similar, scope, embedding)
+                if response is not None:
+                    self.hits += 1
+                    self._count("hit_similar", model)
+                    logger.info(f"LLM_CACHE: Near-duplicate hit for {model} (cosine {score:.3f}).")
+                    return response
+        except sqlite3.Error as e:
+            logger.error(f"LLM_CACHE: Lookup failed: {e}")
+        self.misses += 1
+        self._count("miss", model)
+        return None
+
+    async def set(
+        self,
+        key: str,
+        model: str,
+        response: str,
+        scope: Optional[str] = None,
+        embedding: Optional[List[float]] = None,
+    ) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._store, key, model, response, scope, embedding
+            )
+        except sqlite3.Error as e:
+            logger.error(f"LLM_CACHE: Store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 3) if total else None}
+
+
+_cache: Optional[LlmResponseCache] = None
+
+
+def get_response_cache() -> LlmResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = LlmResponseCache()
+    return _cache
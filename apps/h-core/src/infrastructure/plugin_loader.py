@@ -1,8 +1,11 @@
 import asyncio
+import hashlib
 import importlib.util
+import inspect
 import logging
 import os
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable, Optional
 
 import yaml
 from watchdog.events import FileSystemEventHandler
@@ -21,31 +24,46 @@ class AgentRegistry:
         logger.info(f"AGENT_REGISTRY: Agent '{agent.config.name}' registered successfully.")
 
 class AgentFileHandler(FileSystemEventHandler):
-    def __init__(self, registry: AgentRegistry, loop: asyncio.AbstractEventLoop, redis_client, llm_client, surreal_client=None, visual_service=None):
+    WATCHED_FILES = ("manifest.yaml", "persona.yaml", "logic.py")
+
+    def __init__(self, registry: AgentRegistry, loop: asyncio.AbstractEventLoop, redis_client, llm_client, surreal_client=None, visual_service=None, reload_callback: Optional[Callable[[str], None]] = None):
         self.registry = registry
         self.loop = loop
         self.redis = redis_client
         self.llm = llm_client
         self.surreal = surreal_client
         self.visual_service = visual_service
+        # Receives the agent directory; runs on the event loop thread
+        self.reload_callback = reload_callback
+
+    def _request_reload(self, agent_dir: str):
+        manifest_path = os.path.join(agent_dir, "manifest.yaml")
+        if not os.path.exists(manifest_path):
+            return
+        if self.reload_callback:
+            self.loop.call_soon_threadsafe(self.reload_callback, agent_dir)
+        else:
+            self.loop.call_soon_threadsafe(asyncio.create_task, self._load_agent(manifest_path))
+
+    def _on_file_event(self, path: str):
+        if os.path.basename(path) in self.WATCHED_FILES:
+            self._request_reload(os.path.dirname(path))
 
     def on_modified(self, event):
         if event.is_directory: return
-        filename = os.path.basename(event.src_path)
-        if filename in ["manifest.yaml", "persona.yaml", "logic.py"]:
-            manifest_path = event.src_path
-            if filename != "manifest.yaml":
-                manifest_path = os.path.join(os.path.dirname(event.src_path), "manifest.yaml")
-            
-            if os.path.exists(manifest_path):
-                self.loop.call_soon_threadsafe(asyncio.create_task, self._load_agent(manifest_path))
+        self._on_file_event(event.src_path)
+
+    def on_moved(self, event):
+        # Editors often save by writing a temp file and renaming it over the original
+        if event.is_directory: return
+        self._on_file_event(event.dest_path)
 
     def on_created(self, event):
         if event.is_directory:
-            manifest_path = os.path.join(event.src_path, "manifest.yaml")
-            if os.path.exists(manifest_path):
-                logger.info(f"PLUGIN_LOADER: New agent folder detected: {event.src_path}")
-                self.loop.call_soon_threadsafe(asyncio.create_task, self._load_agent(manifest_path))
+            logger.info(f"PLUGIN_LOADER: New agent folder detected: {event.src_path}")
+            self._request_reload(event.src_path)
+        else:
+            self._on_file_event(event.src_path)
 
     async def _load_agent(self, manifest_path: str):
         pass
@@ -60,6 +78,17 @@ class PluginLoader:
         self.visual_service = visual_service
         self.token_tracking_service = token_tracking_service
         self.observer = Observer()
+        self.max_parallel_loads = int(os.getenv("AGENT_LOAD_CONCURRENCY", "4"))
+        # Called with each agent instance as soon as it is registered and listening
+        self.on_agent_ready: Optional[Callable[[Any], Awaitable[None] | None]] = None
+        self.startup_timeline: list[dict[str, Any]] = []
+        self._scan_started_at = time.monotonic()
+        self._background_tasks: set[asyncio.Task] = set()
+        # Hot reload: pending debounce timers, per-agent locks and the content hash of the loaded bundle
+        self.reload_debounce = float(os.getenv("AGENT_RELOAD_DEBOUNCE_MS", "500")) / 1000
+        self._pending_reloads: dict[str, asyncio.TimerHandle] = {}
+        self._reload_locks: dict[str, asyncio.Lock] = {}
+        self._bundle_hashes: dict[str, str] = {}
         logger.info(f"PLUGIN_LOADER: Initialized with path {self.agents_dir}")
 
     async def start(self):
@@ -68,8 +97,10 @@ class PluginLoader:
         
         try:
             loop = asyncio.get_running_loop()
-            handler = AgentFileHandler(self.registry, loop, self.redis, self.llm, self.surreal, self.visual_service)
-            handler._load_agent = self._load_agent # type: ignore
+            handler = AgentFileHandler(
+                self.registry, loop, self.redis, self.llm, self.surreal, self.visual_service,
+                reload_callback=self.schedule_reload,
+            )
             
             self.observer.schedule(handler, self.agents_dir, recursive=True)
             self.observer.start()
@@ -77,49 +108,220 @@ class PluginLoader:
         except Exception as e:
             logger.error(f"PLUGIN_LOADER: Failed to start watcher: {e}")
 
+    def _spawn_background(self, coro) -> asyncio.Task:
+        """Runs non-critical setup work (avatars, backstories) without blocking agent readiness."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def _record(self, agent: str, phase: str, started: float):
+        now = time.monotonic()
+        self.startup_timeline.append(
+            {
+                "agent": agent,
+                "phase": phase,
+                "start_ms": round((started - self._scan_started_at) * 1000, 1),
+                "duration_ms": round((now - started) * 1000, 1),
+            }
+        )
+
     async def _initial_scan(self):
         if not os.path.exists(self.agents_dir):
             logger.error(f"PLUGIN_LOADER: Directory not found: {self.agents_dir}")
             return
 
         logger.info(f"PLUGIN_LOADER: Scanning {self.agents_dir}...")
-        count = 0
-        for root, _dirs, files in os.walk(self.agents_dir):
-            if "manifest.yaml" in files:
-                await self._load_agent(os.path.join(root, "manifest.yaml"))
-                count += 1
-        logger.info(f"PLUGIN_LOADER: Initial scan complete. {count} agents found.")
+        self._scan_started_at = time.monotonic()
+        self.startup_timeline = []
 
-    async def _load_agent(self, manifest_path: str):
-        logger.info(f"PLUGIN_LOADER: Loading agent bundle from {manifest_path}")
+        manifests = [
+            os.path.join(root, "manifest.yaml") for root, _dirs, files in os.walk(self.agents_dir) if "manifest.yaml" in files
+        ]
+        snapshots = await asyncio.gather(*(asyncio.to_thread(self._snapshot, m) for m in manifests))
+        bundles = [bundle for _digest, bundle in snapshots]
+
+        # Dependency graph: an agent waits for the agents listed in its `depends_on` to be ready.
+        names = {b["name"] for b in bundles if b}
+        ready = {name: asyncio.Event() for name in names}
+        deps: dict[str, list[str]] = {}
+        for bundle in bundles:
+            if not bundle:
+                continue
+            wanted = bundle.get("depends_on") or []
+            missing = [d for d in wanted if d not in names]
+            if missing:
+                logger.warning(f"PLUGIN_LOADER: {bundle['name']} depends on unknown agents {missing}, ignoring them.")
+            deps[bundle["name"]] = [d for d in wanted if d in names and d != bundle["name"]]
+        for name in self._find_cycle_members(deps):
+            logger.warning(f"PLUGIN_LOADER: Dependency cycle involving {name}, loading it without waiting.")
+            deps[name] = []
+
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_loads))
+
+        async def _load(manifest_path: str, digest: str, bundle: dict[str, Any]):
+            name = bundle["name"]
+            try:
+                waited = time.monotonic()
+                for dep in deps.get(name, []):
+                    await ready[dep].wait()
+                if deps.get(name):
+                    self._record(name, "wait_deps", waited)
+                async with semaphore:
+                    await self._load_agent(manifest_path, bundle, digest)
+            finally:
+                ready[name].set()
+
+        await asyncio.gather(
+            *(_load(m, digest, b) for m, (digest, b) in zip(manifests, snapshots) if b), return_exceptions=True
+        )
+
+        total_ms = round((time.monotonic() - self._scan_started_at) * 1000, 1)
+        logger.info(f"PLUGIN_LOADER: Initial scan complete. {len(manifests)} agents found in {total_ms}ms.")
+        for entry in self.startup_timeline:
+            logger.info(
+                f"PLUGIN_LOADER_TIMELINE: {entry['agent']:<12} {entry['phase']:<10} "
+                f"+{entry['start_ms']:>8.1f}ms {entry['duration_ms']:>8.1f}ms"
+            )
+
+    @staticmethod
+    def _find_cycle_members(deps: dict[str, list[str]]) -> set[str]:
+        """Returns agents that are part of (or depend on) a dependency cycle."""
+        state: dict[str, int] = {}
+        cyclic: set[str] = set()
+
+        def visit(node: str, stack: list[str]):
+            if state.get(node) == 1:
+                cyclic.update(stack[stack.index(node) :])
+                return
+            if state.get(node) == 2:
+                return
+            state[node] = 1
+            stack.append(node)
+            for dep in deps.get(node, []):
+                visit(dep, stack)
+            stack.pop()
+            state[node] = 2
+
+        for node in deps:
+            visit(node, [])
+        return cyclic
+
+    @staticmethod
+    def _bundle_digest(agent_dir: str) -> str:
+        """SHA-256 over the files that define an agent, used to skip no-op reloads."""
+        h = hashlib.sha256()
+        for filename in AgentFileHandler.WATCHED_FILES:
+            path = os.path.join(agent_dir, filename)
+            h.update(filename.encode())
+            try:
+                with open(path, "rb") as f:
+                    h.update(f.read())
+            except FileNotFoundError:
+                h.update(b"<missing>")
+        return h.hexdigest()
+
+    def _snapshot(self, manifest_path: str) -> tuple[str, dict[str, Any] | None]:
+        # Hash first: if a file changes while we read it, the next event sees a different digest.
+        digest = self._bundle_digest(os.path.dirname(manifest_path))
+        return digest, self._read_bundle(manifest_path)
+
+    def schedule_reload(self, agent_dir: str):
+        """Coalesces file events for one agent directory into a single reload after the debounce window."""
+        agent_dir = os.path.abspath(agent_dir)
+        pending = self._pending_reloads.pop(agent_dir, None)
+        if pending:
+            pending.cancel()
+        loop = asyncio.get_running_loop()
+        self._pending_reloads[agent_dir] = loop.call_later(
+            self.reload_debounce, lambda: self._spawn_background(self._reload_agent(agent_dir))
+        )
+
+    async def _reload_agent(self, agent_dir: str):
+        self._pending_reloads.pop(agent_dir, None)
+        lock = self._reload_locks.setdefault(agent_dir, asyncio.Lock())
+        async with lock:
+            manifest_path = os.path.join(agent_dir, "manifest.yaml")
+            if not os.path.exists(manifest_path):
+                return
+            digest, bundle = await asyncio.to_thread(self._snapshot, manifest_path)
+            if bundle is None:
+                return
+            if self._bundle_hashes.get(agent_dir) == digest:
+                logger.info(f"PLUGIN_LOADER: {agent_dir} unchanged, skipping reload.")
+                return
+            logger.info(f"PLUGIN_LOADER: Reloading {bundle['name']} after file changes.")
+            await self._load_agent(manifest_path, bundle, digest)
+
+    def _read_bundle(self, manifest_path: str) -> dict[str, Any] | None:
+        """Reads manifest.yaml and persona.yaml into the combined agent definition (blocking I/O)."""
         try:
             agent_dir = os.path.dirname(manifest_path)
-            
+
             with open(manifest_path) as f:
                 manifest_data = yaml.safe_load(f) or {}
-            
+
             persona_path = os.path.join(agent_dir, "persona.yaml")
             persona_data = {}
             if os.path.exists(persona_path):
                 with open(persona_path) as f:
                     persona_data = yaml.safe_load(f) or {}
-            
+
             combined_data = {**manifest_data, **persona_data}
             if "system_prompt" in combined_data and "prompt" not in combined_data:
                 combined_data["prompt"] = combined_data.pop("system_prompt")
-            
+
             if "name" not in combined_data and "id" in combined_data:
                 combined_data["name"] = combined_data["id"]
 
             if not combined_data.get("name"):
                 logger.error(f"PLUGIN_LOADER: Missing 'name' or 'id' in {manifest_path}")
-                return
+                return None
 
             if "role" not in combined_data:
                 combined_data["role"] = "Unknown"
+            return combined_data
+        except Exception as e:
+            logger.error(f"PLUGIN_LOADER: Failed to read agent bundle {manifest_path}: {e}")
+            return None
+
+    async def _publish_ready(self, instance: Any, load_ms: float):
+        event = {
+            "type": "agent.ready",
+            "sender": {"agent_id": "core", "role": "system"},
+            "recipient": {"target": "broadcast"},
+            "payload": {"content": {"agent_id": instance.config.name, "load_ms": load_ms}},
+        }
+        try:
+            res = self.redis.publish_event("system_stream", event)
+            if inspect.isawaitable(res):
+                await res
+        except Exception as e:
+            logger.warning(f"PLUGIN_LOADER: Could not publish readiness for {instance.config.name}: {e}")
+
+        if self.on_agent_ready:
+            try:
+                res = self.on_agent_ready(instance)
+                if inspect.isawaitable(res):
+                    await res
+            except Exception as e:
+                logger.error(f"PLUGIN_LOADER: on_agent_ready failed for {instance.config.name}: {e}")
+
+    async def _load_agent(
+        self, manifest_path: str, combined_data: dict[str, Any] | None = None, digest: str | None = None
+    ):
+        logger.info(f"PLUGIN_LOADER: Loading agent bundle from {manifest_path}")
+        started = time.monotonic()
+        try:
+            agent_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+            if combined_data is None:
+                digest, combined_data = await asyncio.to_thread(self._snapshot, manifest_path)
+                if combined_data is None:
+                    return
 
             config = AgentConfig.model_validate(combined_data)
-            
+
             agent_llm = self.llm
             if config.llm_config:
                 from src.infrastructure.llm import LlmClient
@@ -127,7 +329,7 @@ class PluginLoader:
 
             agent_class = None
             logic_path = os.path.join(agent_dir, "logic.py")
-            
+
             if os.path.exists(logic_path):
                 try:
                     spec = importlib.util.spec_from_file_location(f"agent_logic_{config.name.replace('-', '_')}", logic_path)
@@ -153,20 +355,30 @@ class PluginLoader:
                 visual_service=self.visual_service,
                 token_tracking_service=self.token_tracking_service
             )
-            
-            if config.name in self.registry.agents:
-                old_agent = self.registry.agents[config.name]
-                await old_agent.stop()
+            self._record(config.name, "build", started)
+
+            # Start the replacement before retiring the old instance so the agent never goes
+            # unanswered; the old one finishes in-flight messages in the background.
+            old_agent = self.registry.agents.get(config.name)
 
+            start_at = time.monotonic()
             await instance.start()
             self.registry.add_agent(instance)
+            self._record(config.name, "start", start_at)
+            if digest:
+                self._bundle_hashes[agent_dir] = digest
+
+            if old_agent is not None and old_agent is not instance:
+                retire = getattr(old_agent, "retire", None)
+                self._spawn_background(retire() if retire else old_agent.stop())
+            await self._publish_ready(instance, round((time.monotonic() - started) * 1000, 1))
 
-            # STORY 25.1 DEVIATION: Automatic Avatar Bootstrap
+            # STORY 25.1 DEVIATION: Automatic Avatar Bootstrap (deferred, never blocks readiness)
             if self.visual_service and config.name.lower() not in ["dieu", "system"]:
                 ref_path = os.path.join(agent_dir, "media", "character_sheet_neutral.png")
                 if not os.path.exists(ref_path):
                     description = config.prompt or config.role or "A unique AI persona"
-                    asyncio.create_task(self.visual_service.bootstrap_agent_avatar(config.name, description))
+                    self._spawn_background(self.visual_service.bootstrap_agent_avatar(config.name, description))
 
         except Exception as e:
             logger.error(f"PLUGIN_LOADER: Failed to load agent {manifest_path}: {e}")
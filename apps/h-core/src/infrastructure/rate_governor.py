@@ -0,0 +1,272 @@
+"""
+Shared rate governor for LLM calls.
+
+Every `LlmClient` request takes a slot from the limiter of its provider/model
+before calling out. A limiter combines a requests-per-minute bucket, a
+tokens-per-minute bucket, a concurrency cap and a priority queue, so
+interactive replies are served before inter-agent discussion, and both
+before background work (consolidation, backstories). 429 responses pause the
+limiter (honouring Retry-After) and halve its concurrency; successes grow it
+back one slot at a time.
+
+Limits come from LLM_RPM, LLM_TPM and LLM_MAX_CONCURRENCY (0 = unlimited),
+with per-provider or per-model overrides in LLM_RATE_LIMITS, e.g.
+`{"openrouter": {"rpm": 20, "tpm": 60000, "concurrency": 2}}`.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import random
+import time
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Lower number = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DISCUSSION = 1
+PRIORITY_BACKGROUND = 2
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_DISCUSSION: "discussion", PRIORITY_BACKGROUND: "background"}
+
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `capacity`; `rate` None means unlimited."""
+
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else (rate * 60 if rate else 0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: Optional[float] = None) -> float:
+        """Seconds until `amount` can be taken (0 when it can be now)."""
+        if not self.rate:
+            return 0.0
+        now = now or time.monotonic()
+        self._refill(now)
+        # A request bigger than the bucket waits for a full bucket rather than forever
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Takes `amount`; negative amounts refund. The level may go below zero (debt)."""
+        if not self.rate:
+            return
+        self._refill(time.monotonic())
+        self.level = min(self.capacity, self.level - amount)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+    name = type(error).__name__
+    return "RateLimit" in name or "429" in str(error) or "rate limit" in str(error).lower()
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Retry-After from the provider response, when the SDK exposes it."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Lease:
+    """One granted slot. Release it with the actual token usage when the call ends."""
+
+    def __init__(self, limiter: "ProviderLimiter", estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.released = False
+
+    def release(self, used_tokens: Optional[int] = None, error: Optional[BaseException] = None) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.limiter._release(self, used_tokens, error)
+
+
+class ProviderLimiter:
+    def __init__(self, key: str, rpm: float = 0, tpm: float = 0, concurrency: int = 0):
+        self.key = key
+        self.requests = TokenBucket(rpm / 60 if rpm else None)
+        self.tokens = TokenBucket(tpm / 60 if tpm else None)
+        self.max_concurrency = concurrency or 0
+        # Adaptive cap (AIMD): halved on 429, +1 per success, never above the configured cap
+        self.concurrency = concurrency or 0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.consecutive_429 = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._seq = count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._metrics = get_metrics()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, estimated_tokens: int = 0) -> Lease:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), estimated_tokens, fut))
+        started = time.monotonic()
+        self._pump()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just as we were cancelled: give the slot back
+                self._release(Lease(self, estimated_tokens), 0, None)
+            raise
+        waited = time.monotonic() - started
+        self._metrics.observe(
+            "llm_queue_wait_seconds", waited, labels={"priority": _PRIORITY_NAMES.get(priority, str(priority))}
+        )
+        return Lease(self, estimated_tokens)
+
+    def _pump(self) -> None:
+        """Grants slots in priority order while concurrency, pause and buckets allow."""
+        now = time.monotonic()
+        while self._waiters:
+            _, _, tokens, fut = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.concurrency and self.in_flight >= self.concurrency:
+                return  # a release pumps again
+            wait = max(self.paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.in_flight += 1
+            fut.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
+
+    def _release(self, lease: Lease, used_tokens: Optional[int], error: Optional[BaseException]) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        if used_tokens is not None:
+            # Settle the estimate against what the provider actually counted
+            self.tokens.consume(used_tokens - lease.estimated_tokens)
+        if error is not None and is_rate_limit_error(error):
+            self.on_rate_limited(retry_after_seconds(error))
+        elif error is None:
+            self.consecutive_429 = 0
+            if self.max_concurrency and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+        try:
+            self._pump()
+        except RuntimeError:
+            pass  # no running loop (released during shutdown)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self.consecutive_429 += 1
+        backoff = min(60.0, 2.0 ** self.consecutive_429) * random.uniform(0.8, 1.2)
+        delay = max(retry_after or 0.0, backoff)
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        if self.concurrency > 1:
+            self.concurrency = max(1, self.concurrency // 2)
+        elif not self.concurrency:
+            # Unlimited until now: clamp to what was in flight when the provider pushed back
+            self.max_concurrency = max(1, self.in_flight + 1)
+            self.concurrency = max(1, self.max_concurrency // 2)
+        self._metrics.increment("llm_rate_limited_total", labels={"model": self.key})
+        logger.warning(
+            f"RATE_GOVERNOR: {self.key} returned 429; pausing {delay:.1f}s, concurrency now {self.concurrency}."
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "concurrency": self.concurrency or None,
+            "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 1),
+        }
+
+
+class RateGovernor:
+    """Registry of per provider/model limiters."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        if limits is None:
+            try:
+                limits = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+            except ValueError:
+                logger.error("RATE_GOVERNOR: LLM_RATE_LIMITS is not valid JSON; using defaults.")
+                limits = {}
+        self.limits = limits
+        self.defaults = {
+            "rpm": float(os.getenv("LLM_RPM", "0")),
+            "tpm": float(os.getenv("LLM_TPM", "0")),
+            "concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+        }
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    def _limits_for(self, model: str) -> Dict[str, float]:
+        provider = model.split("/", 1)[0]
+        merged = dict(self.defaults)
+        merged.update(self.limits.get(provider, {}))
+        merged.update(self.limits.get(model, {}))
+        return merged
+
+    def limiter(self, model: str) -> ProviderLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limits = self._limits_for(model)
+            limiter = ProviderLimiter(
+                model, rpm=limits.get("rpm", 0), tpm=limits.get("tpm", 0), concurrency=int(limits.get("concurrency", 0))
+            )
+            self._limiters[model] = limiter
+        return limiter
+
+    async def acquire(self, model: str, priority: int = PRIORITY_INTERACTIVE, estimated_tokens: int = 0) -> Lease:
+        return await self.limiter(model).acquire(priority, estimated_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: limiter.stats() for key, limiter in self._limiters.items()}
+
+
+_governor: Optional[RateGovernor] = None
+
+
+def get_rate_governor() -> RateGovernor:
+    global _governor
+    if _governor is None:
+        _governor = RateGovernor()
+    return _governor
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], completion_tokens: Optional[int] = None) -> int:
+    """Rough prompt + completion estimate (~4 characters per token) used until the real usage is known."""
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    if completion_tokens is None:
+        completion_tokens = int(os.getenv("LLM_EST_COMPLETION_TOKENS", "256"))
+    return chars // 4 + completion_tokens
@@ -1,11 +1,12 @@
 import asyncio
-import json
 import logging
 from collections.abc import Callable, Coroutine
 from typing import Any, Optional, Dict
 
 import redis.asyncio as redis
 
+from src.models.hlink_codec import decode_entry, dumps_text, encode_entry, loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,15 +43,8 @@ class RedisClient:
                 return
 
         try:
-            # Flatten dict for Redis Stream
-            payload = {}
-            for k, v in data.items():
-                if isinstance(v, (dict, list)):
-                    payload[k] = json.dumps(v)
-                else:
-                    payload[k] = str(v)
-
-            await self.client.xadd(stream, payload, maxlen=max_len, approximate=True)
+            # One versioned field per entry (see hlink_codec); HLINK_WIRE_FORMAT=legacy flattens per key
+            await self.client.xadd(stream, encode_entry(data), maxlen=max_len, approximate=True)
             logger.info(f"STREAM_ADD: {stream} | Type: {data.get('type')}")
         except Exception as e:
             logger.error(f"Failed to add to stream {stream}: {e}")
@@ -84,21 +78,8 @@ class RedisClient:
                     for s_name, msgs in messages:
                         for m_id, m_data in msgs:
                             try:
-                                # De-serialize values
-                                decoded_data = {}
-                                for k, v in m_data.items():
-                                    if isinstance(v, str) and (v.startswith("{") or v.startswith("[")):
-                                        try:
-                                            decoded_data[k] = json.loads(v)
-                                        except:
-                                            decoded_data[k] = v
-                                    else:
-                                        decoded_data[k] = v
-
-                                # Compatibility Check: If it's a wrapped message {"type": ..., "data": "..."}
-                                if "data" in decoded_data and "type" in decoded_data and len(decoded_data) == 2:
-                                    if isinstance(decoded_data["data"], dict):
-                                        decoded_data = decoded_data["data"]
+                                # Single parse into a dict view; validation is left to the handler
+                                decoded_data = decode_entry(m_data)
 
                                 # FIX: ALWAYS pass the DICT to the handler
                                 # (Do not wrap in HLinkMessage here, let the handler decide)
@@ -133,7 +114,7 @@ class RedisClient:
             if hasattr(message, "model_dump_json"):
                 data = message.model_dump_json()
             elif isinstance(message, dict):
-                data = json.dumps(message)
+                data = dumps_text(message)
             else:
                 data = str(message)
 
@@ -153,7 +134,7 @@ class RedisClient:
                         msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
                         if msg and msg["type"] == "message":
                             try:
-                                data = json.loads(msg["data"])
+                                data = loads(msg["data"])
                                 # FIX: ALWAYS pass the DICT to the handler
                                 await handler(data)
                             except Exception as e:
@@ -2,7 +2,7 @@ import asyncio
 import logging
 import os
 import inspect
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, List, Optional, Dict
 
 try:
@@ -10,6 +10,9 @@ try:
 except ImportError:
     Surreal = None
 
+from src.models.hlink import MessageType
+from src.services.metrics import get_metrics
+
 SURREAL_AVAILABLE = Surreal is not None
 
 logger = logging.getLogger(__name__)
@@ -24,6 +27,9 @@ class SurrealDbClient:
         self.db = db
         self.client: Optional[Surreal] = None
         self._stop_event = asyncio.Event()
+        # Set by the orchestrator to its RedisClient: fact writes and removals are then announced on
+        # system_stream, whoever made them, so read models such as the bridge's history window stay current
+        self.events = None
 
     async def _call(self, method_name: str, *args, **kwargs) -> Any:
         """Robust wrapper for SurrealDB client calls with auto-reconnect."""
@@ -34,9 +40,10 @@ class SurrealDbClient:
 
         try:
             method = getattr(self.client, method_name)
-            res = method(*args, **kwargs)
-            if inspect.isawaitable(res):
-                res = await res
+            with get_metrics().timer("db_call_seconds", {"method": method_name}):
+                res = method(*args, **kwargs)
+                if inspect.isawaitable(res):
+                    res = await res
 
             return res
         except Exception as e:
@@ -50,9 +57,24 @@ class SurrealDbClient:
                     logger.error(f"SURREAL_RETRY_FAILED: {retry_e}")
                     return None
 
+            get_metrics().increment("db_errors_total", labels={"method": method_name})
             logger.error(f"SURREAL_ERROR: {method_name} failed: {e}")
             return None
 
+    async def _announce(self, msg_type: MessageType, content: Dict[str, Any]) -> None:
+        if self.events is None:
+            return
+        event = {
+            "type": msg_type.value,
+            "sender": {"agent_id": "system", "role": "orchestrator"},
+            "recipient": {"target": "broadcast"},
+            "payload": {"content": content},
+        }
+        try:
+            await self.events.publish_event("system_stream", event)
+        except Exception as e:
+            logger.warning(f"SURREAL: Could not announce {msg_type.value}: {e}")
+
     async def connect(self):
         """Connect to SurrealDB."""
         if not SURREAL_AVAILABLE:
@@ -127,6 +149,7 @@ class SurrealDbClient:
             DEFINE TABLE IF NOT EXISTS subject SCHEMAFULL;
             DEFINE FIELD IF NOT EXISTS name ON TABLE subject TYPE string;
             DEFINE FIELD IF NOT EXISTS description ON TABLE subject TYPE string;
+            DEFINE FIELD IF NOT EXISTS backstory_hash ON TABLE subject TYPE option<string>;
             DEFINE INDEX IF NOT EXISTS subject_name ON TABLE subject FIELDS name UNIQUE;
 
             DEFINE TABLE IF NOT EXISTS concept SCHEMAFULL;
@@ -146,6 +169,7 @@ class SurrealDbClient:
             DEFINE FIELD IF NOT EXISTS last_accessed ON TABLE BELIEVES TYPE datetime DEFAULT time::now();
             DEFINE FIELD IF NOT EXISTS permanent ON TABLE BELIEVES TYPE bool DEFAULT false;
             DEFINE FIELD IF NOT EXISTS last_reinforced ON TABLE BELIEVES TYPE datetime DEFAULT time::now();
+            DEFINE FIELD IF NOT EXISTS source ON TABLE BELIEVES TYPE option<string>;
 
             DEFINE TABLE IF NOT EXISTS ABOUT SCHEMAFULL;
             DEFINE TABLE IF NOT EXISTS CAUSED SCHEMAFULL;
@@ -254,6 +278,9 @@ class SurrealDbClient:
                 - user_id: Optional user ID
                 - user_name: Optional user name
                 - permanent: If True, fact will not decay (for identity facts)
+                - source: Optional origin tag on the BELIEVES edge (e.g. "backstory")
+
+        Returns the new fact's record id, or None when nothing was stored.
         """
         subject_name = fact_data.get("subject", "user")
         agent_name = fact_data.get("agent", "system")
@@ -263,6 +290,7 @@ class SurrealDbClient:
         user_id = fact_data.get("user_id")
         user_name = fact_data.get("user_name")
         permanent = fact_data.get("permanent", False)
+        source = fact_data.get("source")
 
         sid = f"subject:`{subject_name.lower().replace(' ', '_')}`"
         aid = f"subject:`{agent_name.lower().replace(' ', '_')}`"
@@ -304,13 +332,64 @@ class SurrealDbClient:
             # Include permanent flag in the BELIEVES edge
             await self._call(
                 "query",
-                f"RELATE {aid}->BELIEVES->{fid} SET confidence = $conf, strength = 1.0, last_accessed = time::now(), permanent = $permanent, last_reinforced = time::now();",
-                {"conf": confidence, "permanent": permanent},
+                f"RELATE {aid}->BELIEVES->{fid} SET confidence = $conf, strength = 1.0, last_accessed = time::now(), permanent = $permanent, last_reinforced = time::now(), source = $source;",
+                {"conf": confidence, "permanent": permanent, "source": source},
             )
             await self._call("query", f"RELATE {fid}->ABOUT->{sid};")
+            fact = {
+                "id": str(fid),
+                "content": fact_content,
+                "agent": agent_name,
+                "subject": subject_name,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            await self._announce(MessageType.MEMORY_FACTS_ADDED, {"facts": [fact]})
+            return fid
         except Exception as e:
             logger.error(f"Failed to insert graph memory: {e}")
 
+    async def get_backstory_hash(self, agent_name: str) -> Optional[str]:
+        """Hash of the persona inputs the agent's current backstory was generated from, if any."""
+        aid = f"subject:`{agent_name.lower().replace(' ', '_')}`"
+        try:
+            res = await self._call("query", f"SELECT backstory_hash FROM {aid};")
+            rows = res[0].get("result", []) if res and isinstance(res[0], dict) and "result" in res[0] else res
+            if rows and isinstance(rows, list) and isinstance(rows[0], dict):
+                return rows[0].get("backstory_hash")
+        except Exception as e:
+            logger.error(f"Failed to read backstory hash for {agent_name}: {e}")
+        return None
+
+    async def supersede_backstory(self, agent_name: str, backstory_hash: str, keep: List[Any]) -> bool:
+        """
+        Makes the facts in `keep` the agent's only backstory: earlier backstory facts
+        (and their edges) are deleted and the persona hash is recorded, all in one
+        transaction. If it fails nothing is written, the hash included, so the
+        next startup simply redoes the run. Returns whether it was committed.
+
+        Backstories seeded before edges carried a `source` are adopted first: a
+        permanent, untagged belief of the agent about itself can only come from
+        an earlier backstory run, so it is tagged and superseded with the rest.
+        """
+        aid = f"subject:`{agent_name.lower().replace(' ', '_')}`"
+        kept = ", ".join(str(fid) for fid in keep)
+        statements = [
+            "BEGIN TRANSACTION;",
+            f"UPDATE BELIEVES SET source = 'backstory' WHERE in = {aid} AND source = NONE "
+            f"AND permanent = true AND {aid} IN out->ABOUT->subject;",
+            f"DELETE fact WHERE id IN (SELECT VALUE out FROM BELIEVES WHERE in = {aid} AND source = 'backstory') "
+            f"AND id NOT IN [{kept}];",
+            f"INSERT INTO subject (id, name, backstory_hash) VALUES ({aid}, $name, $hash) "
+            f"ON DUPLICATE KEY UPDATE backstory_hash = $hash;",
+            "COMMIT TRANSACTION;",
+        ]
+        res = await self._call("query", "\n".join(statements), {"name": agent_name, "hash": backstory_hash})
+        if res is None or any(isinstance(r, dict) and r.get("status") == "ERR" for r in res):
+            logger.error(f"Failed to supersede backstory for {agent_name}: {res}")
+            return False
+        await self._announce(MessageType.MEMORY_FACTS_REMOVED, {"agent": agent_name})
+        return True
+
     async def persist_message(self, message: Dict[str, Any]):
         """Save a message to SurrealDB."""
         data = {
@@ -418,6 +497,8 @@ class SurrealDbClient:
                 deleted = result[0].get("result", []) if isinstance(result[0], dict) else result
                 count = len(deleted) if isinstance(deleted, list) else 0
                 logger.info(f"CLEANUP: {count} orphaned facts removed")
+                if count:
+                    await self._announce(MessageType.MEMORY_FACTS_REMOVED, {"count": count})
                 return count
             return 0
         except Exception as e:
@@ -46,7 +46,20 @@ class RedisLogHandler(logging.Handler):
 
 
 class HaremOrchestrator:
+    UNROUTED_TYPES = frozenset(
+        {
+            "system.log",
+            "whisper_status",
+            "system.heartbeat",
+            "agent.ready",
+            "audio.chunk",
+            "memory.facts_added",
+            "memory.facts_removed",
+        }
+    )
+
     def __init__(self):
+        imports_started = time.perf_counter()
         try:
             from src.infrastructure.redis import RedisClient
             from src.infrastructure.surrealdb import SurrealDbClient
@@ -80,12 +93,17 @@ class HaremOrchestrator:
             logger.error(f"INIT: Import error: {e}")
             raise e
 
+        from src.utils.lazy import record_import
+
+        record_import("h-core.startup", (time.perf_counter() - imports_started) * 1000)
+
         self.redis = self.RedisClient(host=os.getenv("REDIS_HOST", "redis"))
         self.surreal = self.SurrealDbClient(
             url=os.getenv("SURREALDB_URL", "ws://surrealdb:8000/rpc"),
             user=os.getenv("SURREALDB_USER", "root"),
             password=os.getenv("SURREALDB_PASS", "root"),
         )
+        self.surreal.events = self.redis
         self.llm = self.LlmClient()
 
         # System LLM for social arbiter (immutable defaults)
@@ -127,6 +145,10 @@ class HaremOrchestrator:
 
                 # Check LLM
                 from src.infrastructure.llm import LITELLM_AVAILABLE
+                from src.utils.lazy import get_import_profile
+                from src.infrastructure.llm_resilience import provider_health_stats
+                from src.infrastructure.llm_response_cache import get_response_cache
+                from src.infrastructure.rate_governor import get_rate_governor
 
                 if LITELLM_AVAILABLE:
                     health["llm"] = "ok"
@@ -167,7 +189,15 @@ class HaremOrchestrator:
                     "type": "system.heartbeat",
                     "sender": {"agent_id": "core", "role": "system"},
                     "payload": {
-                        "content": {"health": health, "agents": agents_stats, "world": {"theme": current_theme}}
+                        "content": {
+                            "health": health,
+                            "agents": agents_stats,
+                            "world": {"theme": current_theme},
+                            "import_profile": get_import_profile()[:10],
+                            "llm_limits": get_rate_governor().stats(),
+                            "llm_health": provider_health_stats(),
+                            "llm_cache": get_response_cache().stats(),
+                        }
                     },
                 }
                 await self.redis.publish_event("system_stream", heartbeat)
@@ -175,17 +205,24 @@ class HaremOrchestrator:
                 logger.error(f"HEARTBEAT_FAIL: {e}")
             await asyncio.sleep(5)
 
+    async def _publish_to_agent(self, agent_id: str, msg):
+        msg.metadata.sent_at = time.time()
+        await self.redis.publish(f"agent:{agent_id}", msg)
+
     async def handle_message(self, data: dict):
         from src.models.hlink import HLinkMessage
+        from src.models.hlink_codec import HLinkView
+        from src.services.tracing import get_tracer
 
         try:
             msg_type = data.get("type")
-            # Skip logs and noise immediately
-            if not msg_type or msg_type in ["system.log", "whisper_status", "system.heartbeat"]:
+            # Skip logs, noise and UI-only output (audio, read-model updates) before any validation
+            if not msg_type or msg_type in self.UNROUTED_TYPES:
                 return
 
             logger.error(f"📩 ORCHESTRATOR: Processing {msg_type}")
-            msg, error = HLinkMessage.validate_message(data)
+            # Stream entries arrive as views that validate lazily (and only once); plain dicts from direct callers
+            msg, error = data.validate_message() if isinstance(data, HLinkView) else HLinkMessage.validate_message(data)
             if error:
                 logger.error(f"❌ VALIDATION ERROR: {error}")
                 return
@@ -260,17 +297,17 @@ class HaremOrchestrator:
                 dynamic_threshold = 0.75 + (5 - self.discussion_budget) * 0.05
 
                 elapsed_turns = self.MAX_DISCUSSION_BUDGET - self.discussion_budget
-                responders = await self.social_arbiter.determine_responder_async(
-                    content, min_threshold_override=dynamic_threshold, discussion_turn=elapsed_turns
-                )
+                with get_tracer().span(msg.metadata.trace_id, "core.arbiter", turn=elapsed_turns):
+                    responders = await self.social_arbiter.determine_responder_async(
+                        content, min_threshold_override=dynamic_threshold, discussion_turn=elapsed_turns
+                    )
                 if responders:
                     for p in responders:
                         # Don't let agent talk to themselves
                         if p.agent_id != msg.sender.agent_id:
                             logger.error(f"📢 INTER-AGENT: {msg.sender.agent_id} -> {p.agent_id}")
-                            # Add a larger delay to avoid rate limits
-                            await asyncio.sleep(5)
-                            await self.redis.publish(f"agent:{p.agent_id}", msg)
+                            # No fixed delay: the agent's LLM call waits on the rate governor at discussion priority
+                            await self._publish_to_agent(p.agent_id, msg)
 
             if target == "user":
                 # Message is already sent to UI via system_stream by the agent itself
@@ -278,32 +315,79 @@ class HaremOrchestrator:
 
             if target == "broadcast" or target == "all":
                 logger.error("👥 Calling SocialArbiter...")
-                responders = await self.social_arbiter.determine_responder_async(content)
+                with get_tracer().span(msg.metadata.trace_id, "core.arbiter"):
+                    responders = await self.social_arbiter.determine_responder_async(content)
                 logger.error(f"👥 ARBITER: Found {len(responders) if responders else 0} responders")
                 if responders:
                     for p in responders:
                         logger.error(f"📢 PUBLISHING to agent:{p.agent_id}")
-                        await self.redis.publish(f"agent:{p.agent_id}", msg)
+                        await self._publish_to_agent(p.agent_id, msg)
             elif target in self.agent_registry.agents:
                 logger.error(f"📢 Direct PUBLISHING to agent:{target}")
-                await self.redis.publish(f"agent:{target}", msg)
+                await self._publish_to_agent(target, msg)
         except Exception as e:
             logger.error(f"🔥 ROUTER ERROR: {e}")
 
     async def message_router(self):
         logger.error("📡 ROUTER: Worker started.")
 
-        async def handler_with_log(data):
-            # logger.error(f"!!! HANDLER CALLED WITH: {data.get('type')}")
-            await self.handle_message(data)
+        from src.services.metrics import get_metrics
+        from src.services.tracing import get_tracer, trace_context
+
+        metrics = get_metrics()
+        tracer = get_tracer()
+
+        def routed(stream: str):
+            async def handler_with_log(data):
+                trace_id, sent_at = trace_context(data)
+                with metrics.timer("router_handle_seconds", {"stream": stream}), tracer.span(
+                    trace_id, "core.route", enqueued_at=sent_at, stream=stream, type=data.get("type")
+                ):
+                    await self.handle_message(data)
+
+            return handler_with_log
 
         # Restore standard stable listeners
-        asyncio.create_task(self.redis.listen_stream("system_stream", "h-core-sys", "core-1", handler_with_log))
-        asyncio.create_task(self.redis.listen_stream("conversation_stream", "h-core-conv", "core-1", handler_with_log))
+        asyncio.create_task(self.redis.listen_stream("system_stream", "h-core-sys", "core-1", routed("system_stream")))
+        asyncio.create_task(
+            self.redis.listen_stream("conversation_stream", "h-core-conv", "core-1", routed("conversation_stream"))
+        )
 
         while not self.stop_event.is_set():
             await asyncio.sleep(1)
 
+    def _on_agent_ready(self, agent):
+        """Makes an agent addressable by the arbiter as soon as the plugin loader has started it."""
+        from src.features.home.social_arbiter.models import AgentProfile
+
+        p = AgentProfile(
+            agent_id=agent.config.name,
+            name=agent.config.name,
+            role=agent.config.role,
+            domains=agent.config.capabilities,
+            is_active=agent.is_active,
+            personified=agent.personified,
+        )
+        is_new = p.agent_id not in {a.agent_id for a in self.social_arbiter.get_registered_agents()}
+        self.social_arbiter.register_agent(p)
+        # Pass social arbiter to agent for stats tracking
+        agent.social = self.social_arbiter
+        # Backstory seeding is queued background work, skipped when the persona hash is unchanged
+        if is_new and hasattr(self, "consolidator"):
+            self.consolidator.schedule_backstory(agent.config.name, agent.config.role, agent.config.description)
+
+    async def _serve_metrics(self):
+        """Exposes GET /metrics (Prometheus text) and GET /traces/{trace_id} on METRICS_PORT."""
+        from src.services.metrics import start_metrics_server
+        from src.services.tracing import handle_trace_request
+
+        try:
+            self.metrics_server = await start_metrics_server(
+                port=int(os.getenv("METRICS_PORT", "9100")), routes=[("/traces/{trace_id}", handle_trace_request)]
+            )
+        except Exception as e:
+            logger.error(f"METRICS: Could not start /metrics endpoint: {e}")
+
     async def _background_setup(self):
         logger.info("⚙️ SETUP: Starting...")
         try:
@@ -371,27 +455,29 @@ class HaremOrchestrator:
                 self.visual_service,
                 None,
             )
+            self.plugin_loader.on_agent_ready = self._on_agent_ready
             await self.plugin_loader.start()
-
-            for agent in self.agent_registry.agents.values():
-                from src.features.home.social_arbiter.models import AgentProfile
-
-                p = AgentProfile(
-                    agent_id=agent.config.name,
-                    name=agent.config.name,
-                    role=agent.config.role,
-                    domains=agent.config.capabilities,
-                    is_active=agent.is_active,
-                    personified=agent.personified,
-                )
-                self.social_arbiter.register_agent(p)
-                # Pass social arbiter to agent for stats tracking
-                agent.social = self.social_arbiter
-                asyncio.create_task(self.consolidator.generate_backstory(agent.config.name, agent.config.role))
             logger.info("⚙️ SETUP: Completed.")
+
+            if os.getenv("HCORE_WARMUP", "true").lower() in ("1", "true", "yes"):
+                self.tasks.append(asyncio.create_task(self._warm_up()))
         except Exception as e:
             logger.error(f"SETUP_ERR: {e}")
 
+    async def _warm_up(self):
+        """Loads deferred SDKs and models in the background once the core loop is serving."""
+        from src.services.visual.bible import bible
+        from src.utils.lazy import get_import_profile
+
+        try:
+            await self.llm.warm_up()
+            await asyncio.to_thread(bible.load_all)
+            if self.visual_service and os.getenv("VISUAL_WARMUP_REMBG", "false").lower() in ("1", "true", "yes"):
+                await self.visual_service.background_remover.warm_up()
+        except Exception as e:
+            logger.warning(f"WARMUP: {e}")
+        logger.info(f"IMPORT_PROFILE: {get_import_profile()}")
+
     async def run(self):
         logger.error("🚀 BOOTING...")
         if not await self.redis.connect():
@@ -408,11 +494,17 @@ class HaremOrchestrator:
         self.tasks = [
             asyncio.create_task(self.status_heartbeat()),
             asyncio.create_task(self.message_router()),
+            asyncio.create_task(self._serve_metrics()),
             asyncio.create_task(self._background_setup()),
         ]
 
         logger.error(f"🚀 TASKS CREATED: {len(self.tasks)}")
-        await asyncio.gather(*self.tasks, return_exceptions=True)
+        try:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        finally:
+            from src.infrastructure.http import http_clients
+
+            await http_clients.aclose()
 
 
 if __name__ == "__main__":
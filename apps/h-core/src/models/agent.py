@@ -18,6 +18,8 @@ class AgentConfig(BaseModel):
     theme_responses: dict[str, dict] = Field(default_factory=dict, description="Custom reactions to world themes")
     preferred_location: str | None = Field(default=None, description="Preferred room identifier")
     voice_id: Optional[str] = None
+    common_phrases: list[str] = Field(default_factory=list, description="Routine utterances to pre-warm in the TTS cache")
+    depends_on: list[str] = Field(default_factory=list, description="Agents that must be ready before this one starts")
 
 
 class AgentInstance(BaseModel):
@@ -14,6 +14,8 @@ class MessageType(str, Enum):
     SYSTEM_LOG = "system.log"
     SYSTEM_STATUS_UPDATE = "system.status_update"
     SYSTEM_CONFIG_UPDATE = "system.config_update"
+    MEMORY_FACTS_ADDED = "memory.facts_added"
+    MEMORY_FACTS_REMOVED = "memory.facts_removed"
     AGENT_CONFIG_UPDATE = "agent.config_update"
     EXPERT_COMMAND = "expert.command"
     EXPERT_RESPONSE = "expert.response"
@@ -43,14 +45,17 @@ class MessageType(str, Enum):
     TTS_START = "tts_start"
     TTS_END = "tts_end"
     TTS_ERROR = "tts_error"
+    TTS_CANCEL = "tts_cancel"
     # Agent social signals
     AGENT_SPEAKING = "agent.speaking"
+    AGENT_READY = "agent.ready"
     SYSTEM_INACTIVITY = "system.inactivity"
     SYSTEM_WHISPER = "system.whisper"
     WORLD_THEME_CHANGED = "world.theme_changed"
 
 
 class Priority(str, Enum):
+    LOW = "low"
     NORMAL = "normal"
     HIGH = "high"
     SYSTEM = "system"
@@ -93,6 +98,8 @@ class Metadata(BaseModel):
     priority: Priority = Priority.NORMAL
     correlation_id: UUID | None = None
     ttl: int = Field(default=5, description="Prevent infinite loops")
+    trace_id: str | None = None
+    sent_at: float | None = Field(default=None, description="Epoch seconds when last enqueued, for queue-wait spans")
 
 
 class HLinkMessage(BaseModel):
@@ -0,0 +1,172 @@
+"""
+Wire codec for H-Link messages on Redis streams.
+
+A message travels as a single stream field (`h`) holding one compact JSON
+document with a schema version, instead of one JSON string per top-level key.
+Decoding is a single parse into an `HLinkView` — a plain dict with a few
+accessors — and the Pydantic model is only built when someone asks for it
+(`view.validate()`), at most once per message.
+
+orjson is used when installed, with the standard library as fallback.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.models.hlink import HLinkMessage
+
+ORJSON_AVAILABLE = orjson is not None
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+WIRE_FIELD = "h"
+VERSION_KEY = "v"
+# "legacy" keeps writing one field per key, for a rolling upgrade with older readers
+WIRE_FORMAT = os.getenv("HLINK_WIRE_FORMAT", "compact").lower()
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+def loads(raw: Any) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class HLinkView(dict):
+    """
+    A decoded message: the raw dict (handlers keep using `data.get(...)`), plus
+    cheap accessors for routing and lazy, cached Pydantic validation.
+    """
+
+    __slots__ = ("schema_version", "_model")
+
+    def __init__(self, data: Mapping[str, Any] = (), schema_version: int = SCHEMA_VERSION):
+        super().__init__(data)
+        self.schema_version = schema_version
+        self._model: Optional[HLinkMessage] = None
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.get("type")
+
+    def _section(self, key: str) -> Dict[str, Any]:
+        value = self.get(key)
+        return value if isinstance(value, dict) else {}
+
+    @property
+    def sender_id(self) -> Optional[str]:
+        return self._section("sender").get("agent_id")
+
+    @property
+    def sender_role(self) -> Optional[str]:
+        return self._section("sender").get("role")
+
+    @property
+    def target(self) -> Optional[str]:
+        return self._section("recipient").get("target")
+
+    @property
+    def trace_id(self) -> Optional[str]:
+        return self._section("metadata").get("trace_id")
+
+    def validate(self) -> HLinkMessage:
+        """Full Pydantic validation, done once; raises on an invalid message."""
+        if self._model is None:
+            self._model = HLinkMessage.model_validate(self)
+        return self._model
+
+    def validate_message(self) -> Tuple[Optional[HLinkMessage], Optional[str]]:
+        """Same contract as `HLinkMessage.validate_message`."""
+        try:
+            return self.validate(), None
+        except Exception as e:
+            return None, str(e)
+
+
+def encode(message: Any) -> bytes:
+    """One message (dict, HLinkView or HLinkMessage) to versioned wire bytes."""
+    if isinstance(message, HLinkMessage):
+        data = message.model_dump(mode="json")
+    else:
+        data = dict(message)
+    data[VERSION_KEY] = SCHEMA_VERSION
+    return dumps(data)
+
+
+def decode(raw: Any) -> HLinkView:
+    data = loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"H-Link payload is a {type(data).__name__}, not an object")
+    version = data.pop(VERSION_KEY, 0)
+    if version > SCHEMA_VERSION:
+        logger.warning(f"HLINK_CODEC: Message schema v{version} is newer than v{SCHEMA_VERSION}; decoding best-effort.")
+    return HLinkView(data, schema_version=version)
+
+
+def _legacy_fields(fields: Mapping[str, Any]) -> Dict[str, Any]:
+    """Entries written one JSON string per key (older publishers, scripts)."""
+    decoded = {}
+    for k, v in fields.items():
+        if isinstance(v, bytes):
+            v = v.decode("utf-8")
+        if isinstance(v, str) and (v.startswith("{") or v.startswith("[")):
+            try:
+                decoded[k] = loads(v)
+            except ValueError:
+                decoded[k] = v
+        else:
+            decoded[k] = v
+
+    # Compatibility Check: If it's a wrapped message {"type": ..., "data": "..."}
+    if "data" in decoded and "type" in decoded and len(decoded) == 2:
+        if isinstance(decoded["data"], dict):
+            decoded = decoded["data"]
+    return decoded
+
+
+def encode_entry(message: Any) -> Dict[str, Any]:
+    """Stream entry fields for `XADD`."""
+    if WIRE_FORMAT == "legacy":
+        data = message.model_dump(mode="json") if isinstance(message, HLinkMessage) else message
+        return {k: json.dumps(v, default=_default) if isinstance(v, (dict, list)) else str(v) for k, v in data.items()}
+    return {WIRE_FIELD: encode(message)}
+
+
+def decode_entry(fields: Mapping[str, Any]) -> HLinkView:
+    """Stream entry fields from `XREADGROUP`/`XRANGE`, in either format."""
+    raw = fields.get(WIRE_FIELD)
+    if raw is not None and len(fields) == 1:
+        return decode(raw)
+    return HLinkView(_legacy_fields(fields), schema_version=0)
@@ -3,7 +3,7 @@ import os
 from typing import Optional
 
 try:
-    import httpx
+    from src.infrastructure.http import get_http_client
 
     HTTPX_AVAILABLE = True
 except ImportError:
@@ -22,14 +22,13 @@ class ElevenLabsProvider:
         if not HTTPX_AVAILABLE or not text or not self.api_key:
             return b""
         try:
-            async with httpx.AsyncClient() as client:
-                r = await client.post(
-                    f"{_BASE_URL}/text-to-speech/{voice_id}",
-                    headers={"xi-api-key": self.api_key, "Content-Type": "application/json"},
-                    json={"text": text, "model_id": "eleven_multilingual_v2"},
-                    timeout=10.0,
-                )
-                return r.content if r.status_code == 200 else b""
+            r = await get_http_client("elevenlabs").post(
+                f"{_BASE_URL}/text-to-speech/{voice_id}",
+                headers={"xi-api-key": self.api_key, "Content-Type": "application/json"},
+                json={"text": text, "model_id": "eleven_multilingual_v2"},
+                timeout=10.0,
+            )
+            return r.content if r.status_code == 200 else b""
         except Exception as e:
             logger.warning(f"ElevenLabsProvider: {e}")
             return b""
@@ -3,7 +3,7 @@ import os
 from typing import Optional
 
 try:
-    import httpx
+    from src.infrastructure.http import get_http_client
 
     HTTPX_AVAILABLE = True
 except ImportError:
@@ -20,13 +20,12 @@ class MeloTtsProvider:
         if not HTTPX_AVAILABLE or not text:
             return b""
         try:
-            async with httpx.AsyncClient() as client:
-                r = await client.post(
-                    f"{self.base_url}/synthesize",
-                    json={"text": text, "voice_id": voice_id},
-                    timeout=timeout_ms / 1000,
-                )
-                return r.content if r.status_code == 200 else b""
+            r = await get_http_client("melotts").post(
+                f"{self.base_url}/synthesize",
+                json={"text": text, "voice_id": voice_id},
+                timeout=timeout_ms / 1000,
+            )
+            return r.content if r.status_code == 200 else b""
         except Exception as e:
             logger.warning(f"MeloTtsProvider: {e}")
             return b""
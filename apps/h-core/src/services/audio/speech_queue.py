@@ -1,6 +1,25 @@
 import asyncio
+import heapq
+import inspect
+import logging
+import os
+import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Lower number = more urgent
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_PROACTIVE = 2
+
+DEFAULT_ROOM = "default"
+
+# Added to the estimated speaking time before an unacknowledged item stops counting as playing
+PLAYBACK_MARGIN_S = 2.0
 
 
 @dataclass
@@ -9,36 +28,182 @@ class SpeechRequest:
     agent_id: str
     priority: int = 1
     voice_id: Optional[str] = None
+    # Room or output device the utterance is for; each one has its own queue
+    room: Optional[str] = None
+    # Seconds the utterance stays worth saying; None uses the per-priority default
+    ttl: Optional[float] = None
+    created_at: float = field(default_factory=time.monotonic, compare=False, repr=False)
+    preempted: asyncio.Event = field(default_factory=asyncio.Event, compare=False, repr=False)
+    # Set on dequeue: when the utterance is assumed finished if the player never calls done()
+    playing_until: Optional[float] = field(default=None, compare=False, repr=False)
     _counter: int = field(default=0, compare=False, repr=False)
 
+    @property
+    def deadline(self) -> Optional[float]:
+        return self.created_at + self.ttl if self.ttl is not None else None
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        deadline = self.deadline
+        return deadline is not None and (now or time.monotonic()) > deadline
+
 
 class SpeechQueue:
-    def __init__(self):
-        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    """
+    Speech scheduler: one priority queue per room/device.
+
+    Utterances carry a deadline (their own TTL or a per-priority default, so a
+    proactive whisper from minutes ago is dropped instead of played), and the
+    item being played in a room is preempted when something strictly more urgent
+    arrives for that room: its `preempted` event is set and `on_preempt` is
+    called so the player can stop audio. With merging enabled, consecutive
+    queued utterances from the same agent are spoken as one.
+
+    A dequeued item counts as playing until the player calls `done()`, or at
+    most for its estimated speaking time (SPEECH_CHARS_PER_S), so a player that
+    never reports back cannot leave a stale item to be preempted later.
+    """
+
+    def __init__(
+        self,
+        on_preempt: Optional[Callable[[SpeechRequest], Any]] = None,
+        merge_consecutive: Optional[bool] = None,
+        default_ttls: Optional[Dict[int, float]] = None,
+    ):
+        self._queues: Dict[str, List[Tuple[int, int, SpeechRequest]]] = {}
+        self._tails: Dict[str, SpeechRequest] = {}
+        self._playing: Dict[str, SpeechRequest] = {}
         self._counter = 0
+        self._wakeup = asyncio.Event()
         self._stop_event = asyncio.Event()
         self.is_interrupted: bool = False
+        self.on_preempt = on_preempt
+        if merge_consecutive is None:
+            merge_consecutive = os.getenv("SPEECH_MERGE_CONSECUTIVE", "false").lower() in ("1", "true", "yes")
+        self.merge_consecutive = merge_consecutive
+        self.default_ttls = (
+            default_ttls
+            if default_ttls is not None
+            else {PRIORITY_PROACTIVE: float(os.getenv("SPEECH_PROACTIVE_TTL_S", "30"))}
+        )
+        self.chars_per_second = float(os.getenv("SPEECH_CHARS_PER_S", "14"))
+        self._metrics = get_metrics()
+
+    def estimated_duration(self, request: SpeechRequest) -> float:
+        return len(request.text) / self.chars_per_second + PLAYBACK_MARGIN_S
+
+    def _current(self, room: str) -> Optional[SpeechRequest]:
+        playing = self._playing.get(room)
+        if playing is not None and playing.playing_until is not None and time.monotonic() > playing.playing_until:
+            del self._playing[room]
+            return None
+        return playing
 
     async def enqueue(self, request: SpeechRequest) -> None:
         self.is_interrupted = False
+        room = request.room or DEFAULT_ROOM
+        if request.ttl is None:
+            request.ttl = self.default_ttls.get(request.priority)
+
+        tail = self._tails.get(room)
+        if (
+            self.merge_consecutive
+            and tail is not None
+            and tail.agent_id == request.agent_id
+            and tail.priority == request.priority
+            and not tail.expired()
+        ):
+            tail.text = f"{tail.text} {request.text}"
+            tail.created_at = max(tail.created_at, request.created_at)
+            self._metrics.increment("speech_merged_total")
+            return
+
         self._counter += 1
         request._counter = self._counter
-        await self._queue.put((request.priority, self._counter, request))
+        heapq.heappush(self._queues.setdefault(room, []), (request.priority, self._counter, request))
+        self._tails[room] = request
+        self._wakeup.set()
+
+        playing = self._current(room)
+        if playing is not None and request.priority < playing.priority:
+            await self._preempt(room, playing)
+
+    async def _preempt(self, room: str, playing: SpeechRequest) -> None:
+        logger.info(f"SpeechQueue: preempting {playing.agent_id} in {room} for a more urgent utterance.")
+        self._metrics.increment("speech_preempted_total")
+        playing.preempted.set()
+        self._playing.pop(room, None)
+        if self.on_preempt:
+            try:
+                res = self.on_preempt(playing)
+                if inspect.isawaitable(res):
+                    await res
+            except Exception as e:
+                logger.error(f"SpeechQueue: on_preempt failed — {e}")
+
+    def _pop(self, room: Optional[str]) -> Optional[SpeechRequest]:
+        now = time.monotonic()
+        while True:
+            if room is not None:
+                heap = self._queues.get(room)
+            else:
+                # No room given: the most urgent item across all rooms
+                heap = min((q for q in self._queues.values() if q), key=lambda q: q[0][:2], default=None)
+            if not heap:
+                return None
+            _, _, request = heapq.heappop(heap)
+            request_room = request.room or DEFAULT_ROOM
+            if self._tails.get(request_room) is request:
+                del self._tails[request_room]
+            if request.expired(now):
+                self._metrics.increment("speech_expired_total")
+                logger.debug(f"SpeechQueue: dropped stale utterance from {request.agent_id}.")
+                continue
+            return request
+
+    async def dequeue(self, room: Optional[str] = None) -> SpeechRequest:
+        """Waits for the next live utterance (for `room`, or any room) and marks it as playing."""
+        while True:
+            request = self._pop(room)
+            if request is not None:
+                request.playing_until = time.monotonic() + self.estimated_duration(request)
+                self._playing[request.room or DEFAULT_ROOM] = request
+                return request
+            self._wakeup.clear()
+            await self._wakeup.wait()
 
-    async def dequeue(self) -> SpeechRequest:
-        _, _, request = await self._queue.get()
-        return request
+    def done(self, request: SpeechRequest) -> None:
+        """Called by the player when an utterance finished (or was cut short)."""
+        room = request.room or DEFAULT_ROOM
+        if self._playing.get(room) is request:
+            del self._playing[room]
 
-    def qsize(self) -> int:
-        return self._queue.qsize()
+    def playing(self, room: Optional[str] = None) -> Optional[SpeechRequest]:
+        return self._current(room or DEFAULT_ROOM)
 
-    def interrupt(self) -> None:
+    def qsize(self, room: Optional[str] = None) -> int:
+        """Queued utterances still worth saying (expired ones are only dropped on dequeue)."""
+        now = time.monotonic()
+        heaps = [self._queues.get(room, [])] if room is not None else self._queues.values()
+        return sum(1 for heap in heaps for _, _, request in heap if not request.expired(now))
+
+    def interrupt(self, room: Optional[str] = None) -> None:
+        """Barge-in: drops queued speech (for one room, or everywhere) and preempts what is playing."""
         self.is_interrupted = True
-        while not self._queue.empty():
-            try:
-                self._queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
+        rooms = [room] if room is not None else list(self._queues) + list(self._playing)
+        for name in rooms:
+            self._queues.pop(name, None)
+            self._tails.pop(name, None)
+            playing = self._current(name)
+            self._playing.pop(name, None)
+            if playing is not None:
+                playing.preempted.set()
+                if self.on_preempt:
+                    try:
+                        res = self.on_preempt(playing)
+                        if inspect.isawaitable(res):
+                            asyncio.ensure_future(res)
+                    except Exception as e:
+                        logger.error(f"SpeechQueue: on_preempt failed — {e}")
 
     def stop(self) -> None:
         self._stop_event.set()
@@ -4,6 +4,8 @@ import os
 import tempfile
 from typing import Optional, Any
 
+from src.services.metrics import get_metrics
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -40,7 +42,8 @@ class SttService:
                 segments, _ = self._model.transcribe(tmp_path, language=language)
                 return " ".join(seg.text for seg in segments).strip()
 
-            result = await loop.run_in_executor(None, _run)
+            with get_metrics().timer("stt_transcribe_seconds", {"model": self.model_size}):
+                result = await loop.run_in_executor(None, _run)
             os.unlink(tmp_path)
             return result
         except Exception as e:
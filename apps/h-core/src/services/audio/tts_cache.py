@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.services.media_index import get_media_index
+from src.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# French typography puts a (narrow) space before ?!:; — it does not change the audio
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([?!:;])")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("’", "'").replace("…", "...")
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", _WHITESPACE.sub(" ", text))
+    return text.strip()
+
+
+def cache_key(text: str, voice_id: str, engine: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of one synthesized utterance: text, voice, engine and prosody/modulation params."""
+    rounded = {k: round(v, 3) if isinstance(v, float) else v for k, v in (params or {}).items()}
+    material = json.dumps([normalize_text(text), voice_id, engine, rounded], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    """
+    Content-addressed store for synthesized audio.
+
+    A small in-memory LRU holds the hottest clips; everything else lives as
+    `<key>.audio` files under TTS_CACHE_DIR, evicted least-recently-used once
+    TTS_CACHE_MAX_BYTES is exceeded (reusing the media directory index, so no
+    rescans). Only short texts are cached: greetings and confirmations repeat,
+    long free-form replies do not.
+    """
+
+    SUFFIX = ".audio"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        hot_entries: Optional[int] = None,
+        max_text_chars: Optional[int] = None,
+    ):
+        self.directory = directory or os.getenv("TTS_CACHE_DIR", "/tmp/hairem/tts_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 2**20)))
+        self.hot_entries = hot_entries if hot_entries is not None else int(os.getenv("TTS_CACHE_HOT_ENTRIES", "128"))
+        self.max_text_chars = max_text_chars or int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "200"))
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        self._index = None
+        self._metrics = get_metrics()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index = get_media_index(self.directory)
+        except OSError as e:
+            logger.warning(f"TTS_CACHE: Disk tier disabled ({self.directory}: {e})")
+
+    def cacheable(self, text: str) -> bool:
+        return bool(text) and len(text) <= self.max_text_chars
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        self._hot[key] = audio
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # LRU order for disk eviction
+            self._index.record(path)
+            return audio
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)
+        index = self._index
+        if not index.loaded:
+            index.load()
+        index.record(path, size=len(audio), atime=os.stat(path).st_atime)
+        while index.total_bytes > self.max_bytes:
+            oldest = index.pop_oldest()
+            if oldest is None:
+                break
+            try:
+                os.remove(oldest[0])
+            except FileNotFoundError:
+                pass
+
+    async def get(self, *keys: str) -> Optional[bytes]:
+        """First cached clip among `keys` (e.g. the same utterance under the primary then the fallback engine)."""
+        for key in keys:
+            audio = self._hot.get(key)
+            if audio is not None:
+                self._hot.move_to_end(key)
+                self._metrics.increment("tts_cache_total", labels={"outcome": "hit_memory"})
+                return audio
+        if self._index is not None:
+            loop = asyncio.get_running_loop()
+            for key in keys:
+                try:
+                    audio = await loop.run_in_executor(None, self._read, key)
+                except OSError as e:
+                    logger.warning(f"TTS_CACHE: Read failed for {key}: {e}")
+                    continue
+                if audio:
+                    self._remember(key, audio)
+                    self._metrics.increment("tts_cache_total", labels={"outcome": "hit_disk"})
+                    return audio
+        self._metrics.increment("tts_cache_total", labels={"outcome": "miss"})
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        self._remember(key, audio)
+        if self._index is None or len(audio) > self.max_bytes:
+            return  # a clip bigger than the whole budget would only evict itself
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, audio)
+        except OSError as e:
+            logger.warning(f"TTS_CACHE: Write failed for {key}: {e}")
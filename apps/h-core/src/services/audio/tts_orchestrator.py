@@ -1,34 +1,221 @@
+import asyncio
 import base64
 import logging
+import os
+import re
+import time
+from uuid import uuid4
 
 from src.services.audio.melotts_provider import MeloTtsProvider
 from src.services.audio.elevenlabs_provider import ElevenLabsProvider
+from src.services.audio.tts_cache import TtsCache, cache_key
+from src.services.metrics import get_metrics
+from src.services.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 250) -> list[str]:
+    """
+    Splits a reply into synthesis units: one sentence each, with very short
+    sentences merged into the next (keeps prosody natural) and run-ons cut at
+    the last comma or space before `max_chars`.
+    """
+    units: list[str] = []
+    pending = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = f"{pending} {sentence}".strip() if pending else sentence.strip()
+        pending = ""
+        if not sentence:
+            continue
+        if len(sentence) < min_chars:
+            pending = sentence
+            continue
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(",", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut + 1 if cut > 0 else max_chars
+            units.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            units.append(sentence)
+    if pending:
+        if units and len(units[-1]) + len(pending) < max_chars:
+            units[-1] = f"{units[-1]} {pending}"
+        else:
+            units.append(pending)
+    return units
+
 
 class TtsOrchestrator:
-    def __init__(self, primary: MeloTtsProvider, fallback: ElevenLabsProvider, redis_client):
+    """
+    Primary/fallback synthesis plus sentence-pipelined broadcast.
+
+    `synthesize_and_broadcast` splits a reply into sentences, synthesizes up to
+    TTS_MAX_CONCURRENCY of them at once and publishes `audio.chunk` events in
+    playback order (`seq`, `is_last`) as soon as each one and its predecessors
+    are ready, so the first sentence plays while the rest are still being
+    generated. `cancel(agent_id)` stops an agent's utterance mid-way.
+
+    With a `TtsCache`, short utterances are looked up by content address before
+    either engine is called, and each synthesized clip is stored under the
+    engine that produced it.
+    """
+
+    def __init__(
+        self,
+        primary: MeloTtsProvider,
+        fallback: ElevenLabsProvider,
+        redis_client,
+        max_concurrency: int | None = None,
+        cache: TtsCache | None = None,
+    ):
         self.primary = primary
         self.fallback = fallback
         self.redis = redis_client
+        self.max_concurrency = max_concurrency or int(os.getenv("TTS_MAX_CONCURRENCY", "3"))
+        self.cache = cache
+        self._active: dict[str, asyncio.Task] = {}
 
-    async def synthesize(self, text: str, voice_id: str = "FR", timeout_ms: int = 800) -> bytes:
-        audio = await self.primary.synthesize(text, voice_id, timeout_ms)
-        if not audio:
-            logger.info("TtsOrchestrator: primary empty, using fallback.")
-            audio = await self.fallback.synthesize(text, voice_id)
+    async def synthesize(
+        self, text: str, voice_id: str = "FR", timeout_ms: int = 800, params: dict | None = None
+    ) -> bytes:
+        use_cache = self.cache is not None and self.cache.cacheable(text)
+        if use_cache:
+            audio = await self.cache.get(*self._cache_keys(text, voice_id, params))
+            if audio:
+                return audio
+
+        audio, engine = await self._synthesize_uncached(text, voice_id, timeout_ms)
+        if use_cache and audio:
+            await self.cache.put(cache_key(text, voice_id, engine, params), audio)
         return audio
 
-    async def synthesize_and_broadcast(self, text: str, agent_id: str, voice_id: str = "FR") -> None:
-        audio = await self.synthesize(text, voice_id)
-        if not audio:
-            return
+    @staticmethod
+    def _cache_keys(text: str, voice_id: str, params: dict | None = None) -> list[str]:
+        # Primary first: a clip cached from the fallback is only used when no primary one exists
+        return [cache_key(text, voice_id, engine, params) for engine in ("melotts", "elevenlabs")]
+
+    async def _synthesize_uncached(self, text: str, voice_id: str, timeout_ms: int) -> tuple[bytes, str]:
+        metrics = get_metrics()
+        with metrics.timer("tts_synthesis_seconds", {"engine": "melotts"}):
+            audio = await self.primary.synthesize(text, voice_id, timeout_ms)
+        if audio:
+            return audio, "melotts"
+        logger.info("TtsOrchestrator: primary empty, using fallback.")
+        metrics.increment("tts_fallback_total")
+        with metrics.timer("tts_synthesis_seconds", {"engine": "elevenlabs"}):
+            audio = await self.fallback.synthesize(text, voice_id)
+        return audio, "elevenlabs"
+
+    async def prewarm(self, phrases: dict[str, list[str]], concurrency: int = 2) -> int:
+        """
+        Synthesizes each voice's common phrases ahead of time ({voice_id: [phrase, ...]}).
+        Phrases already cached cost a lookup; returns how many were newly synthesized.
+        """
+        if self.cache is None:
+            return 0
+        semaphore = asyncio.Semaphore(concurrency)
+        created = 0
+
+        async def _warm(voice_id: str, phrase: str):
+            nonlocal created
+            async with semaphore:
+                if await self.cache.get(*self._cache_keys(phrase, voice_id)):
+                    return
+                audio, engine = await self._synthesize_uncached(phrase, voice_id, timeout_ms=5000)
+                if audio:
+                    await self.cache.put(cache_key(phrase, voice_id, engine), audio)
+                    created += 1
+
+        await asyncio.gather(
+            *(_warm(voice_id, p) for voice_id, items in phrases.items() for p in items if self.cache.cacheable(p)),
+            return_exceptions=True,
+        )
+        logger.info(f"TtsOrchestrator: pre-warmed {created} phrases.")
+        return created
+
+    async def synthesize_and_broadcast(
+        self, text: str, agent_id: str, voice_id: str = "FR", trace_id: str | None = None
+    ) -> None:
+        # A new utterance from the same agent replaces the one still playing
+        self.cancel(agent_id)
+        # Own task, so cancel() stops the utterance without touching the caller
+        task = asyncio.create_task(self._pipeline(text, agent_id, voice_id, trace_id))
+        self._active[agent_id] = task
+        try:
+            with get_tracer().span(trace_id, "core.tts", agent=agent_id, chars=len(text)):
+                await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            logger.info(f"TtsOrchestrator: utterance for {agent_id} cancelled.")
+            get_metrics().increment("tts_cancelled_total")
+        finally:
+            if self._active.get(agent_id) is task:
+                del self._active[agent_id]
+
+    def cancel(self, agent_id: str) -> bool:
+        """Interrupts the utterance in flight for `agent_id`, if any."""
+        task = self._active.pop(agent_id, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _pipeline(self, text: str, agent_id: str, voice_id: str, trace_id: str | None) -> None:
+        sentences = split_sentences(text) or [text]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        utterance_id = uuid4().hex
+        started = time.perf_counter()
+
+        async def _one(sentence: str) -> bytes:
+            async with semaphore:
+                return await self.synthesize(sentence, voice_id)
+
+        # Semaphore-bounded tasks, awaited in order: chunk N is emitted once 0..N are done
+        jobs = [asyncio.create_task(_one(s)) for s in sentences]
+        seq = 0
+        last_sent = False
+        try:
+            for index, job in enumerate(jobs):
+                try:
+                    audio = await job
+                except Exception as e:
+                    logger.error(f"TtsOrchestrator: sentence {index} failed — {e}")
+                    continue
+                if not audio:
+                    continue
+                if seq == 0:
+                    get_metrics().observe("tts_first_audio_seconds", time.perf_counter() - started)
+                last_sent = index == len(jobs) - 1
+                await self._broadcast(audio, agent_id, trace_id, utterance_id, seq, last_sent)
+                seq += 1
+            if seq and not last_sent:
+                # The last sentence failed or came back empty: close the utterance with an empty marker chunk
+                await self._broadcast(b"", agent_id, trace_id, utterance_id, seq, True)
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    async def _broadcast(
+        self, audio: bytes, agent_id: str, trace_id: str | None, utterance_id: str, seq: int, is_last: bool
+    ) -> None:
         chunk = base64.b64encode(audio).decode()
         event = {
             "type": "audio.chunk",
             "sender": {"agent_id": agent_id, "role": "agent"},
-            "payload": {"content": {"audio_b64": chunk, "agent_id": agent_id}},
+            "payload": {
+                "content": {
+                    "audio_b64": chunk,
+                    "agent_id": agent_id,
+                    "utterance_id": utterance_id,
+                    "seq": seq,
+                    "is_last": is_last,
+                }
+            },
+            "metadata": {"trace_id": trace_id, "sent_at": time.time()} if trace_id else {},
         }
         try:
             await self.redis.publish_event("system_stream", event)
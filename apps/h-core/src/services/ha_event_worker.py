@@ -1,22 +1,90 @@
 import logging
 import asyncio
-from typing import Any, Dict
+import fnmatch
+import os
+import time
+from typing import Any, Dict, Optional
 from src.infrastructure.redis import RedisClient
 from src.infrastructure.ha_client import HaClient
+from src.services.metrics import get_metrics
 from src.services.proactivity.engine import ProactivityEngine
-from src.models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
+from src.models.hlink import HLinkMessage, MessageType, Metadata, Payload, Priority, Recipient, Sender
 
 logger = logging.getLogger(__name__)
 
+# Home Assistant's clock sensors (time_date integration) change every minute and carry no information
+DEFAULT_BLOCKED_ENTITIES = "sensor.time,sensor.time_*,sensor.date,sensor.date_*,sensor.internet_time"
+
+
+def _csv_env(name: str, default: str = "") -> set[str]:
+    return {item.strip() for item in os.getenv(name, default).split(",") if item.strip()}
+
+
+def _as_number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class HaEventWorker:
-    def __init__(self, redis: RedisClient, ha_client: HaClient, proactivity_engine: ProactivityEngine = None):
+    """
+    Ingress stage between Home Assistant and Redis.
+
+    `state_changed` events go through, in order: entity/domain allow and block
+    lists (blocked entries may be glob patterns, e.g. `sensor.time_*`), a
+    significant-change check (identical states are dropped, numeric sensors
+    must move past a threshold), then routing. Discrete entities
+    (lights, doors, presence...) are published to `system_stream` at once;
+    telemetry domains are coalesced per entity over a short window and only
+    their latest state is written to a separate, capped, low-priority stream.
+    """
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        ha_client: HaClient,
+        proactivity_engine: ProactivityEngine = None,
+        allowed_domains: Optional[set[str]] = None,
+        allowed_entities: Optional[set[str]] = None,
+        blocked_entities: Optional[set[str]] = None,
+        telemetry_domains: Optional[set[str]] = None,
+        numeric_thresholds: Optional[Dict[str, float]] = None,
+        coalesce_window: Optional[float] = None,
+    ):
         self.redis = redis
         self.ha_client = ha_client
         self.proactivity = proactivity_engine
         self.stop_event = asyncio.Event()
         self._task = None
 
+        # Empty allowlists mean "everything"
+        self.allowed_domains = allowed_domains if allowed_domains is not None else _csv_env("HA_ALLOWED_DOMAINS")
+        self.allowed_entities = allowed_entities if allowed_entities is not None else _csv_env("HA_ALLOWED_ENTITIES")
+        self.blocked_entities = (
+            blocked_entities
+            if blocked_entities is not None
+            else _csv_env("HA_BLOCKED_ENTITIES", DEFAULT_BLOCKED_ENTITIES)
+        )
+        self._blocked_patterns = [e for e in self.blocked_entities if any(c in e for c in "*?[")]
+        if telemetry_domains is None:
+            telemetry_domains = _csv_env("HA_TELEMETRY_DOMAINS", "sensor,sun,weather")
+        self.telemetry_domains = telemetry_domains
+        # Absolute thresholds keyed by entity_id or domain; otherwise a relative change is required
+        self.numeric_thresholds = numeric_thresholds or {}
+        self.relative_threshold = float(os.getenv("HA_NUMERIC_REL_THRESHOLD", "0.05"))
+        self.coalesce_window = (
+            coalesce_window if coalesce_window is not None else int(os.getenv("HA_COALESCE_WINDOW_MS", "2000")) / 1000
+        )
+        self.telemetry_stream = os.getenv("HA_TELEMETRY_STREAM", "telemetry_stream")
+        self.telemetry_maxlen = int(os.getenv("HA_TELEMETRY_MAXLEN", "200"))
+        self.trigger_purge_interval = float(os.getenv("PROACTIVITY_PURGE_INTERVAL_S", "60"))
+
+        self._last_states: Dict[str, Any] = {}
+        self._pending: Dict[str, Any] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._metrics = get_metrics()
+
     async def start(self):
         """Start listening to HA events and process them."""
         logger.info("HA_WORKER: Starting HA event listener...")
@@ -24,48 +92,136 @@ class HaEventWorker:
         # Launch listener loop in background
         self._task = asyncio.create_task(self.ha_client.listen_events(self.process_event))
 
-        # Keep worker alive until stopped
+        # Keep worker alive until stopped; expired proactive triggers are swept on the way
+        last_purge = time.monotonic()
         while not self.stop_event.is_set():
             await asyncio.sleep(1)
+            if self.proactivity and time.monotonic() - last_purge >= self.trigger_purge_interval:
+                last_purge = time.monotonic()
+                purged = self.proactivity.purge_expired()
+                if purged:
+                    logger.debug(f"HA_WORKER: Purged {purged} expired proactivity triggers")
+
+    def _is_allowed(self, entity_id: str) -> bool:
+        if not entity_id or entity_id in self.blocked_entities:
+            return False
+        if any(fnmatch.fnmatchcase(entity_id, pattern) for pattern in self._blocked_patterns):
+            return False
+        if not self.allowed_domains and not self.allowed_entities:
+            return True
+        domain = entity_id.split(".", 1)[0]
+        return entity_id in self.allowed_entities or domain in self.allowed_domains
+
+    def _is_significant(self, entity_id: str, new_state: Any) -> bool:
+        """True when the state differs enough from the last accepted one; records it if so."""
+        if entity_id not in self._last_states:
+            self._last_states[entity_id] = new_state
+            return True
+
+        last = self._last_states[entity_id]
+        if new_state == last:
+            return False
+
+        new_value, last_value = _as_number(new_state), _as_number(last)
+        if new_value is not None and last_value is not None:
+            domain = entity_id.split(".", 1)[0]
+            threshold = self.numeric_thresholds.get(entity_id, self.numeric_thresholds.get(domain))
+            if threshold is None:
+                threshold = abs(last_value) * self.relative_threshold
+            # Compared to the last *accepted* value, so slow drifts still get through eventually
+            if abs(new_value - last_value) < threshold:
+                return False
+
+        self._last_states[entity_id] = new_state
+        return True
+
+    def _is_telemetry(self, entity_id: str) -> bool:
+        return entity_id.split(".", 1)[0] in self.telemetry_domains
 
     async def process_event(self, event: Dict[str, Any]):
         """Process HA event, publish to Redis, and feed Proactivity Engine."""
         event_type = event.get("event_type", "unknown")
         data = event.get("data", {})
+        new_state = (data.get("new_state") or {}).get("state")
+
+        if event_type != "state_changed":
+            await self._feed_proactivity(event_type, data.get("entity_id"), new_state)
+            return
+
+        entity_id = data.get("entity_id", "")
+        if not self._is_allowed(entity_id):
+            self._metrics.increment("ha_events_total", labels={"outcome": "filtered"})
+            return
+        if not self._is_significant(entity_id, new_state):
+            self._metrics.increment("ha_events_total", labels={"outcome": "insignificant"})
+            return
 
         # 1. Feed Proactivity Engine (Epic 10)
+        await self._feed_proactivity(event_type, entity_id, new_state)
+
+        # 2. Legacy/Debug Broadcast (Epic 5), telemetry kept off the main stream
+        if self._is_telemetry(entity_id) and self.coalesce_window > 0:
+            self._coalesce(entity_id, new_state)
+        else:
+            await self._publish(entity_id, new_state, telemetry=self._is_telemetry(entity_id))
+
+    async def _feed_proactivity(self, event_type: str, entity_id: Optional[str], new_state: Any):
         if self.proactivity:
             # We normalize the event structure for the engine
             await self.proactivity.process_event(
                 {
                     "type": "ha_event",
                     "name": event_type,
-                    "entity_id": data.get("entity_id"),
-                    "new_state": data.get("new_state", {}).get("state"),
+                    "entity_id": entity_id,
+                    "new_state": new_state,
                 }
             )
 
-        # 2. Legacy/Debug Broadcast (Epic 5)
-        # Only broadcast significant state changes to avoid noise
-        if event_type == "state_changed":
-            entity_id = data.get("entity_id", "")
-            new_state = data.get("new_state", {}).get("state")
-
-            # Filter noise (optional, e.g. time sensors)
-            if "sensor.time" in entity_id:
-                return
-
-            msg = HLinkMessage(
-                type=MessageType.NARRATIVE_TEXT,
-                sender=Sender(agent_id="ha_worker", role="system"),
-                recipient=Recipient(target="broadcast"),
-                payload=Payload(content=f"HA Event: {entity_id} changed to {new_state}"),
+    def _coalesce(self, entity_id: str, new_state: Any):
+        """Keeps only the latest state of `entity_id` until its window closes."""
+        self._pending[entity_id] = new_state
+        if entity_id in self._flush_handles:
+            self._metrics.increment("ha_events_total", labels={"outcome": "coalesced"})
+            return
+        loop = asyncio.get_running_loop()
+        self._flush_handles[entity_id] = loop.call_later(
+            self.coalesce_window, lambda: asyncio.ensure_future(self._flush(entity_id))
+        )
+
+    async def _flush(self, entity_id: str):
+        self._flush_handles.pop(entity_id, None)
+        if entity_id in self._pending:
+            await self._publish(entity_id, self._pending.pop(entity_id), telemetry=True)
+
+    async def flush_pending(self):
+        """Publishes every coalesced state now (used on shutdown)."""
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        pending, self._pending = self._pending, {}
+        for entity_id, state in pending.items():
+            await self._publish(entity_id, state, telemetry=True)
+
+    async def _publish(self, entity_id: str, new_state: Any, telemetry: bool = False):
+        msg = HLinkMessage(
+            type=MessageType.NARRATIVE_TEXT,
+            sender=Sender(agent_id="ha_worker", role="system"),
+            recipient=Recipient(target="broadcast"),
+            payload=Payload(content=f"HA Event: {entity_id} changed to {new_state}"),
+            metadata=Metadata(priority=Priority.LOW if telemetry else Priority.NORMAL),
+        )
+        if telemetry:
+            await self.redis.publish_event(
+                self.telemetry_stream, msg.model_dump(mode="json"), max_len=self.telemetry_maxlen
             )
+        else:
             await self.redis.publish_event("system_stream", msg.model_dump(mode="json"))
-            logger.debug(f"HA_WORKER: Processed event {event_type} for {entity_id}")
+        self._metrics.increment("ha_events_total", labels={"outcome": "telemetry" if telemetry else "published"})
+        logger.debug(f"HA_WORKER: Published {entity_id}={new_state} ({'telemetry' if telemetry else 'system'})")
 
     async def stop(self):
         self.stop_event.set()
+        await self.flush_pending()
         if self._task:
             self._task.cancel()
         await self.ha_client.close()
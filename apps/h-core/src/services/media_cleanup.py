@@ -1,7 +1,10 @@
 import asyncio
 import logging
 import os
-from typing import Any
+from typing import Any, Optional
+
+from src.services.media_index import MediaEntry, get_media_index
+from src.services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +18,18 @@ class MediaCleanupWorker:
         surreal_client: Any,
         max_files: int = 100,
         check_interval_seconds: int = 21600,
+        max_bytes: Optional[int] = None,
+        watch: bool = True,
     ):
         self.storage_path = storage_path
         self.surreal = surreal_client
         self.max_files = max_files
         self.check_interval_seconds = check_interval_seconds
+        # 0 disables the byte budget; the file-count limit always applies
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("MEDIA_MAX_BYTES", "0"))
+        self.watch = watch
+        self.index = get_media_index(storage_path)
+        self._metrics = get_metrics()
         self._stop_event = asyncio.Event()
 
     async def _get_permanent_urls(self) -> set[str]:
@@ -34,54 +44,74 @@ class MediaCleanupWorker:
             logger.error(f"MediaCleanupWorker: permanent URL query failed — {e}")
         return set()
 
+    def _over_budget(self) -> tuple[int, int]:
+        files = len(self.index) - self.max_files
+        size = self.index.total_bytes - self.max_bytes if self.max_bytes else 0
+        return max(0, files), max(0, size)
+
+    @staticmethod
+    def _unlink_batch(entries: list[MediaEntry]) -> tuple[list[MediaEntry], list[MediaEntry]]:
+        removed, failed = [], []
+        for entry in entries:
+            try:
+                os.remove(entry[0])
+                removed.append(entry)
+            except FileNotFoundError:
+                removed.append(entry)
+            except OSError as e:
+                logger.error(f"MediaCleanupWorker: delete failed — {entry[0]}: {e}")
+                failed.append(entry)
+        return removed, failed
+
     async def run_once(self) -> None:
         try:
             loop = asyncio.get_running_loop()
+            if not self.index.loaded:
+                await loop.run_in_executor(None, self.index.load)
 
-            def _scan():
-                entries = []
-                for name in os.listdir(self.storage_path):
-                    path = os.path.join(self.storage_path, name)
-                    if os.path.isfile(path):
-                        st = os.stat(path)
-                        entries.append({"path": path, "atime": st.st_atime})
-                return entries
-
-            files = await loop.run_in_executor(None, _scan)
-
-            if len(files) <= self.max_files:
+            excess_files, excess_bytes = self._over_budget()
+            if not excess_files and not excess_bytes:
                 return
 
             permanent_urls = await self._get_permanent_urls()
 
-            files.sort(key=lambda x: x["atime"])
-
-            to_delete = len(files) - self.max_files
-            deleted = 0
-
-            for entry in files:
-                if deleted >= to_delete:
+            # Oldest first straight from the index; only evicted files are touched
+            victims, kept = [], []
+            freed = 0
+            while len(victims) < excess_files or freed < excess_bytes:
+                entry = self.index.pop_oldest()
+                if entry is None:
                     break
-                url = f"file://{entry['path']}"
-                if url in permanent_urls:
+                if f"file://{entry[0]}" in permanent_urls:
+                    kept.append(entry)
                     continue
-                try:
-                    await loop.run_in_executor(None, os.remove, entry["path"])
-                    deleted += 1
-                    logger.debug(f"MediaCleanupWorker: deleted {entry['path']}")
-                except Exception as e:
-                    logger.error(f"MediaCleanupWorker: delete failed — {entry['path']}: {e}")
+                victims.append(entry)
+                freed += entry[1]
+
+            for entry in kept:
+                self.index.record(*entry)
+
+            removed, failed = await loop.run_in_executor(None, self._unlink_batch, victims)
+            for entry in failed:
+                self.index.record(*entry)
 
-            logger.info(f"MediaCleanupWorker: cleanup done — {deleted} files removed.")
+            self._metrics.increment("media_evicted_total", len(removed))
+            logger.info(
+                f"MediaCleanupWorker: cleanup done — {len(removed)} files removed "
+                f"({sum(e[1] for e in removed)} bytes), {len(self.index)} files / {self.index.total_bytes} bytes left."
+            )
 
         except Exception as e:
             logger.error(f"MediaCleanupWorker: run_once error — {e}")
 
     async def run_loop(self) -> None:
         logger.info("MediaCleanupWorker: background loop started.")
+        if self.watch:
+            self.index.start_watching()
         while not self._stop_event.is_set():
             await self.run_once()
             await asyncio.sleep(self.check_interval_seconds)
 
     def stop(self) -> None:
         self._stop_event.set()
+        self.index.stop_watching()
@@ -0,0 +1,162 @@
+import heapq
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+logger = logging.getLogger(__name__)
+
+_indexes: Dict[str, "MediaIndex"] = {}
+_indexes_lock = threading.Lock()
+
+# (path, size, atime)
+MediaEntry = Tuple[str, int, float]
+
+
+class _MediaEventHandler(FileSystemEventHandler):
+    def __init__(self, index: "MediaIndex"):
+        self.index = index
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.index.record(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.index.record(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.index.discard(event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.index.discard(event.src_path)
+        if os.path.dirname(event.dest_path) == self.index.storage_path:
+            self.index.record(event.dest_path)
+
+
+class MediaIndex:
+    """
+    Incremental catalog of the files in one media directory.
+
+    The directory is scanned once; after that the index is kept current by
+    `record`/`discard` calls (AssetManager.save_asset, the cleanup worker) and,
+    when `start_watching` is used, by watchdog events for files written by other
+    processes. Entries sit in a min-heap ordered by access time, so finding the
+    next eviction candidate costs O(log n) instead of a listdir + stat + sort.
+    Heap items made stale by a later `record` or `discard` are skipped lazily.
+    """
+
+    def __init__(self, storage_path: str):
+        self.storage_path = os.path.abspath(storage_path)
+        self.total_bytes = 0
+        self.loaded = False
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._observer = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.abspath(path) in self._entries
+
+    def load(self) -> int:
+        """Full scan of the directory; blocking, run it in an executor."""
+        entries = {}
+        try:
+            with os.scandir(self.storage_path) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        entries[entry.path] = (st.st_size, st.st_atime)
+        except FileNotFoundError:
+            logger.warning(f"MEDIA_INDEX: {self.storage_path} does not exist yet")
+        with self._lock:
+            self._entries = entries
+            self._heap = [(atime, path) for path, (_, atime) in entries.items()]
+            heapq.heapify(self._heap)
+            self.total_bytes = sum(size for size, _ in entries.values())
+            self.loaded = True
+        logger.info(f"MEDIA_INDEX: Indexed {len(entries)} files ({self.total_bytes} bytes) in {self.storage_path}")
+        return len(entries)
+
+    def record(self, path: str, size: Optional[int] = None, atime: Optional[float] = None) -> None:
+        """Adds or refreshes a file; stats it unless size and atime are given."""
+        path = os.path.abspath(path)
+        if size is None or atime is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.discard(path)
+                return
+            size, atime = st.st_size, st.st_atime
+        with self._lock:
+            previous = self._entries.get(path)
+            if previous:
+                self.total_bytes -= previous[0]
+            self._entries[path] = (size, atime)
+            self.total_bytes += size
+            heapq.heappush(self._heap, (atime, path))
+            self._maybe_rebuild()
+
+    def discard(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous:
+                self.total_bytes -= previous[0]
+
+    def pop_oldest(self) -> Optional[MediaEntry]:
+        """Removes and returns the least recently accessed file, or None when empty."""
+        with self._lock:
+            while self._heap:
+                atime, path = heapq.heappop(self._heap)
+                current = self._entries.get(path)
+                if current is None or current[1] != atime:
+                    continue  # stale heap item
+                del self._entries[path]
+                self.total_bytes -= current[0]
+                return path, current[0], atime
+        return None
+
+    def _maybe_rebuild(self) -> None:
+        # Lazy deletion lets stale items pile up under churn; rebuild when they dominate
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(atime, path) for path, (_, atime) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def start_watching(self) -> bool:
+        if self._observer is not None or not os.path.isdir(self.storage_path):
+            return False
+        try:
+            observer = Observer()
+            observer.schedule(_MediaEventHandler(self), self.storage_path, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            return True
+        except Exception as e:
+            logger.warning(f"MEDIA_INDEX: Could not watch {self.storage_path}: {e}")
+            return False
+
+    def stop_watching(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
+def get_media_index(storage_path: str) -> MediaIndex:
+    """Returns the shared index for a directory, so writers and the cleanup worker see the same catalog."""
+    key = os.path.abspath(storage_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = MediaIndex(key)
+        return index
@@ -1,41 +1,161 @@
 from __future__ import annotations
 
+import logging
+import math
+import os
+import threading
+import time
 from collections import defaultdict
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 _GLOBAL_METRICS: "MetricsCollector | None" = None
 
+LabelKey = Tuple[Tuple[str, str], ...]
+
+EXPORTED_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StreamingHistogram:
+    """
+    Fixed-memory histogram with log-spaced buckets.
+
+    Each bucket spans a factor of (1 + precision), so any quantile is reported
+    within `precision` relative error whatever the number of samples. Values
+    between 1e-6 and 1e6 fit in at most ~1400 sparse buckets.
+    """
+
+    def __init__(self, precision: float = 0.02):
+        self._gamma = 1 + precision
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = defaultdict(int)
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self._zero_count += 1
+        else:
+            self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return self.min if self.min < 0 else 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket, clamped to the observed range.
+                upper = self._gamma**index
+                estimate = 2 * upper / (1 + self._gamma)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
 
 class MetricsCollector:
     def __init__(self) -> None:
-        self._counters: Dict[str, float] = defaultdict(float)
-        self._histograms: Dict[str, List[float]] = defaultdict(list)
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[LabelKey, StreamingHistogram]] = defaultdict(dict)
+        self._lock = threading.Lock()
 
-    def increment(self, name: str, value: float = 1) -> None:
-        self._counters[name] += value
+    def increment(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        with self._lock:
+            self._counters[name][_label_key(labels)] += value
 
-    def get(self, name: str) -> float:
-        return self._counters.get(name, 0)
+    def get(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
 
-    def observe(self, name: str, value: float) -> None:
-        self._histograms[name].append(value)
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = StreamingHistogram()
+            histogram.observe(value)
 
-    def get_avg(self, name: str) -> float:
-        values = self._histograms.get(name, [])
-        if not values:
-            return 0.0
-        return sum(values) / len(values)
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[StreamingHistogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def get_avg(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        histogram = self.histogram(name, labels)
+        return histogram.avg if histogram else 0.0
+
+    def get_quantile(self, name: str, q: float, labels: Optional[Dict[str, str]] = None) -> float:
+        histogram = self.histogram(name, labels)
+        return histogram.quantile(q) if histogram else 0.0
+
+    @contextmanager
+    def timer(self, name: str, labels: Optional[Dict[str, str]] = None) -> Iterator[None]:
+        """Observes the wall time of the wrapped block in seconds (usable around `await`)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
 
     def to_prometheus_text(self) -> str:
         lines: List[str] = []
-        for name, value in self._counters.items():
-            int_val = int(value) if value == int(value) else value
-            lines.append(f"{name} {int_val}")
-        for name, values in self._histograms.items():
-            if values:
-                avg = sum(values) / len(values)
-                lines.append(f"{name}_avg {avg}")
-                lines.append(f"{name}_count {len(values)}")
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+
+        for name, series in counters.items():
+            lines.append(f"# TYPE {name} counter")
+            for key, value in series.items():
+                int_val = int(value) if value == int(value) else value
+                lines.append(f"{name}{_format_labels(key)} {int_val}")
+
+        for name, series in histograms.items():
+            observed = {key: histogram for key, histogram in series.items() if histogram.count}
+            lines.append(f"# TYPE {name} summary")
+            for key, histogram in observed.items():
+                for q in EXPORTED_QUANTILES:
+                    lines.append(f"{name}{_format_labels(key, ('quantile', str(q)))} {histogram.quantile(q):.6g}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6g}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+            # A summary family only admits _sum and _count, so the max is its own gauge
+            lines.append(f"# TYPE {name}_max gauge")
+            for key, histogram in observed.items():
+                lines.append(f"{name}_max{_format_labels(key)} {histogram.max:.6g}")
         return "\n".join(lines)
 
 
@@ -44,3 +164,26 @@ def get_metrics() -> MetricsCollector:
     if _GLOBAL_METRICS is None:
         _GLOBAL_METRICS = MetricsCollector()
     return _GLOBAL_METRICS
+
+
+async def start_metrics_server(host: str = "0.0.0.0", port: Optional[int] = None, routes: Optional[list] = None):
+    """
+    Serves GET /metrics in Prometheus text format for processes without a web framework.
+    `routes` adds extra (path, aiohttp handler) pairs to the same listener.
+    """
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=get_metrics().to_prometheus_text() + "\n", content_type="text/plain")
+
+    port = port if port is not None else int(os.getenv("METRICS_PORT", "9100"))
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    for path, handler in routes or []:
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"METRICS: Serving /metrics on {host}:{port}")
+    return runner
@@ -1,36 +1,112 @@
 import logging
-from typing import Dict, List, Any
+import time
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from src.models.hlink import HLinkMessage, MessageType, Sender, Recipient, Payload
 
 logger = logging.getLogger(__name__)
 
+WILDCARD = "*"
+# Stands for "not set" in trigger ids; distinct from WILDCARD, which is a valid entity_id/state value
+_UNSET = "\x00"
+
+BucketKey = Tuple[str, Optional[str]]
+
 
 class ProactivityEngine:
     """
     Manages proactive behaviors, event triggers, and system stimuli (Epic 10).
+
+    Triggers are indexed by (event_name, entity_id). A trigger without an
+    entity_id lands in the (event_name, None) wildcard bucket and an event_name
+    of "*" matches every event, so an incoming event only looks at the (at most
+    four) buckets that can match it instead of scanning every trigger.
     """
 
     def __init__(self, redis_client, surreal_client):
         self.redis = redis_client
         self.surreal = surreal_client
-        self.triggers: List[Dict[str, Any]] = []
+        self._index: Dict[BucketKey, Dict[str, Dict[str, Any]]] = {}
+        self._by_id: Dict[str, BucketKey] = {}
         self.stimuli: Dict[str, Dict[str, Any]] = {}
 
+    @property
+    def triggers(self) -> List[Dict[str, Any]]:
+        """All registered triggers (read-only view)."""
+        return [trigger for bucket in self._index.values() for trigger in bucket.values()]
+
+    @staticmethod
+    def _trigger_id(event_name: str, entity_id: Optional[str], new_state: Optional[str], target_agent: str) -> str:
+        return f"{event_name}|{entity_id or _UNSET}|{new_state or _UNSET}|{target_agent}"
+
     async def register_trigger(
-        self, event_name: str, target_agent: str, context: str = "", entity_id: str = None, new_state: str = None
-    ):
+        self,
+        event_name: str,
+        target_agent: str,
+        context: str = "",
+        entity_id: str = None,
+        new_state: str = None,
+        ttl: Optional[float] = None,
+    ) -> str:
         """
-        Registers a complex trigger.
+        Registers a complex trigger and returns its id.
+
+        Registering the same (event, entity, state, agent) again updates the
+        existing trigger instead of adding a duplicate. `ttl` (seconds) makes
+        the trigger expire on its own.
         """
+        trigger_id = self._trigger_id(event_name, entity_id, new_state, target_agent)
+        bucket_key = (event_name, entity_id or None)
         trigger = {
+            "id": trigger_id,
             "event_name": event_name,
             "entity_id": entity_id,
             "new_state": new_state,
             "target_agent": target_agent,
             "context": context or f"Event detected: {event_name}",
+            "expires_at": time.monotonic() + ttl if ttl else None,
         }
-        self.triggers.append(trigger)
-        logger.info(f"PROACTIVITY: Registered trigger {event_name} ({entity_id}) -> {target_agent}")
+        duplicate = trigger_id in self._by_id
+        self._index.setdefault(bucket_key, {})[trigger_id] = trigger
+        self._by_id[trigger_id] = bucket_key
+        if duplicate:
+            logger.debug(f"PROACTIVITY: Refreshed trigger {trigger_id}")
+        else:
+            logger.info(f"PROACTIVITY: Registered trigger {event_name} ({entity_id}) -> {target_agent}")
+        return trigger_id
+
+    def unregister_trigger(self, trigger_id: str) -> bool:
+        bucket_key = self._by_id.pop(trigger_id, None)
+        if bucket_key is None:
+            return False
+        bucket = self._index.get(bucket_key, {})
+        bucket.pop(trigger_id, None)
+        if not bucket:
+            self._index.pop(bucket_key, None)
+        return True
+
+    def unregister_agent_triggers(self, target_agent: str) -> int:
+        """Drops every trigger pointing at `target_agent` (e.g. when the agent is unloaded)."""
+        ids = [t["id"] for t in self.triggers if t["target_agent"] == target_agent]
+        for trigger_id in ids:
+            self.unregister_trigger(trigger_id)
+        return len(ids)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.monotonic()
+        expired = [t["id"] for t in self.triggers if t["expires_at"] is not None and t["expires_at"] <= now]
+        for trigger_id in expired:
+            self.unregister_trigger(trigger_id)
+        return len(expired)
+
+    def _candidates(self, event_name: Optional[str], entity_id: Optional[str]) -> Iterable[Dict[str, Any]]:
+        keys = [(event_name, None), (WILDCARD, None)]
+        if entity_id:
+            keys += [(event_name, entity_id), (WILDCARD, entity_id)]
+        for key in dict.fromkeys(keys):
+            bucket = self._index.get(key)
+            if bucket:
+                # Copy: an expired trigger may be removed while we iterate
+                yield from list(bucket.values())
 
     async def register_stimulus(self, stimulus_name: str, agent_ids: List[str], context: str = ""):
         """
@@ -50,12 +126,10 @@ class ProactivityEngine:
 
         logger.debug(f"PROACTIVITY: Evaluating event {event_name} for {entity_id} (state: {new_state})")
 
-        for trigger in self.triggers:
-            # Match Logic
-            if trigger["event_name"] != event_name:
-                continue
-
-            if trigger["entity_id"] and trigger["entity_id"] != entity_id:
+        now = time.monotonic()
+        for trigger in self._candidates(event_name, entity_id):
+            if trigger["expires_at"] is not None and trigger["expires_at"] <= now:
+                self.unregister_trigger(trigger["id"])
                 continue
 
             if trigger["new_state"] and str(trigger["new_state"]) != str(new_state):
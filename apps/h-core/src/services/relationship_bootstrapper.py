@@ -1,11 +1,48 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Set, Tuple
+
 from src.infrastructure.surrealdb import SurrealDbClient
 
 logger = logging.getLogger(__name__)
 
+EDGE_TABLES = ("KNOWS", "TRUSTS")
+
+
+def _subject_key(name: str) -> str:
+    # Standardize IDs (must match how subjects are created elsewhere)
+    return name.lower().replace(" ", "_")
+
+
+def _record_parts(value: Any) -> Tuple[str, str]:
+    """(table, key) of a record id, whichever form the driver returns it in."""
+    table = getattr(value, "table_name", None) or getattr(value, "tb", None)
+    if table is not None:
+        return str(table), str(getattr(value, "id", "")).strip("`⟨⟩")
+    if isinstance(value, dict) and "tb" in value:
+        return str(value["tb"]), str(value.get("id", "")).strip("`⟨⟩")
+    table, _, key = str(value).partition(":")
+    return table, key.strip("`⟨⟩")
+
+
+def _rows(res: Any) -> List[Dict[str, Any]]:
+    if res and isinstance(res, list):
+        first = res[0]
+        if isinstance(first, dict) and "result" in first:
+            return first.get("result") or []
+        return [row for row in res if isinstance(row, dict)]
+    return []
+
 
 class RelationshipBootstrapper:
+    """
+    Seeds KNOWS and TRUSTS edges between every ordered pair of agents.
+
+    Set-based: the desired edges are computed in memory, the existing ones come
+    back from a single SELECT, and only the missing ones are created in one
+    transaction. A roster that is already bootstrapped costs one query; the
+    unique (in, out) indexes on both edge tables keep reruns idempotent.
+    """
+
     def __init__(self, surreal: SurrealDbClient):
         self.surreal = surreal
 
@@ -19,55 +56,79 @@ class RelationshipBootstrapper:
         ]
         return await self.bootstrap_relationships(agents)
 
+    @staticmethod
+    def trust_level(agent1: Dict[str, Any], agent2: Dict[str, Any]) -> float:
+        if agent1.get("role") == agent2.get("role"):
+            return 0.8
+        if agent1.get("name") == "Renarde" or agent2.get("name") == "Renarde":
+            return 0.9  # Coordinator trust
+        return 0.5  # Default
+
+    def desired_edges(self, agents: List[Dict[str, Any]]) -> Dict[Tuple[str, str, str], str]:
+        """(table, from, to) -> SET clause for every edge the roster should have."""
+        edges = {}
+        for agent1 in agents:
+            for agent2 in agents:
+                a1_id, a2_id = _subject_key(agent1["name"]), _subject_key(agent2["name"])
+                if a1_id == a2_id:
+                    continue  # Skip self-relationships
+                edges[("KNOWS", a1_id, a2_id)] = "strength = 1.0, timestamp = time::now()"
+                edges[("TRUSTS", a1_id, a2_id)] = (
+                    f"level = {self.trust_level(agent1, agent2)}, timestamp = time::now()"
+                )
+        return edges
+
+    async def existing_edges(self, subject_ids: List[str]) -> Set[Tuple[str, str, str]]:
+        """All KNOWS/TRUSTS edges among `subject_ids`, in one round trip."""
+        ids = ", ".join(f"subject:`{sid}`" for sid in subject_ids)
+        res = await self.surreal._call(
+            "query",
+            f"SELECT id, in, out FROM {', '.join(EDGE_TABLES)} WHERE in IN [{ids}] AND out IN [{ids}];",
+        )
+        found = set()
+        for row in _rows(res):
+            table, _ = _record_parts(row.get("id"))
+            _, source = _record_parts(row.get("in"))
+            _, target = _record_parts(row.get("out"))
+            found.add((table, source, target))
+        return found
+
     async def bootstrap_relationships(self, agents: List[Dict[str, Any]]):
         """Bootstrap initial KNOWS and TRUSTS edges between agents."""
         logger.info("BOOTSTRAP: Starting relationship bootstrapping...")
 
-        created_edges = {"KNOWS": 0, "TRUSTS": 0}
-        for i, agent1 in enumerate(agents):
-            for j, agent2 in enumerate(agents):
-                if i == j:
-                    continue  # Skip self-relationships
+        created_edges = {table: 0 for table in EDGE_TABLES}
+        subjects = {_subject_key(a["name"]): a["name"] for a in agents}
+        desired = self.desired_edges(agents)
+        if not desired:
+            return created_edges
 
-                # Standardize IDs (must match how subjects are created elsewhere)
-                a1_id = agent1["name"].lower().replace(" ", "_")
-                a2_id = agent2["name"].lower().replace(" ", "_")
+        existing = await self.existing_edges(list(subjects))
+        missing = [edge for edge in desired if edge not in existing]
+        if not missing:
+            logger.info("BOOTSTRAP: All relationships already exist.")
+            return created_edges
 
-                # Ensure subjects exist (safety)
-                await self.surreal._call(
-                    "query",
-                    f"INSERT INTO subject (id, name) VALUES (subject:`{a1_id}`, $name) ON DUPLICATE KEY UPDATE name=$name;",
-                    {"name": agent1["name"]},
-                )
+        statements = ["BEGIN TRANSACTION;"]
+        params = {}
+        for i, (sid, name) in enumerate(subjects.items()):
+            statements.append(
+                f"INSERT INTO subject (id, name) VALUES (subject:`{sid}`, $name{i}) ON DUPLICATE KEY UPDATE name = $name{i};"
+            )
+            params[f"name{i}"] = name
+        for table, a1_id, a2_id in missing:
+            statements.append(
+                f"RELATE subject:`{a1_id}`->{table}->subject:`{a2_id}` SET {desired[(table, a1_id, a2_id)]};"
+            )
+            created_edges[table] += 1
+        statements.append("COMMIT TRANSACTION;")
 
-                # Check existence helper
-                async def edge_exists(edge_table):
-                    # SurrealDB: 'in' is source, 'out' is target
-                    query = f"SELECT * FROM {edge_table} WHERE in = subject:`{a1_id}` AND out = subject:`{a2_id}`;"
-                    res = await self.surreal._call("query", query)
-                    return res and isinstance(res, list) and len(res) > 0 and res[0].get("result")
-
-                # Create KNOWS edge if not exists
-                if not await edge_exists("KNOWS"):
-                    await self.surreal._call(
-                        "query",
-                        f"RELATE subject:`{a1_id}`->KNOWS->subject:`{a2_id}` SET strength = 1.0, timestamp = time::now();",
-                    )
-                    created_edges["KNOWS"] += 1
-
-                # Create TRUSTS edge with logic-based level
-                if not await edge_exists("TRUSTS"):
-                    trust_level = 0.5  # Default
-                    if agent1.get("role") == agent2.get("role"):
-                        trust_level = 0.8
-                    elif agent1.get("name") == "Renarde" or agent2.get("name") == "Renarde":
-                        trust_level = 0.9  # Coordinator trust
-
-                    await self.surreal._call(
-                        "query",
-                        f"RELATE subject:`{a1_id}`->TRUSTS->subject:`{a2_id}` SET level = {trust_level}, timestamp = time::now();",
-                    )
-                    created_edges["TRUSTS"] += 1
+        res = await self.surreal._call("query", "\n".join(statements), params)
+        failed = res is None or any(isinstance(r, dict) and r.get("status") == "ERR" for r in res)
+        if failed:
+            # Most likely a concurrent bootstrap won the unique index: nothing was written, the next start retries
+            logger.error(f"BOOTSTRAP: Relationship transaction failed: {res}")
+            return {table: 0 for table in EDGE_TABLES}
 
         logger.info(f"BOOTSTRAP: Created {created_edges['KNOWS']} KNOWS and {created_edges['TRUSTS']} TRUSTS edges.")
         return created_edges
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+_GLOBAL_TRACER: "Tracer | None" = None
+
+
+@dataclass
+class Span:
+    trace_id: str
+    name: str
+    service: str
+    start: float
+    duration_ms: float = 0.0
+    queue_wait_ms: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    In-process span recorder for one conversational turn across services.
+
+    Spans are kept in a bounded ring buffer and, when TRACE_EXPORT_PATH is set,
+    appended as JSON lines to `<path>/<service>.jsonl` so traces from h-core and
+    h-bridge can be merged offline. There is no collector to run.
+    """
+
+    def __init__(self, service: str, capacity: Optional[int] = None, export_path: Optional[str] = None):
+        self.service = service
+        self.enabled = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+        self._spans: Deque[Span] = deque(maxlen=capacity or int(os.getenv("TRACE_BUFFER_SIZE", "2048")))
+        self._lock = threading.Lock()
+        export_path = export_path if export_path is not None else os.getenv("TRACE_EXPORT_PATH")
+        self._export_file = os.path.join(export_path, f"{service}.jsonl") if export_path else None
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+        if self._export_file:
+            try:
+                with open(self._export_file, "a") as f:
+                    f.write(json.dumps(asdict(span)) + "\n")
+            except OSError as e:
+                logger.warning(f"TRACING: Export to {self._export_file} failed: {e}")
+                self._export_file = None
+
+    @contextmanager
+    def span(
+        self, trace_id: Optional[str], name: str, enqueued_at: Optional[float] = None, **attrs: Any
+    ) -> Iterator[Optional[Span]]:
+        """
+        Times the wrapped block. `enqueued_at` (epoch seconds, usually metadata.sent_at)
+        splits the time the message waited in a stream or channel from processing time.
+        """
+        if not trace_id or not self.enabled:
+            yield None
+            return
+
+        start = time.time()
+        started = time.perf_counter()
+        queue_wait = max(0.0, (start - enqueued_at) * 1000) if enqueued_at else None
+        span = Span(trace_id=str(trace_id), name=name, service=self.service, start=start, queue_wait_ms=queue_wait)
+        span.attrs.update(attrs)
+        try:
+            yield span
+        except Exception as e:
+            span.attrs["error"] = str(e)[:200]
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - started) * 1000
+            self.record(span)
+
+    def get_trace(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return [s for s in self._spans if s.trace_id == trace_id]
+
+    def recent_traces(self, limit: int = 20) -> List[str]:
+        """Most recent trace ids, newest first."""
+        seen: List[str] = []
+        with self._lock:
+            spans = list(self._spans)
+        for s in reversed(spans):
+            if s.trace_id not in seen:
+                seen.append(s.trace_id)
+                if len(seen) >= limit:
+                    break
+        return seen
+
+    def waterfall(self, trace_id: str, extra_spans: Optional[List[Span]] = None) -> List[Dict[str, Any]]:
+        return build_waterfall(self.get_trace(trace_id) + list(extra_spans or []))
+
+
+def build_waterfall(spans: List[Span]) -> List[Dict[str, Any]]:
+    """Orders spans by start time, with offsets relative to the first hop of the turn."""
+    if not spans:
+        return []
+    ordered = sorted(spans, key=lambda s: s.start)
+    origin = min(s.start - (s.queue_wait_ms or 0) / 1000 for s in ordered)
+    rows = []
+    for s in ordered:
+        rows.append(
+            {
+                "name": s.name,
+                "service": s.service,
+                "offset_ms": round((s.start - origin) * 1000, 1),
+                "queue_wait_ms": round(s.queue_wait_ms, 1) if s.queue_wait_ms is not None else None,
+                "duration_ms": round(s.duration_ms, 1),
+                "attrs": s.attrs,
+            }
+        )
+    return rows
+
+
+def format_waterfall(rows: List[Dict[str, Any]], width: int = 40) -> str:
+    """Renders a waterfall as text: `.` is queue wait, `#` is processing time."""
+    if not rows:
+        return "(no spans)"
+    total = max(r["offset_ms"] + r["duration_ms"] for r in rows) or 1.0
+    scale = width / total
+    lines = []
+    for r in rows:
+        wait = r["queue_wait_ms"] or 0.0
+        wait_start = max(0.0, r["offset_ms"] - wait)
+        pad = int(wait_start * scale)
+        dots = int(wait * scale)
+        bar = max(1, int(r["duration_ms"] * scale))
+        wait_label = f" (+{wait:.0f}ms queued)" if r["queue_wait_ms"] is not None else ""
+        lines.append(
+            f"{r['service'] + ':' + r['name']:<36} |{' ' * pad}{'.' * dots}{'#' * bar:<{width - pad - dots}}| "
+            f"{r['duration_ms']:.0f}ms{wait_label}"
+        )
+    return "\n".join(lines)
+
+
+def load_spans(path: str, trace_id: Optional[str] = None) -> List[Span]:
+    """Reads exported spans from a .jsonl file or a directory of them."""
+    if os.path.isdir(path):
+        files = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".jsonl")]
+    else:
+        files = [path]
+    spans = []
+    for file_path in files:
+        with open(file_path) as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if trace_id is None or data.get("trace_id") == trace_id:
+                    spans.append(Span(**data))
+    return spans
+
+
+def get_tracer(service: str = "h-core") -> Tracer:
+    global _GLOBAL_TRACER
+    if _GLOBAL_TRACER is None:
+        _GLOBAL_TRACER = Tracer(service)
+    return _GLOBAL_TRACER
+
+
+def trace_context(data: Any) -> tuple[Optional[str], Optional[float]]:
+    """Returns (trace_id, sent_at) from an HLinkMessage or its dict form."""
+    metadata = data.get("metadata") if isinstance(data, dict) else getattr(data, "metadata", None)
+    if metadata is None:
+        return None, None
+    if not isinstance(metadata, dict):
+        metadata = {"trace_id": getattr(metadata, "trace_id", None), "sent_at": getattr(metadata, "sent_at", None)}
+    sent_at = metadata.get("sent_at")
+    try:
+        sent_at = float(sent_at) if sent_at is not None else None
+    except (TypeError, ValueError):
+        sent_at = None
+    return metadata.get("trace_id"), sent_at
+
+
+def start_trace(data: Dict[str, Any]) -> str:
+    """Stamps a raw message dict with a trace id (reusing its correlation_id) and its send time."""
+    metadata = data.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = {}
+        data["metadata"] = metadata
+    trace_id = metadata.get("trace_id") or metadata.get("correlation_id")
+    if not trace_id:
+        trace_id = str(uuid4())
+        metadata["correlation_id"] = trace_id
+    metadata["trace_id"] = str(trace_id)
+    metadata["sent_at"] = time.time()
+    return trace_id
+
+
+async def handle_trace_request(request):
+    """aiohttp handler for GET /traces/{trace_id} (`recent` lists trace ids, `?format=text` renders a waterfall)."""
+    from aiohttp import web
+
+    tracer = get_tracer()
+    trace_id = request.match_info["trace_id"]
+    if trace_id == "recent":
+        return web.json_response({"traces": tracer.recent_traces()})
+    rows = tracer.waterfall(trace_id)
+    if request.query.get("format") == "text":
+        return web.Response(text=format_waterfall(rows) + "\n", content_type="text/plain")
+    return web.json_response({"trace_id": trace_id, "spans": rows})
+
+
+if __name__ == "__main__":
+    # python -m src.services.tracing <export file or dir> [trace_id]
+    source = sys.argv[1] if len(sys.argv) > 1 else os.getenv("TRACE_EXPORT_PATH", ".")
+    all_spans = load_spans(source)
+    wanted = sys.argv[2] if len(sys.argv) > 2 else (all_spans[-1].trace_id if all_spans else None)
+    print(f"trace {wanted}")
+    print(format_waterfall(build_waterfall([s for s in all_spans if s.trace_id == wanted])))
@@ -10,14 +10,17 @@ AGENTS_DIR = os.getenv("AGENTS_DIR", "/app/agents")
 
 
 class VisualBible:
+    # Parsed from YAML on first access rather than at import time.
+    _LAZY_FIELDS = ("poses", "attitudes", "style", "personas", "themes")
+
     def __init__(self):
-        self.poses = {}
-        self.attitudes = {}
-        self.style = {}
-        self.personas = {}
-        self.themes = {}
         self.current_theme_name = "Default"
-        self.load_all()
+
+    def __getattr__(self, name):
+        if name in VisualBible._LAZY_FIELDS:
+            self.load_all()
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def _safe_load(self, path, default=None):
         if os.path.exists(path):
@@ -37,6 +40,8 @@ class VisualBible:
         # Allow override from env for testing
         config_dir = os.getenv("VISUAL_CONFIG_DIR", CONFIG_DIR)
         agents_dir = os.getenv("AGENTS_DIR", AGENTS_DIR)
+        for field in VisualBible._LAZY_FIELDS:
+            self.__dict__.setdefault(field, {})
 
         # 1. Load Poses
         self.poses = self._safe_load(os.path.join(config_dir, "POSES.yaml"))
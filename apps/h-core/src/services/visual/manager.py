@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Any
 
 from src.infrastructure.surrealdb import SurrealDbClient
+from src.services.media_index import get_media_index
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +38,7 @@ class AssetManager:
             await loop.run_in_executor(None, shutil.move, source_path, dest_path)
             # Story 25.6: Ensure bridge can serve the file (chmod 644)
             os.chmod(dest_path, 0o644)
+            get_media_index(self.storage_path).record(dest_path)
             logger.info(f"Asset moved to {dest_path} with 644 permissions")
         except Exception as e:
             logger.error(f"Failed to move asset from {source_path} to {dest_path}: {e}")
@@ -8,6 +8,8 @@ from typing import Any
 
 import httpx
 
+from src.infrastructure.http import get_http_client
+
 logger = logging.getLogger(__name__)
 
 class VisualProvider(ABC):
@@ -36,6 +38,7 @@ class GoogleImagenProvider(VisualProvider):
     def __init__(self, api_key: str | None = None, model: str = None):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
         self.model = model or os.getenv("GOOGLE_IMAGEN_MODEL", "imagen-4.0-fast-generate-001")
+        self._client = None
         
         if not self.api_key:
             logger.warning("GOOGLE_API_KEY not found. Imagen generation will fail.")
@@ -47,7 +50,10 @@ class GoogleImagenProvider(VisualProvider):
             from google import genai
             from google.genai import types
             
-            client = genai.Client(api_key=self.api_key)
+            # Reuse one SDK client (and its connection pool) across generations
+            if self._client is None:
+                self._client = genai.Client(api_key=self.api_key)
+            client = self._client
             
             # Map kwargs to Imagen config
             aspect_ratio = kwargs.get("aspect_ratio", "1:1")
@@ -136,41 +142,41 @@ class NanoBananaProvider(VisualProvider):
             "Content-Type": "application/json"
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # STORY 25.1 LOGGING: Full Image Prompt and Full Response
-                safe_payload = payload.copy()
-                if "reference_image" in safe_payload:
-                    safe_payload["reference_image"] = f"[BASE64_DATA:{len(safe_payload['reference_image'])} chars]"
-                logger.info(f"RAW_IMAGE_PROMPT: {json.dumps(safe_payload, indent=2)}")
+        client = get_http_client("nanobanana")
+        try:
+            # STORY 25.1 LOGGING: Full Image Prompt and Full Response
+            safe_payload = payload.copy()
+            if "reference_image" in safe_payload:
+                safe_payload["reference_image"] = f"[BASE64_DATA:{len(safe_payload['reference_image'])} chars]"
+            logger.info(f"RAW_IMAGE_PROMPT: {json.dumps(safe_payload, indent=2)}")
                 
-                logger.info(f"Calling NanoBanana API: {endpoint} with prompt: {prompt[:50]}...")
-                response = await client.post(endpoint, json=payload, headers=headers, timeout=60.0)
-                response.raise_for_status()
+            logger.info(f"Calling NanoBanana API: {endpoint} with prompt: {prompt[:50]}...")
+            response = await client.post(endpoint, json=payload, headers=headers, timeout=60.0)
+            response.raise_for_status()
                 
-                data = response.json()
-                logger.info(f"RAW_IMAGE_RESPONSE: {json.dumps(data, indent=2)}")
+            data = response.json()
+            logger.info(f"RAW_IMAGE_RESPONSE: {json.dumps(data, indent=2)}")
                 
-                image_url = data.get("url")
+            image_url = data.get("url")
                 
-                if data.get("status") == "failed" or data.get("error"):
-                    error_msg = data.get("error", "Unknown provider error")
-                    logger.error(f"NanoBanana API reported failure: {error_msg}")
-                    raise ValueError(f"Generation failed: {error_msg}")
+            if data.get("status") == "failed" or data.get("error"):
+                error_msg = data.get("error", "Unknown provider error")
+                logger.error(f"NanoBanana API reported failure: {error_msg}")
+                raise ValueError(f"Generation failed: {error_msg}")
 
-                if not image_url:
-                    logger.error(f"NanoBanana API response missing 'url': {data}")
-                    raise ValueError("Invalid response from NanoBanana API: missing 'url'")
+            if not image_url:
+                logger.error(f"NanoBanana API response missing 'url': {data}")
+                raise ValueError("Invalid response from NanoBanana API: missing 'url'")
                 
-                logger.info(f"Successfully generated image: {image_url}")
-                return str(image_url)
+            logger.info(f"Successfully generated image: {image_url}")
+            return str(image_url)
                 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"NanoBanana API error: {e.response.status_code} - {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error calling NanoBanana API: {e}")
-                raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"NanoBanana API error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error calling NanoBanana API: {e}")
+            raise
 
 class ImagenV2Provider(VisualProvider):
     """
@@ -241,68 +247,68 @@ class ImagenV2Provider(VisualProvider):
             "Content-Type": "application/json"
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # 1. Start generation
-                safe_payload = payload.copy()
-                if "reference_image" in safe_payload:
-                    safe_payload["reference_image"] = f"[BASE64_DATA:{len(safe_payload['reference_image'])} chars]"
+        client = get_http_client("imagen_v2")
+        try:
+            # 1. Start generation
+            safe_payload = payload.copy()
+            if "reference_image" in safe_payload:
+                safe_payload["reference_image"] = f"[BASE64_DATA:{len(safe_payload['reference_image'])} chars]"
                 
-                logger.info(f"IMAGENV2_START: {json.dumps(safe_payload, indent=2)}")
+            logger.info(f"IMAGENV2_START: {json.dumps(safe_payload, indent=2)}")
                 
-                response = await client.post(generate_endpoint, json=payload, headers=headers, timeout=30.0)
-                response.raise_for_status()
+            response = await client.post(generate_endpoint, json=payload, headers=headers, timeout=30.0)
+            response.raise_for_status()
                 
-                gen_data = response.json()
-                job_id = gen_data.get("job_id")
+            gen_data = response.json()
+            job_id = gen_data.get("job_id")
                 
-                if not job_id:
-                    logger.error(f"ImagenV2 API response missing 'job_id': {gen_data}")
-                    raise ValueError("Invalid response from ImagenV2 API: missing 'job_id'")
+            if not job_id:
+                logger.error(f"ImagenV2 API response missing 'job_id': {gen_data}")
+                raise ValueError("Invalid response from ImagenV2 API: missing 'job_id'")
                 
-                logger.info(f"IMAGENV2_QUEUED: Job ID {job_id}")
+            logger.info(f"IMAGENV2_QUEUED: Job ID {job_id}")
 
-                # 2. Polling for results
-                image_endpoint = f"{base_endpoint}/image/{job_id}"
-                max_retries = 120  # 120 * 5s = 10 minutes (matching API timeout)
+            # 2. Polling for results
+            image_endpoint = f"{base_endpoint}/image/{job_id}"
+            max_retries = 120  # 120 * 5s = 10 minutes (matching API timeout)
                 
-                for attempt in range(max_retries):
-                    img_response = await client.get(image_endpoint, headers=headers, timeout=30.0)
+            for attempt in range(max_retries):
+                img_response = await client.get(image_endpoint, headers=headers, timeout=30.0)
                     
-                    if img_response.status_code == 200:
-                        # Image is ready!
-                        logger.info(f"IMAGENV2_SUCCESS: Job {job_id} complete.")
+                if img_response.status_code == 200:
+                    # Image is ready!
+                    logger.info(f"IMAGENV2_SUCCESS: Job {job_id} complete.")
                         
-                        # Save binary content to temp file
-                        fd, path = tempfile.mkstemp(suffix=".png")
-                        with os.fdopen(fd, "wb") as tmp:
-                            tmp.write(img_response.content)
+                    # Save binary content to temp file
+                    fd, path = tempfile.mkstemp(suffix=".png")
+                    with os.fdopen(fd, "wb") as tmp:
+                        tmp.write(img_response.content)
                         
-                        return f"file://{path}"
+                    return f"file://{path}"
                     
-                    elif img_response.status_code == 202:
-                        # Still processing
-                        progress_data = img_response.json()
-                        state = progress_data.get("state", "UNKNOWN")
-                        progress = progress_data.get("meta", {}).get("progress", 0)
-                        logger.debug(f"IMAGENV2_PROGRESS: Job {job_id} is {state} ({progress}%)")
-                        await asyncio.sleep(5)
+                elif img_response.status_code == 202:
+                    # Still processing
+                    progress_data = img_response.json()
+                    state = progress_data.get("state", "UNKNOWN")
+                    progress = progress_data.get("meta", {}).get("progress", 0)
+                    logger.debug(f"IMAGENV2_PROGRESS: Job {job_id} is {state} ({progress}%)")
+                    await asyncio.sleep(5)
                         
-                    elif img_response.status_code == 500:
-                        # Server error or generation failure
-                        error_data = img_response.json()
-                        error_msg = error_data.get("detail", {}).get("error", "Unknown server error")
-                        logger.error(f"IMAGENV2_FAILURE: Job {job_id} failed: {error_msg}")
-                        raise ValueError(f"Generation failed: {error_msg}")
+                elif img_response.status_code == 500:
+                    # Server error or generation failure
+                    error_data = img_response.json()
+                    error_msg = error_data.get("detail", {}).get("error", "Unknown server error")
+                    logger.error(f"IMAGENV2_FAILURE: Job {job_id} failed: {error_msg}")
+                    raise ValueError(f"Generation failed: {error_msg}")
                     
-                    else:
-                        img_response.raise_for_status()
+                else:
+                    img_response.raise_for_status()
                 
-                raise TimeoutError(f"ImagenV2 generation timed out after {max_retries * 5} seconds")
+            raise TimeoutError(f"ImagenV2 generation timed out after {max_retries * 5} seconds")
                 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"ImagenV2 API error: {e.response.status_code} - {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error calling ImagenV2 API: {e}")
-                raise
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ImagenV2 API error: {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error calling ImagenV2 API: {e}")
+            raise
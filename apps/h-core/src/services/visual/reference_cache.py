@@ -0,0 +1,142 @@
+import asyncio
+import base64
+import io
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+class ReferenceImageCache:
+    """
+    Keeps decoded, resized and base64-encoded reference images in memory.
+
+    Entries are keyed by (path, mtime) so editing a character sheet on disk
+    invalidates the cached copy on the next lookup.
+    """
+
+    def __init__(self, max_entries: int = 32, max_dimension: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_dimension = (
+            max_dimension if max_dimension is not None else int(os.getenv("VISUAL_REFERENCE_MAX_DIM", "1024"))
+        )
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _encode(self, path: str) -> str:
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if PIL_AVAILABLE and self.max_dimension > 0:
+            try:
+                with Image.open(io.BytesIO(data)) as img:
+                    if max(img.size) > self.max_dimension:
+                        img.thumbnail((self.max_dimension, self.max_dimension))
+                        buf = io.BytesIO()
+                        img.save(buf, format="PNG", optimize=True)
+                        data = buf.getvalue()
+            except Exception as e:
+                logger.debug(f"REFERENCE_CACHE: Resize skipped for {path}: {e}")
+
+        return f"data:image/png;base64,{base64.b64encode(data).decode('utf-8')}"
+
+    def get_data_uri(self, path: str) -> str:
+        """Returns the reference image at `path` as a PNG data URI, encoding it only when the file changed."""
+        mtime = os.path.getmtime(path)
+        cached = self._entries.get(path)
+        if cached and cached[0] == mtime:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        data_uri = self._encode(path)
+        self._entries[path] = (mtime, data_uri)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return data_uri
+
+    def invalidate(self, path: Optional[str] = None):
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(path, None)
+
+
+class BackgroundRemover:
+    """
+    Wraps rembg with a single warm session reused across calls. Its inputs are
+    freshly generated images, never seen twice, so cut-outs are not cached.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or os.getenv("REMBG_MODEL", "u2net")
+        self._session = None
+        self._remove = None
+        self._available: Optional[bool] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        if self._available is None:
+            try:
+                from rembg import remove
+
+                self._remove = remove
+                self._available = True
+                logger.info("POST_PROCESS: rembg is available.")
+            except ImportError:
+                self._available = False
+                logger.warning("POST_PROCESS: rembg NOT FOUND. Background removal will be skipped.")
+        return self._available
+
+    def _get_session(self):
+        if self._session is None:
+            try:
+                from rembg import new_session
+
+                self._session = new_session(self.model_name)
+                logger.info(f"POST_PROCESS: rembg session '{self.model_name}' warmed up.")
+            except Exception as e:
+                logger.warning(f"POST_PROCESS: Could not create rembg session, using default: {e}")
+                self._session = False
+        return self._session or None
+
+    def remove_bytes(self, data: bytes) -> bytes:
+        """Blocking background removal with the shared session."""
+        session = self._get_session()
+        return self._remove(data, session=session) if session else self._remove(data)
+
+    async def remove_file(self, local_path: str) -> bool:
+        """Removes the background of `local_path` in place, off the event loop."""
+        if not self.available:
+            return False
+
+        def _blocking_remove():
+            with open(local_path, "rb") as i:
+                output_data = self.remove_bytes(i.read())
+            with open(local_path, "wb") as o:
+                o.write(output_data)
+
+        # The rembg session is not safe to share across concurrent threads.
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _blocking_remove)
+        return True
+
+    async def warm_up(self):
+        """Loads the rembg model ahead of the first generation."""
+        if self.available:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._get_session)
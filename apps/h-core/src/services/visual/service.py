@@ -1,32 +1,21 @@
-import base64
 import logging
 import os
 import tempfile
 import json
-import asyncio
 from typing import Any, Optional
 
-import httpx
-
+from src.infrastructure.http import get_http_client
 from src.infrastructure.llm import LlmClient
 from src.infrastructure.redis import RedisClient
 from src.models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
 from src.services.visual.manager import AssetManager
 from src.services.visual.provider import VisualProvider
 from src.services.visual.bible import build_prompt, bible
+from src.services.visual.reference_cache import BackgroundRemover, ReferenceImageCache
 from src.services.visual.vault import VaultService
 
 logger = logging.getLogger(__name__)
 
-try:
-    from rembg import remove
-
-    REMBG_AVAILABLE = True
-    logger.info("POST_PROCESS: rembg is available.")
-except ImportError:
-    REMBG_AVAILABLE = False
-    logger.warning("POST_PROCESS: rembg NOT FOUND. Background removal will be skipped.")
-
 
 class VisualImaginationService:
     def __init__(
@@ -37,6 +26,8 @@ class VisualImaginationService:
         redis_client: RedisClient,
         agents_base_path: str = "agents",
         vault_service: Optional[VaultService] = None,
+        reference_cache: Optional[ReferenceImageCache] = None,
+        background_remover: Optional[BackgroundRemover] = None,
     ):
         self.provider = visual_provider
         self.asset_manager = asset_manager
@@ -44,23 +35,16 @@ class VisualImaginationService:
         self.redis = redis_client
         self.agents_base_path = agents_base_path
         self.vault = vault_service or VaultService(self.asset_manager.db)
+        self.reference_cache = reference_cache or ReferenceImageCache()
+        self.background_remover = background_remover or BackgroundRemover()
 
     async def _remove_background(self, local_path: str) -> bool:
-        """Removes background from image using rembg in a separate thread."""
-        if not REMBG_AVAILABLE:
+        """Removes background from image using the shared warm rembg session."""
+        if not self.background_remover.available:
             return False
         try:
             logger.info(f"POST_PROCESS: Removing background for {local_path}...")
-
-            def _blocking_remove():
-                with open(local_path, "rb") as i:
-                    input_data = i.read()
-                    output_data = remove(input_data)
-                    with open(local_path, "wb") as o:
-                        o.write(output_data)
-
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, _blocking_remove)
+            await self.background_remover.remove_file(local_path)
             logger.info(f"POST_PROCESS_SUCCESS: Background removed for {local_path}")
             return True
         except Exception as e:
@@ -79,10 +63,9 @@ class VisualImaginationService:
         # Take the first available reference
         ref_path = ref_paths[0]
         try:
-            with open(ref_path, "rb") as f:
-                encoded = base64.b64encode(f.read()).decode("utf-8")
-                logger.info(f"REFERENCE_INJECTED: Loaded {ref_path} for {agent_id}")
-                return f"data:image/png;base64,{encoded}"
+            data_uri = self.reference_cache.get_data_uri(ref_path)
+            logger.info(f"REFERENCE_INJECTED: Loaded {ref_path} for {agent_id}")
+            return data_uri
         except Exception as e:
             logger.error(f"REFERENCE_ERROR: {e}")
             return None
@@ -231,12 +214,11 @@ class VisualImaginationService:
 
     async def _download_image(self, url: str) -> Optional[str]:
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, timeout=30.0)
-                resp.raise_for_status()
-                fd, path = tempfile.mkstemp(suffix=".png")
-                with os.fdopen(fd, "wb") as tmp:
-                    tmp.write(resp.content)
-                return path
+            resp = await get_http_client("media").get(url, timeout=30.0)
+            resp.raise_for_status()
+            fd, path = tempfile.mkstemp(suffix=".png")
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(resp.content)
+            return path
         except:
             return None
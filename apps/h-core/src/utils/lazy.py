@@ -0,0 +1,96 @@
+import asyncio
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_import_profile: Dict[str, float] = {}
+_profile_lock = threading.Lock()
+_lazy_modules: Dict[str, "LazyModule"] = {}
+
+
+def is_available(name: str) -> bool:
+    """Checks whether `name` is importable without actually importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def record_import(name: str, duration_ms: float):
+    with _profile_lock:
+        _import_profile[name] = round(duration_ms, 1)
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy optional dependency.
+
+    The real module is imported on first attribute access (or explicit `load()`),
+    and the time spent importing it is recorded in the process import profile.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return not self._failed and (self._module is not None or is_available(self._name))
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> Optional[ModuleType]:
+        if self._module is not None or self._failed:
+            return self._module
+        with self._lock:
+            if self._module is None and not self._failed:
+                start = time.perf_counter()
+                try:
+                    self._module = importlib.import_module(self._name)
+                except Exception as e:
+                    self._failed = True
+                    logger.warning(f"LAZY_IMPORT: Could not import {self._name}: {e}")
+                    return None
+                record_import(self._name, (time.perf_counter() - start) * 1000)
+        return self._module
+
+    def __getattr__(self, item: str):
+        module = self.load()
+        if module is None:
+            raise AttributeError(f"Optional module '{self._name}' is not available")
+        return getattr(module, item)
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Returns the shared lazy facade for `name`."""
+    if name not in _lazy_modules:
+        _lazy_modules[name] = LazyModule(name)
+    return _lazy_modules[name]
+
+
+def get_import_profile() -> List[Dict[str, float]]:
+    """Deferred imports performed so far, slowest first."""
+    with _profile_lock:
+        items = sorted(_import_profile.items(), key=lambda kv: kv[1], reverse=True)
+    return [{"module": name, "ms": ms} for name, ms in items]
+
+
+async def warm_up(*names: str) -> List[str]:
+    """Imports the given modules in a worker thread so the event loop never blocks on them."""
+    loop = asyncio.get_running_loop()
+    loaded = []
+    for name in names:
+        module = await loop.run_in_executor(None, lazy_import(name).load)
+        if module is not None:
+            loaded.append(name)
+    return loaded
@@ -28,3 +28,21 @@ def reset_logging():
             for handler in logger.handlers[:]:
                 if not isinstance(handler, logging.Handler) or "MagicMock" in str(type(handler.level)):
                     logger.removeHandler(handler)
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_provider_health():
+    """Breaker and latency state is process-wide; keep one test's failures out of the next."""
+    from src.infrastructure.llm_resilience import reset_provider_health
+
+    reset_provider_health()
+    yield
+    reset_provider_health()
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_response_cache(monkeypatch):
+    """Cacheable LLM calls must not read answers persisted by another test (or run)."""
+    from src.infrastructure import llm_response_cache
+
+    monkeypatch.setattr(llm_response_cache, "_cache", llm_response_cache.LlmResponseCache(path=":memory:"))
@@ -0,0 +1,97 @@
+"""
+Offline stand-in for litellm's `acompletion`, scriptable per model.
+
+    fake = FakeProvider()
+    fake.script("p/main", Reply("hi", latency=0.2), Fail(TimeoutError()), HANG)
+    fake.default("p/backup", Reply("backup"))
+    with patch("src.infrastructure.llm.acompletion", fake): ...
+
+Each call to a model consumes its next scripted step; once the script is
+used up, the model's default applies (an instant "ok" unless set).
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+
+class ProviderError(Exception):
+    """Error carrying an HTTP status, like the litellm exception classes."""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@dataclass
+class Reply:
+    content: str = "ok"
+    latency: float = 0.0
+    tokens: int = 10
+
+
+@dataclass
+class Fail:
+    error: BaseException
+    latency: float = 0.0
+
+
+HANG = Reply(content="", latency=3600.0)
+
+
+@dataclass
+class Call:
+    model: str
+    kwargs: Dict[str, Any]
+    cancelled: bool = False
+    finished: bool = False
+
+
+@dataclass
+class FakeProvider:
+    scripts: Dict[str, List[Any]] = field(default_factory=dict)
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    calls: List[Call] = field(default_factory=list)
+
+    def script(self, model: str, *steps: Any) -> "FakeProvider":
+        self.scripts.setdefault(model, []).extend(steps)
+        return self
+
+    def default(self, model: str, step: Any) -> "FakeProvider":
+        self.defaults[model] = step
+        return self
+
+    def calls_to(self, model: str) -> List[Call]:
+        return [c for c in self.calls if c.model == model]
+
+    def _next(self, model: str) -> Any:
+        steps = self.scripts.get(model)
+        if steps:
+            return steps.pop(0)
+        return self.defaults.get(model, Reply())
+
+    async def __call__(self, model: str, messages: Optional[list] = None, stream: bool = False, **kwargs: Any) -> Any:
+        call = Call(model=model, kwargs=dict(kwargs, messages=messages, stream=stream))
+        self.calls.append(call)
+        step = self._next(model)
+        try:
+            if step.latency:
+                await asyncio.sleep(step.latency)
+        except asyncio.CancelledError:
+            call.cancelled = True
+            raise
+        call.finished = True
+        if isinstance(step, Fail):
+            raise step.error
+        if stream:
+            return _stream(step.content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=step.content, tool_calls=None))],
+            usage=SimpleNamespace(prompt_tokens=step.tokens // 2, completion_tokens=step.tokens // 2, total_tokens=step.tokens),
+        )
+
+
+async def _stream(content: str):
+    for word in content.split(" "):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
@@ -24,3 +24,88 @@ async def test_process_event(mock_redis: RedisClient, mock_ha: HaClient):
     await worker.process_event(event)
     # Assert publish_event was called with expected message
     mock_redis.publish_event.assert_called_with("system_stream", ANY)  # Check payload
+
+
+def _state_event(entity_id, state):
+    return {"event_type": "state_changed", "data": {"entity_id": entity_id, "new_state": {"state": state}}}
+
+
+def _streams(mock_redis):
+    return [call.args[0] for call in mock_redis.publish_event.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_allowlist_and_blocklist(mock_redis, mock_ha):
+    worker = HaEventWorker(mock_redis, mock_ha, allowed_domains={"light"}, blocked_entities={"light.debug"})
+    await worker.process_event(_state_event("switch.fan", "on"))
+    await worker.process_event(_state_event("light.debug", "on"))
+    mock_redis.publish_event.assert_not_called()
+
+    await worker.process_event(_state_event("light.salon", "on"))
+    assert _streams(mock_redis) == ["system_stream"]
+
+
+@pytest.mark.asyncio
+async def test_clock_sensors_blocked_by_default_and_patterns_supported(mock_redis, mock_ha, monkeypatch):
+    monkeypatch.delenv("HA_BLOCKED_ENTITIES", raising=False)
+    worker = HaEventWorker(mock_redis, mock_ha, telemetry_domains=set())
+    for entity_id in ("sensor.time", "sensor.time_utc", "sensor.time_date", "sensor.date_time_iso"):
+        await worker.process_event(_state_event(entity_id, "12:00"))
+    mock_redis.publish_event.assert_not_called()
+    await worker.process_event(_state_event("sensor.timer_kitchen", "on"))
+    assert mock_redis.publish_event.call_count == 1
+
+    monkeypatch.setenv("HA_BLOCKED_ENTITIES", "light.debug_*")
+    worker = HaEventWorker(mock_redis, mock_ha, telemetry_domains=set())
+    await worker.process_event(_state_event("light.debug_strip", "on"))
+    await worker.process_event(_state_event("sensor.time_utc", "12:01"))
+    assert _streams(mock_redis) == ["system_stream", "system_stream"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_state_is_dropped(mock_redis, mock_ha):
+    worker = HaEventWorker(mock_redis, mock_ha)
+    await worker.process_event(_state_event("light.kitchen", "on"))
+    await worker.process_event(_state_event("light.kitchen", "on"))
+    assert mock_redis.publish_event.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_numeric_threshold(mock_redis, mock_ha):
+    worker = HaEventWorker(mock_redis, mock_ha, numeric_thresholds={"sensor": 10}, coalesce_window=0)
+    for value in ("100", "104", "108", "111"):
+        await worker.process_event(_state_event("sensor.power", value))
+
+    # 104 and 108 are within 10 of the last accepted value (100); 111 is not
+    assert mock_redis.publish_event.call_count == 2
+    assert _streams(mock_redis) == ["telemetry_stream", "telemetry_stream"]
+    assert mock_redis.publish_event.call_args.kwargs["max_len"] == worker.telemetry_maxlen
+
+
+@pytest.mark.asyncio
+async def test_telemetry_is_coalesced_to_latest_state(mock_redis, mock_ha):
+    import asyncio
+
+    proactivity = MagicMock()
+    proactivity.process_event = AsyncMock()
+    worker = HaEventWorker(mock_redis, mock_ha, proactivity, numeric_thresholds={"sensor": 0}, coalesce_window=0.05)
+    for value in ("1", "2", "3"):
+        await worker.process_event(_state_event("sensor.lux", value))
+    mock_redis.publish_event.assert_not_called()
+    assert proactivity.process_event.call_count == 3
+
+    await asyncio.sleep(0.1)
+    assert mock_redis.publish_event.call_count == 1
+    stream, msg = mock_redis.publish_event.call_args.args
+    assert stream == "telemetry_stream"
+    assert "changed to 3" in msg["payload"]["content"]
+    assert msg["metadata"]["priority"] == "low"
+
+
+@pytest.mark.asyncio
+async def test_flush_pending_on_stop(mock_redis, mock_ha):
+    mock_ha.close = AsyncMock()
+    worker = HaEventWorker(mock_redis, mock_ha, coalesce_window=60)
+    await worker.process_event(_state_event("sensor.temperature", "21.5"))
+    await worker.stop()
+    assert _streams(mock_redis) == ["telemetry_stream"]
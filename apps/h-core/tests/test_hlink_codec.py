@@ -0,0 +1,107 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.models import hlink_codec
+from src.models.hlink import HLinkMessage, MessageType, Payload, Recipient, Sender
+from src.models.hlink_codec import HLinkView, decode, decode_entry, encode, encode_entry
+
+
+def _message() -> HLinkMessage:
+    return HLinkMessage(
+        type=MessageType.NARRATIVE_TEXT,
+        sender=Sender(agent_id="lisa", role="agent"),
+        recipient=Recipient(target="broadcast"),
+        payload=Payload(content="Bonjour à tous !"),
+    )
+
+
+def _legacy_fields(data: dict) -> dict:
+    """What RedisClient.publish_event wrote before the codec."""
+    return {k: json.dumps(v) if isinstance(v, (dict, list)) else str(v) for k, v in data.items()}
+
+
+def test_entry_round_trip_is_a_single_versioned_field():
+    msg = _message()
+    fields = encode_entry(msg)
+    assert list(fields) == ["h"]
+
+    view = decode_entry(fields)
+    assert isinstance(view, HLinkView) and isinstance(view, dict)
+    assert view.schema_version == hlink_codec.SCHEMA_VERSION
+    assert "v" not in view
+    assert view.type == "narrative.text" and view.sender_id == "lisa" and view.target == "broadcast"
+    assert view["payload"]["content"] == "Bonjour à tous !"
+    assert view.validate() == msg
+
+
+def test_legacy_entries_still_decode():
+    data = _message().model_dump(mode="json")
+    view = decode_entry(_legacy_fields(data))
+    assert view.schema_version == 0
+    assert view["sender"] == {"agent_id": "lisa", "role": "agent"}
+    assert view.validate().payload.content == "Bonjour à tous !"
+
+    wrapped = decode_entry({"type": "user_message", "data": json.dumps(data)})
+    assert wrapped["sender"]["agent_id"] == "lisa"
+
+
+def test_legacy_wire_format_can_be_forced(monkeypatch):
+    monkeypatch.setattr(hlink_codec, "WIRE_FORMAT", "legacy")
+    fields = encode_entry({"type": "system.log", "payload": {"content": "x"}})
+    assert fields == {"type": "system.log", "payload": '{"content": "x"}'}
+
+
+def test_validation_is_lazy_and_cached():
+    view = decode(encode(_message()))
+    with patch.object(HLinkMessage, "model_validate", wraps=HLinkMessage.model_validate) as validate:
+        assert view.type == "narrative.text"
+        validate.assert_not_called()
+        first = view.validate()
+        assert view.validate() is first
+        assert validate.call_count == 1
+
+
+def test_invalid_message_is_reported_not_raised_by_validate_message():
+    view = decode(encode({"type": "audio.chunk", "payload": {"content": {}}}))
+    msg, error = view.validate_message()
+    assert msg is None and error
+
+
+def test_newer_schema_version_decodes_best_effort():
+    raw = hlink_codec.dumps({"v": hlink_codec.SCHEMA_VERSION + 1, "type": "narrative.text", "extra": 1})
+    view = decode(raw)
+    assert view.schema_version == hlink_codec.SCHEMA_VERSION + 1 and view["extra"] == 1
+
+
+@pytest.mark.slow
+def test_benchmark_codec_against_legacy_flattening():
+    """Microbenchmark: encode+decode of a typical message, codec vs per-field JSON sniffing."""
+    data = _message().model_dump(mode="json")
+    data["payload"]["content"] = "Une réponse d'agent de longueur moyenne. " * 8
+    data["metadata"]["trace_id"] = "t" * 32
+    n = 5000
+
+    started = time.perf_counter()
+    for _ in range(n):
+        decode_entry(encode_entry(data))
+    codec_us = (time.perf_counter() - started) / n * 1e6
+
+    started = time.perf_counter()
+    for _ in range(n):
+        fields = _legacy_fields(data)
+        decode_entry(fields)
+    legacy_us = (time.perf_counter() - started) / n * 1e6
+
+    started = time.perf_counter()
+    for _ in range(n):
+        HLinkMessage.validate_message(data)
+    validate_us = (time.perf_counter() - started) / n * 1e6
+
+    print(
+        f"\nHLINK_CODEC_BENCH (orjson={hlink_codec.ORJSON_AVAILABLE}): codec {codec_us:.1f}us, "
+        f"legacy {legacy_us:.1f}us, full validation {validate_us:.1f}us per message"
+    )
+    assert codec_us < legacy_us
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.infrastructure.http import HttpClientRegistry
+
+
+@pytest.mark.asyncio
+async def test_registry_returns_same_pooled_client():
+    registry = HttpClientRegistry()
+    a = registry.get("home_assistant")
+    b = registry.get("home_assistant")
+    assert a is b
+    assert isinstance(a, httpx.AsyncClient)
+    assert registry.get("media") is not a
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_configure_applies_headers_and_rebuilds_on_change():
+    registry = HttpClientRegistry()
+    registry.configure("home_assistant", headers={"Authorization": "Bearer t1"}, timeout=10.0)
+    first = registry.get("home_assistant")
+    assert first.headers["Authorization"] == "Bearer t1"
+
+    # Identical settings keep the existing pool
+    registry.configure("home_assistant", headers={"Authorization": "Bearer t1"}, timeout=10.0)
+    assert registry.get("home_assistant") is first
+
+    registry.configure("home_assistant", headers={"Authorization": "Bearer t2"})
+    second = registry.get("home_assistant")
+    assert second is not first
+    assert second.headers["Authorization"] == "Bearer t2"
+    await asyncio.sleep(0)  # the replaced pool is closed in the background
+    assert first.is_closed
+    await registry.aclose()
+
+
+def test_configure_rejects_unknown_setting():
+    registry = HttpClientRegistry()
+    with pytest.raises(ValueError):
+        registry.configure("x", pool_size=3)
+
+
+def test_client_rebuilt_for_new_event_loop():
+    registry = HttpClientRegistry()
+
+    async def grab():
+        return registry.get("media")
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+    assert first is not second
+    asyncio.run(registry.aclose())
+    assert first.is_closed and second.is_closed
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_all_clients():
+    registry = HttpClientRegistry()
+    client = registry.get("media")
+    sync_client = registry.get_sync("elevenlabs")
+    await registry.aclose()
+    assert client.is_closed
+    assert sync_client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_close_releases_one_profile(monkeypatch):
+    from src.infrastructure import ha_client
+
+    registry = HttpClientRegistry()
+    monkeypatch.setattr(ha_client, "http_clients", registry)
+    ha, other = ha_client.HaClient(), ha_client.HaClient()
+    pooled = ha.client
+    media = registry.get("media")
+
+    # One caller closing must not break the pool under everyone else's in-flight requests
+    await ha.close()
+    assert other.client is pooled and not pooled.is_closed
+
+    await registry.close("home_assistant")
+    assert pooled.is_closed and not media.is_closed
+    assert ha.client is not pooled and not ha.client.is_closed
+    await registry.aclose()
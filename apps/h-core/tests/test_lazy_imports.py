@@ -0,0 +1,75 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils import lazy
+from src.utils.lazy import LazyModule, get_import_profile, is_available, lazy_import, warm_up
+
+
+def test_is_available_does_not_import():
+    sys.modules.pop("colorsys", None)
+    assert is_available("colorsys") is True
+    assert "colorsys" not in sys.modules
+    assert is_available("definitely_not_a_module_xyz") is False
+
+
+def test_lazy_module_imports_on_first_attribute_and_records_profile():
+    sys.modules.pop("colorsys", None)
+    mod = LazyModule("colorsys")
+    assert mod.loaded is False
+
+    assert mod.rgb_to_hsv(1, 0, 0)[0] == 0.0
+    assert mod.loaded is True
+    assert any(entry["module"] == "colorsys" for entry in get_import_profile())
+
+
+def test_lazy_module_missing_dependency():
+    mod = LazyModule("definitely_not_a_module_xyz")
+    assert mod.available is False
+    assert mod.load() is None
+    with pytest.raises(AttributeError):
+        mod.anything
+
+
+def test_lazy_import_is_shared():
+    assert lazy_import("json") is lazy_import("json")
+
+
+@pytest.mark.asyncio
+async def test_warm_up_skips_missing_modules():
+    loaded = await warm_up("json", "definitely_not_a_module_xyz")
+    assert loaded == ["json"]
+
+
+def test_import_profile_sorted_slowest_first():
+    with patch.dict(lazy._import_profile, {"fast": 1.0, "slow": 50.0}, clear=True):
+        assert [e["module"] for e in get_import_profile()] == ["slow", "fast"]
+
+
+def test_visual_bible_defers_yaml_parsing(tmp_path, monkeypatch):
+    from src.services.visual.bible import VisualBible
+
+    (tmp_path / "POSES.yaml").write_text("neutral: standing still\n")
+    monkeypatch.setenv("VISUAL_CONFIG_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENTS_DIR", str(tmp_path / "agents"))
+
+    vb = VisualBible()
+    assert "poses" not in vb.__dict__
+
+    assert vb.poses == {"neutral": "standing still"}
+    assert vb.personas == {}
+
+
+@pytest.mark.asyncio
+async def test_llm_client_loads_litellm_on_first_completion():
+    from src.infrastructure import llm
+
+    fake = MagicMock()
+    fake.acompletion = MagicMock()
+    with patch.object(llm, "LITELLM_AVAILABLE", True), patch.object(llm, "acompletion", None), patch.object(
+        llm, "litellm", None
+    ), patch.object(llm.lazy_import("litellm"), "load", return_value=fake):
+        assert llm._load_litellm() is fake.acompletion
+        assert llm.litellm is fake
+        assert fake.drop_params is True
@@ -0,0 +1,226 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from fake_llm_provider import HANG, Fail, FakeProvider, ProviderError, Reply
+from src.infrastructure import llm_resilience
+from src.infrastructure.llm import LlmClient
+from src.infrastructure.llm_resilience import CLOSED, HALF_OPEN, OPEN, ProviderHealth, get_provider_health
+from src.infrastructure.rate_governor import RateGovernor
+
+MESSAGES = [{"role": "user", "content": "Salut"}]
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setenv("LLM_RETRY_BASE_S", "0.01")
+    provider = FakeProvider()
+    with patch("src.infrastructure.llm.acompletion", provider), patch(
+        "src.infrastructure.llm._load_litellm", return_value=True
+    ), patch("src.infrastructure.llm.get_rate_governor", return_value=RateGovernor(limits={})):
+        yield provider
+
+
+def _client(*fallbacks):
+    return LlmClient(
+        config_override={"model": "p/main"},
+        fallback_providers=[{"model": m, "priority": i} for i, m in enumerate(fallbacks)],
+    )
+
+
+def test_timeout_follows_recent_p95():
+    health = ProviderHealth("m", min_samples=5, timeout_factor=3, min_timeout=1, max_timeout=60)
+    assert health.timeout() == 60  # nothing learned yet
+    for latency in [2.0] * 19 + [4.0]:
+        health.record_success(latency)
+    assert health.p95() == 4.0
+    assert health.timeout() == 12.0
+    for _ in range(50):
+        health.record_success(0.01)
+    assert health.timeout() == 1  # clamped to the floor
+
+
+def test_breaker_opens_then_lets_one_probe_through():
+    health = ProviderHealth("m", failure_threshold=3, cooldown=10)
+    for _ in range(3):
+        assert health.allow()
+        health.record_failure()
+    assert health.state == OPEN and not health.allow()
+
+    health.opened_at -= 11  # cooldown elapsed
+    assert health.allow() and health.state == HALF_OPEN
+    assert not health.allow()  # single probe in flight
+    health.record_failure()
+    assert health.state == OPEN and not health.allow()
+
+    health.opened_at -= 11
+    assert health.allow()
+    health.record_success(0.5)
+    assert health.state == CLOSED and health.allow()
+
+
+def test_only_transient_errors_are_retryable():
+    assert llm_resilience.is_transient_error(asyncio.TimeoutError())
+    assert llm_resilience.is_transient_error(ProviderError(503))
+    assert llm_resilience.is_transient_error(ProviderError(429))
+    assert not llm_resilience.is_transient_error(ProviderError(401))
+    assert not llm_resilience.is_transient_error(ValueError("bad request"))
+
+
+@pytest.mark.asyncio
+async def test_transient_error_is_retried_on_the_same_provider(fake):
+    fake.script("p/main", Fail(ProviderError(503)), Reply("après retry"))
+    result = await _client("p/backup").get_completion(MESSAGES)
+    assert result == "après retry"
+    assert len(fake.calls_to("p/main")) == 2 and not fake.calls_to("p/backup")
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_falls_through_without_retry(fake):
+    fake.script("p/main", Fail(ProviderError(401)))
+    fake.default("p/backup", Reply("secours"))
+    assert await _client("p/backup").get_completion(MESSAGES) == "secours"
+    assert len(fake.calls_to("p/main")) == 1
+
+
+@pytest.mark.asyncio
+async def test_learned_timeout_cuts_a_hung_call(fake, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    health = get_provider_health("p/main")
+    health.min_timeout, health.timeout_factor = 0.05, 2
+    for _ in range(10):
+        health.record_success(0.01)
+    fake.script("p/main", HANG)
+    fake.default("p/backup", Reply("secours"))
+
+    started = time.monotonic()
+    assert await _client("p/backup").get_completion(MESSAGES) == "secours"
+    assert time.monotonic() - started < 1.0
+    assert fake.calls_to("p/main")[0].cancelled
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_skips_the_provider(fake, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    get_provider_health("p/main").failure_threshold = 2
+    fake.default("p/main", Fail(ProviderError(500)))
+    fake.default("p/backup", Reply("secours"))
+    client = _client("p/backup")
+    for _ in range(4):
+        assert await client.get_completion(MESSAGES) == "secours"
+        client._current_provider = None  # keep starting from the primary
+    assert len(fake.calls_to("p/main")) == 2
+    assert get_provider_health("p/main").state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_returns_the_error_message(fake, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "1")
+    fake.default("p/main", Fail(ProviderError(502, "bad gateway")))
+    result = await _client().get_completion(MESSAGES)
+    assert result.startswith("Erreur de communication avec mon cerveau") and "bad gateway" in result
+    assert len(fake.calls_to("p/main")) == 2
+
+
+@pytest.mark.asyncio
+async def test_hedge_races_the_fallback_after_the_p95_budget(fake, monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE", "true")
+    for _ in range(10):
+        get_provider_health("p/main").record_success(0.05)
+    fake.script("p/main", Reply("lent", latency=2.0))
+    fake.default("p/backup", Reply("rapide", latency=0.01))
+
+    client = _client("p/backup")
+    started = time.monotonic()
+    result = await client.get_completion(MESSAGES, return_full_object=True)
+    assert result.choices[0].message.content == "rapide"
+    assert time.monotonic() - started < 1.0
+    assert fake.calls_to("p/main")[0].cancelled
+    # A cancelled loser is not a provider failure
+    assert get_provider_health("p/main").consecutive_failures == 0
+    assert client._current_provider["model"] == "p/backup"
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_started_when_primary_is_within_budget(fake, monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE", "true")
+    for _ in range(10):
+        get_provider_health("p/main").record_success(0.5)
+    fake.script("p/main", Reply("à l'heure", latency=0.05))
+    assert await _client("p/backup").get_completion(MESSAGES) == "à l'heure"
+    assert not fake.calls_to("p/backup")
+
+
+@pytest.mark.asyncio
+async def test_stream_goes_through_the_fake_provider(fake):
+    fake.script("p/main", Fail(asyncio.TimeoutError()), Reply("Bonjour le monde"))
+    generator = await _client().get_completion(MESSAGES, stream=True)
+    text = "".join([chunk async for chunk in generator])
+    assert text.strip() == "Bonjour le monde"
+
+
+@pytest.mark.asyncio
+async def test_hung_provider_without_history_falls_back_after_one_timeout(fake, monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT_MAX_S", "0.2")
+    fake.script("p/main", HANG, HANG, HANG)
+    fake.default("p/backup", Reply("secours"))
+
+    started = time.monotonic()
+    assert await _client("p/backup").get_completion(MESSAGES) == "secours"
+    assert time.monotonic() - started < 0.4
+    assert len(fake.calls_to("p/main")) == 1
+
+
+@pytest.mark.asyncio
+async def test_overall_deadline_caps_retries(fake, monkeypatch):
+    monkeypatch.setenv("LLM_TIMEOUT_MAX_S", "0.2")
+    monkeypatch.setenv("LLM_DEADLINE_S", "0.3")
+    fake.default("p/main", HANG)
+
+    started = time.monotonic()
+    result = await _client().get_completion(MESSAGES)
+    assert result.startswith("Erreur de communication avec mon cerveau")
+    assert time.monotonic() - started < 0.45
+    assert len(fake.calls_to("p/main")) == 2  # the second try only gets what is left of the deadline
+
+
+@pytest.fixture
+def paused_governor(fake):
+    governor = RateGovernor(limits={})
+    governor.limiter("p/main").paused_until = time.monotonic() + 4
+    with patch("src.infrastructure.llm.get_rate_governor", return_value=governor):
+        yield governor
+
+
+@pytest.mark.asyncio
+async def test_probe_is_released_when_cancelled_in_the_governor_queue(fake, paused_governor):
+    health = get_provider_health("p/main")
+    health.failure_threshold = 1
+    health.record_failure()
+    health.opened_at -= health.cooldown + 1
+    assert health.allow() and health.state == HALF_OPEN  # the probe is ours
+
+    call = asyncio.create_task(_client()._call({"model": "p/main"}, MESSAGES, False, None, 0, 10))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert not fake.calls_to("p/main")
+    assert health.allow()
+
+
+@pytest.mark.asyncio
+async def test_overall_deadline_covers_the_governor_queue(fake, paused_governor, monkeypatch):
+    monkeypatch.setenv("LLM_DEADLINE_S", "0.3")
+    fake.default("p/main", Reply("trop tard"))
+
+    started = time.monotonic()
+    result = await _client().get_completion(MESSAGES)
+    assert result.startswith("Erreur de communication avec mon cerveau")
+    assert time.monotonic() - started < 0.6
+    assert not fake.calls_to("p/main")
+    assert paused_governor.limiter("p/main").in_flight == 0
+    assert get_provider_health("p/main").allow()
@@ -0,0 +1,138 @@
+from unittest.mock import patch
+
+import pytest
+
+from fake_llm_provider import Fail, FakeProvider, ProviderError, Reply
+from src.infrastructure import llm_response_cache
+from src.infrastructure.llm import LlmClient
+from src.infrastructure.llm_response_cache import LlmResponseCache, cache_key, scope_key
+from src.infrastructure.rate_governor import RateGovernor
+
+PROMPT = "Evaluate the urge to speak.\nUser message: \"{text}\"\nAgents: lisa, renarde"
+
+
+@pytest.fixture
+def fake():
+    provider = FakeProvider()
+    with patch("src.infrastructure.llm.acompletion", provider), patch(
+        "src.infrastructure.llm._load_litellm", return_value=True
+    ), patch("src.infrastructure.llm.get_rate_governor", return_value=RateGovernor(limits={})):
+        yield provider
+
+
+def _messages(text="Bonjour"):
+    return [{"role": "system", "content": PROMPT.format(text=text)}]
+
+
+def test_key_ignores_whitespace_but_not_parameters():
+    a = cache_key("p/m", [{"role": "system", "content": "Extract  facts:\n\n hello "}], {"temperature": None})
+    b = cache_key("p/m", [{"role": "system", "content": "Extract facts: hello"}], {"temperature": None})
+    assert a == b
+    assert a != cache_key("p/m", [{"role": "system", "content": "Extract facts: hello"}], {"temperature": 0.7})
+    assert a != cache_key("p/other", [{"role": "system", "content": "Extract facts: hello"}], {"temperature": None})
+
+
+def test_scope_is_the_prompt_without_its_hint():
+    assert scope_key("p/m", _messages("Bonjour"), "Bonjour") == scope_key("p/m", _messages("Salut"), "Salut")
+    other_cast = [{"role": "system", "content": PROMPT.replace("renarde", "electra").format(text="Salut")}]
+    assert scope_key("p/m", _messages("Salut"), "Salut") != scope_key("p/m", other_cast, "Salut")
+
+
+@pytest.mark.asyncio
+async def test_only_cacheable_calls_are_served_from_cache(fake):
+    fake.default("p/main", Reply('{"lisa": 0.9}'))
+    client = LlmClient(config_override={"model": "p/main"})
+
+    assert await client.get_completion(_messages(), cacheable=True) == '{"lisa": 0.9}'
+    assert await client.get_completion(_messages(), cacheable=True) == '{"lisa": 0.9}'
+    assert len(fake.calls) == 1
+
+    # Persona chat (not marked) always goes to the provider
+    await client.get_completion(_messages())
+    await client.get_completion(_messages())
+    assert len(fake.calls) == 3
+    assert llm_response_cache.get_response_cache().stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(fake, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    fake.script("p/main", Fail(ProviderError(401, "bad key")), Reply("ok"))
+    client = LlmClient(config_override={"model": "p/main"})
+    assert (await client.get_completion(_messages(), cacheable=True)).startswith("Erreur")
+    assert await client.get_completion(_messages(), cacheable=True) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_fallback_answers_are_not_cached_for_the_primary(fake, monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    fake.script("p/main", Fail(ProviderError(401, "bad key")))
+    fake.default("p/main", Reply("main"))
+    fake.default("p/backup", Reply("backup"))
+    client = LlmClient(config_override={"model": "p/main"}, fallback_providers=[{"model": "p/backup"}])
+    assert await client.get_completion(_messages(), cacheable=True) == "backup"
+
+    # Back on the primary, the lookup under p/main must not replay the fallback's answer
+    client = LlmClient(config_override={"model": "p/main"})
+    assert await client.get_completion(_messages(), cacheable=True) == "main"
+    assert await client.get_completion(_messages(), cacheable=True) == "main"
+    assert [c.model for c in fake.calls] == ["p/main", "p/backup", "p/main"]
+
+
+@pytest.mark.asyncio
+async def test_global_switch_disables_the_cache(fake, monkeypatch):
+    monkeypatch.setenv("LLM_RESPONSE_CACHE", "false")
+    client = LlmClient(config_override={"model": "p/main"})
+    await client.get_completion(_messages(), cacheable=True)
+    await client.get_completion(_messages(), cacheable=True)
+    assert len(fake.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_hint_hits_the_similarity_tier(fake):
+    vectors = {"Bonjour Lisa": [1.0, 0.0, 0.1], "Bonjour Lisa !": [1.0, 0.0, 0.12], "Quel temps fait-il ?": [0.0, 1.0, 0]}
+    fake.default("p/main", Reply('{"lisa": 0.9}'))
+    client = LlmClient(config_override={"model": "p/main"})
+    client.embedding_model = object()
+
+    async def embed(text):
+        return vectors[text]
+
+    with patch.object(client, "get_embedding", side_effect=embed):
+        for text in ["Bonjour Lisa", "Bonjour Lisa !", "Quel temps fait-il ?"]:
+            await client.get_completion(_messages(text), cacheable=True, cache_hint=text)
+
+    assert [c.kwargs["messages"][0]["content"] for c in fake.calls] == [
+        PROMPT.format(text="Bonjour Lisa"),
+        PROMPT.format(text="Quel temps fait-il ?"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_store_persists_expires_and_evicts(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    cache = LlmResponseCache(path=path, ttl=60, max_entries=2)
+    for i in range(3):
+        await cache.set(f"k{i}", "p/m", f"r{i}")
+    assert await cache.get("k0", "p/m") is None  # least recently used, evicted
+
+    reopened = LlmResponseCache(path=path, ttl=60, max_entries=2)
+    assert await reopened.get("k2", "p/m") == "r2"
+
+    expired = LlmResponseCache(path=path, ttl=-1)
+    await expired.set("old", "p/m", "stale")
+    assert await expired.get("old", "p/m") is None
+
+
+@pytest.mark.asyncio
+async def test_social_arbiter_scores_are_cached_per_message(fake):
+    from types import SimpleNamespace
+
+    from src.features.home.social_arbiter.scoring import ScoringEngine
+
+    fake.default("p/main", Reply('{"lisa": 0.8}'))
+    engine = ScoringEngine(llm_client=LlmClient(config_override={"model": "p/main"}))
+    profile = SimpleNamespace(agent_id="lisa", name="Lisa", role="assistant", domains=["maison"], description="")
+    assert await engine.calculate_relevance_llm("Allume la lumière", [profile]) == {"lisa": 0.8}
+    assert await engine.calculate_relevance_llm("Allume la lumière", [profile]) == {"lisa": 0.8}
+    assert len(fake.calls) == 1
@@ -310,3 +310,133 @@ class TestLocationService:
         assert result["success"] is True
         assert result["location"]["confidence"]["level"] == "medium"
         assert result["location"]["confidence"]["reason"] is None
+
+    @pytest.mark.asyncio
+    async def test_registry_runs_history_compaction_in_the_background(self, mock_surreal, monkeypatch):
+        import asyncio
+
+        from src.features.home.spatial.registry import SpatialRegistry
+
+        monkeypatch.setenv("LOCATION_COMPACTION_INTERVAL_S", "0.01")
+        service = LocationService(mock_surreal)
+        service.repository.warm_cache = AsyncMock(return_value=0)
+        service.repository.compact_history = AsyncMock(side_effect=[RuntimeError("db down")] + [{}] * 100)
+        registry = SpatialRegistry(location_service=service)
+
+        await registry.initialize()
+        await asyncio.sleep(0.1)
+        await registry.close()
+
+        # A failed pass does not end the loop
+        assert service.repository.compact_history.await_count >= 2
+
+
+class TestCurrentLocationView:
+    @pytest.fixture
+    def mock_surreal(self):
+        mock = MagicMock()
+        mock._call = AsyncMock()
+        return mock
+
+    @pytest.mark.asyncio
+    async def test_save_upserts_current_row_and_serves_reads_from_cache(self, mock_surreal):
+        repo = LocationRepository(mock_surreal)
+        await repo.save_location(AgentLocation(agent_id="agent-1", room_id="kitchen", timestamp=datetime(2024, 1, 15)))
+
+        query = mock_surreal._call.call_args[0][1]
+        assert "INSERT INTO agent_location_current" in query and "ON DUPLICATE KEY UPDATE" in query
+
+        mock_surreal._call.reset_mock()
+        result = await LocationRepository(mock_surreal).get_current_location("agent-1")
+        assert result.room_id == "kitchen"
+        mock_surreal._call.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_history_for_legacy_agents(self, mock_surreal):
+        legacy = {"agent_id": "agent-1", "room_id": "attic", "timestamp": "2024-01-15T10:30:00"}
+        mock_surreal._call.side_effect = [[{"result": []}], [{"result": [legacy]}], None]
+        repo = LocationRepository(mock_surreal)
+
+        assert (await repo.get_current_location("agent-1")).room_id == "attic"
+        assert "ORDER BY timestamp DESC" in mock_surreal._call.call_args_list[1][0][1]
+        backfill = mock_surreal._call.call_args_list[2][0]
+        assert "INSERT INTO agent_location_current" in backfill[1]
+        assert backfill[2]["agent_id"] == "agent-1" and backfill[2]["room_id"] == "attic"
+        assert (await repo.get_current_location("agent-1")).room_id == "attic"
+        assert mock_surreal._call.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unknown_agent_is_cached_until_it_moves(self, mock_surreal):
+        mock_surreal._call.return_value = [{"result": []}]
+        repo = LocationRepository(mock_surreal)
+
+        assert await repo.get_current_location("ghost") is None
+        assert await repo.get_current_location("ghost") is None
+        assert mock_surreal._call.call_count == 2  # current row + history, once
+
+        await repo.save_location(AgentLocation(agent_id="ghost", room_id="attic", timestamp=datetime(2024, 1, 15)))
+        assert (await repo.get_current_location("ghost")).room_id == "attic"
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_is_not_cached(self, mock_surreal):
+        mock_surreal._call.return_value = None
+        repo = LocationRepository(mock_surreal)
+
+        assert await repo.get_current_location("agent-1") is None
+        assert await repo.get_current_location("agent-1") is None
+        assert mock_surreal._call.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_warm_cache_loads_all_agents(self, mock_surreal):
+        mock_surreal._call.return_value = [{"result": [
+            {"agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:30:00"},
+            {"agent_id": "b", "room_id": "garden", "timestamp": "2024-01-15T10:31:00"},
+        ]}]
+        service = LocationService(mock_surreal)
+        await service.initialize()
+        mock_surreal._call.reset_mock()
+
+        assert (await service.get_current_location("b"))["room_id"] == "garden"
+        mock_surreal._call.assert_not_called()
+
+    def test_downsample_keeps_last_per_bucket_and_only_room_changes(self):
+        records = [
+            {"id": "1", "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:01:00"},
+            {"id": "2", "agent_id": "a", "room_id": "salon", "timestamp": "2024-01-15T10:05:00"},
+            {"id": "3", "agent_id": "a", "room_id": "salon", "timestamp": "2024-01-15T10:20:00"},
+            {"id": "4", "agent_id": "a", "room_id": "garden", "timestamp": "2024-01-15T10:40:00"},
+            {"id": "5", "agent_id": "b", "room_id": "salon", "timestamp": "2024-01-15T10:02:00"},
+            {"id": "6", "agent_id": "b", "room_id": "salon", "timestamp": "bad"},
+        ]
+        doomed = LocationRepository._downsample(records, bucket_seconds=15 * 60)
+        assert sorted(doomed) == ["1", "3"]
+
+    @pytest.mark.asyncio
+    async def test_compact_history_deletes_expired_and_downsampled(self, mock_surreal):
+        old = [
+            {"id": "agent_location:1", "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:01:00"},
+            {"id": "agent_location:2", "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:40:00"},
+        ]
+        mock_surreal._call.side_effect = [[{"result": [{"id": "x"}]}], [{"result": old}], None]
+        stats = await LocationRepository(mock_surreal).compact_history(retention_days=30)
+
+        assert stats == {"expired": 1, "downsampled": 1}
+        query, params = mock_surreal._call.call_args_list[2][0][1:]
+        assert "DELETE type::thing('agent_location', $key)" in query
+        assert params == {"keys": ["2"]}
+
+    @pytest.mark.asyncio
+    async def test_compact_history_turns_any_id_form_into_record_keys(self, mock_surreal):
+        class RecordID:  # what the driver returns instead of a string
+            def __str__(self):
+                return "agent_location:⟨b7⟩"
+
+        old = [
+            {"id": "agent_location:a0", "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:01:00"},
+            {"id": RecordID(), "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:20:00"},
+            {"id": "agent_location:`c9`", "agent_id": "a", "room_id": "kitchen", "timestamp": "2024-01-15T10:40:00"},
+        ]
+        mock_surreal._call.side_effect = [[{"result": []}], [{"result": old}], None]
+        await LocationRepository(mock_surreal).compact_history(retention_days=30)
+
+        assert mock_surreal._call.call_args_list[2][0][2] == {"keys": ["b7", "c9"]}
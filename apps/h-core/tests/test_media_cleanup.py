@@ -113,3 +113,77 @@ async def test_cleanup_runs_periodically():
             pass
 
         assert worker.run_once.call_count >= 1
+
+
+def _write(path, size, age):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_evicts_oldest_until_under_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(10):
+            _write(os.path.join(tmp, f"clip_{i}.wav"), 1000, age=(10 - i) * 10)
+
+        worker, _ = _make_worker(tmp, max_files=100)
+        worker.max_bytes = 6500
+        await worker.run_once()
+
+        assert sorted(os.listdir(tmp)) == [f"clip_{i}.wav" for i in range(4, 10)]
+        assert worker.index.total_bytes == 6000
+
+
+@pytest.mark.asyncio
+async def test_index_is_not_rescanned_after_first_cycle():
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(5):
+            _write(os.path.join(tmp, f"asset_{i}.png"), 10, age=100 + i)
+
+        worker, _ = _make_worker(tmp, max_files=5)
+        await worker.run_once()
+
+        # A file that appears without a hook or watcher is invisible until recorded
+        _write(os.path.join(tmp, "stray.png"), 10, age=1000)
+        with patch("os.scandir", side_effect=AssertionError("rescanned")):
+            await worker.run_once()
+            assert len(os.listdir(tmp)) == 6
+
+            worker.index.record(os.path.join(tmp, "stray.png"))
+            await worker.run_once()
+        assert "stray.png" not in os.listdir(tmp)
+        assert len(os.listdir(tmp)) == 5
+
+
+@pytest.mark.asyncio
+async def test_save_asset_records_into_shared_index():
+    from src.services.media_index import get_media_index
+    from src.services.visual.manager import AssetManager
+
+    with tempfile.TemporaryDirectory() as storage, tempfile.TemporaryDirectory() as scratch:
+        db = MagicMock()
+        db.save_asset_record = AsyncMock(return_value="asset-1")
+        source = os.path.join(scratch, "new.png")
+        _write(source, 42, age=0)
+
+        await AssetManager(db, storage_path=storage).save_asset(source, {})
+
+        index = get_media_index(storage)
+        assert os.path.join(storage, "new.png") in index
+        assert index.total_bytes == 42
+
+
+def test_index_skips_stale_heap_items():
+    from src.services.media_index import MediaIndex
+
+    index = MediaIndex("/nonexistent")
+    index.record("/nonexistent/a", size=1, atime=10.0)
+    index.record("/nonexistent/b", size=2, atime=20.0)
+    index.record("/nonexistent/a", size=1, atime=30.0)  # accessed again
+    index.discard("/nonexistent/b")
+
+    assert index.pop_oldest() == ("/nonexistent/a", 1, 30.0)
+    assert index.pop_oldest() is None
+    assert index.total_bytes == 0
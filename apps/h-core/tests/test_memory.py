@@ -53,6 +53,46 @@ async def test_memory_consolidation_success():
     mock_redis.publish.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_stored_facts_are_announced_whoever_writes_them():
+    from src.infrastructure.surrealdb import SurrealDbClient
+
+    client = SurrealDbClient(url="ws://mock:8000/rpc", user="root", password="root")
+    client.events = AsyncMock()
+    ok = [{"status": "OK", "result": []}]
+    client._call = AsyncMock(side_effect=lambda method, *args: [{"id": "fact:abc"}] if method == "create" else ok)
+
+    fid = await client.insert_graph_memory(
+        {"fact": "User likes green tea", "subject": "user", "agent": "Renarde", "embedding": [0.1, 0.2]}
+    )
+
+    assert fid == "fact:abc"
+    stream, event = client.events.publish_event.call_args.args
+    assert stream == "system_stream"
+    assert event["type"] == "memory.facts_added"
+    (fact,) = event["payload"]["content"]["facts"]
+    assert fact["id"] == "fact:abc" and fact["content"] == "User likes green tea" and fact["agent"] == "Renarde"
+    assert "embedding" not in fact
+
+
+@pytest.mark.asyncio
+async def test_removed_facts_are_announced():
+    from src.infrastructure.surrealdb import SurrealDbClient
+
+    client = SurrealDbClient(url="ws://mock:8000/rpc", user="root", password="root")
+    client.events = AsyncMock()
+    client._call = AsyncMock(return_value=[{"status": "OK", "result": []}])
+    assert await client.cleanup_orphaned_facts() == 0
+    client.events.publish_event.assert_not_called()
+
+    client._call.return_value = [{"status": "OK", "result": [{"id": "fact:1"}, {"id": "fact:2"}]}]
+    assert await client.cleanup_orphaned_facts() == 2
+    assert await client.supersede_backstory("Lisa", "h1", ["fact:a"]) is True
+    events = [c.args[1] for c in client.events.publish_event.call_args_list]
+    assert [e["type"] for e in events] == ["memory.facts_removed", "memory.facts_removed"]
+    assert events[0]["payload"]["content"] == {"count": 2}
+
+
 # =============================================
 # Decay Tests (Story 13.2)
 # =============================================
@@ -98,3 +138,102 @@ async def test_apply_decay_logs_results():
 
     # Check that redis publish was called with correct log
     mock_surreal.cleanup_orphaned_facts.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_backstory_skipped_when_persona_hash_matches():
+    mock_surreal = AsyncMock()
+    mock_llm = AsyncMock()
+    mock_surreal.get_backstory_hash.return_value = MemoryConsolidator.backstory_hash("Lisa", "assistant", "Curieuse")
+
+    consolidator = MemoryConsolidator(mock_surreal, mock_llm, AsyncMock())
+    assert await consolidator.generate_backstory("Lisa", "assistant", "Curieuse") is False
+
+    mock_llm.get_completion.assert_not_called()
+    mock_surreal.insert_graph_memory.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_changed_persona_regenerates_and_supersedes_old_backstory():
+    mock_surreal = AsyncMock()
+    mock_llm = AsyncMock()
+    mock_surreal.get_backstory_hash.return_value = MemoryConsolidator.backstory_hash("Lisa", "assistant", "Curieuse")
+    mock_surreal.insert_graph_memory.side_effect = ["fact:a", "fact:b"]
+    mock_llm.get_completion.return_value = '["Souvenir un", "Souvenir deux"]'
+    mock_llm.get_embedding.return_value = [0.1]
+
+    consolidator = MemoryConsolidator(mock_surreal, mock_llm, AsyncMock())
+    assert await consolidator.generate_backstory("Lisa", "assistant", "Sarcastique") is True
+
+    stored = [c.args[0] for c in mock_surreal.insert_graph_memory.call_args_list]
+    assert [f["fact"] for f in stored] == ["Souvenir un", "Souvenir deux"]
+    assert all(f["source"] == "backstory" and f["permanent"] for f in stored)
+    new_hash = MemoryConsolidator.backstory_hash("Lisa", "assistant", "Sarcastique")
+    mock_surreal.supersede_backstory.assert_awaited_once_with("Lisa", new_hash, ["fact:a", "fact:b"])
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_keeps_the_old_backstory():
+    mock_surreal = AsyncMock()
+    mock_llm = AsyncMock()
+    mock_surreal.get_backstory_hash.return_value = None
+    mock_llm.get_completion.return_value = "Erreur de communication avec mon cerveau: timeout"
+
+    consolidator = MemoryConsolidator(mock_surreal, mock_llm, AsyncMock())
+    assert await consolidator.generate_backstory("Lisa", "assistant") is False
+    mock_surreal.supersede_backstory.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_backstories_are_queued_and_run_one_at_a_time():
+    import asyncio
+
+    running, peak, done = 0, 0, []
+
+    async def generate(name, role, description=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(name)
+
+    consolidator = MemoryConsolidator(AsyncMock(), AsyncMock(), AsyncMock())
+    with patch.object(consolidator, "generate_backstory", side_effect=generate):
+        for name in ["Lisa", "Renarde", "Lisa", "Electra"]:
+            consolidator.schedule_backstory(name, "role")
+        await consolidator._backstory_worker
+
+    assert done == ["Lisa", "Renarde", "Electra"] and peak == 1
+
+
+@pytest.mark.asyncio
+async def test_supersede_adopts_legacy_backstory_without_source():
+    from src.infrastructure.surrealdb import SurrealDbClient
+
+    client = SurrealDbClient(url="ws://mock:8000/rpc", user="root", password="root")
+    client._call = AsyncMock(return_value=[{"status": "OK", "result": []}])
+
+    assert await client.supersede_backstory("Lisa", "h1", ["fact:a"]) is True
+
+    client._call.assert_awaited_once()
+    statements = client._call.call_args.args[1].split("\n")
+    assert statements[0] == "BEGIN TRANSACTION;" and statements[-1] == "COMMIT TRANSACTION;"
+    adopt, delete, record = statements[1:4]
+    # Legacy edges (no source) are tagged before the delete, so they go with the old backstory
+    assert adopt.startswith("UPDATE BELIEVES SET source = 'backstory'")
+    assert "in = subject:`lisa` AND source = NONE AND permanent = true" in adopt
+    assert "subject:`lisa` IN out->ABOUT->subject" in adopt
+    assert "source = 'backstory'" in delete and "NOT IN [fact:a]" in delete
+    assert "backstory_hash = $hash" in record
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("result", [None, [{"status": "OK", "result": []}, {"status": "ERR", "result": "conflict"}]])
+async def test_failed_supersede_does_not_report_the_hash_recorded(result):
+    from src.infrastructure.surrealdb import SurrealDbClient
+
+    client = SurrealDbClient(url="ws://mock:8000/rpc", user="root", password="root")
+    client._call = AsyncMock(return_value=result)
+
+    assert await client.supersede_backstory("Lisa", "h1", ["fact:a"]) is False
@@ -0,0 +1,86 @@
+import asyncio
+import random
+
+import pytest
+
+from src.services.metrics import MetricsCollector, StreamingHistogram
+
+
+def test_histogram_memory_is_bounded():
+    h = StreamingHistogram()
+    for i in range(100_000):
+        h.observe(0.001 + (i % 5000) * 0.001)
+
+    assert h.count == 100_000
+    assert len(h._buckets) < 500
+
+
+def test_histogram_quantiles_within_precision():
+    rng = random.Random(7)
+    values = [rng.expovariate(1 / 0.2) for _ in range(20_000)]
+    h = StreamingHistogram(precision=0.02)
+    for v in values:
+        h.observe(v)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert h.quantile(q) == pytest.approx(exact, rel=0.03)
+    assert h.quantile(1.0) <= h.max == max(values)
+
+
+def test_histogram_handles_zero_and_empty():
+    h = StreamingHistogram()
+    assert h.quantile(0.5) == 0.0
+    h.observe(0.0)
+    h.observe(0.0)
+    h.observe(2.0)
+    assert h.quantile(0.5) == 0.0
+    assert h.quantile(1.0) == pytest.approx(2.0, rel=0.02)
+
+
+def test_labels_are_separate_series():
+    m = MetricsCollector()
+    m.observe("llm_request_seconds", 1.0, {"provider": "openai"})
+    m.observe("llm_request_seconds", 3.0, {"provider": "ollama"})
+    m.increment("llm_errors_total", labels={"provider": "ollama"})
+
+    assert m.get_avg("llm_request_seconds", {"provider": "ollama"}) == 3.0
+    assert m.get("llm_errors_total", {"provider": "ollama"}) == 1
+    assert m.get("llm_errors_total") == 0
+
+
+def test_prometheus_export_has_tail_percentiles():
+    m = MetricsCollector()
+    for v in (0.1, 0.2, 0.3, 5.0):
+        m.observe("tts_synthesis_seconds", v, {"engine": "melotts"})
+    text = m.to_prometheus_text()
+
+    assert "# TYPE tts_synthesis_seconds summary" in text
+    assert 'tts_synthesis_seconds{engine="melotts",quantile="0.99"}' in text
+    assert 'tts_synthesis_seconds_max{engine="melotts"} 5' in text
+    assert 'tts_synthesis_seconds_count{engine="melotts"} 4' in text
+
+
+def test_prometheus_export_keeps_max_out_of_the_summary_family_and_escapes_labels():
+    m = MetricsCollector()
+    m.observe("tts_synthesis_seconds", 0.5, {"engine": "mel\\o"})
+    m.increment("errors_total", labels={"reason": 'bad "quote"\nnext'})
+    lines = m.to_prometheus_text().splitlines()
+
+    summary = lines.index("# TYPE tts_synthesis_seconds summary")
+    gauge = lines.index("# TYPE tts_synthesis_seconds_max gauge")
+    assert all("_max" not in line for line in lines[summary + 1 : gauge])
+    assert lines[gauge + 1] == 'tts_synthesis_seconds_max{engine="mel\\\\o"} 0.5'
+    assert 'errors_total{reason="bad \\"quote\\"\\nnext"} 1' in lines
+
+
+@pytest.mark.asyncio
+async def test_timer_measures_awaited_block():
+    m = MetricsCollector()
+    with m.timer("router_handle_seconds", {"stream": "conversation_stream"}):
+        await asyncio.sleep(0.01)
+
+    h = m.histogram("router_handle_seconds", {"stream": "conversation_stream"})
+    assert h.count == 1
+    assert h.max >= 0.009
@@ -61,3 +61,145 @@ async def test_plugin_loader_invalid_yaml(tmp_path):
     
     # Assert
     assert len(registry.agents) == 0
+
+
+def _write_agent(agents_dir, name, **extra):
+    agent_dir = agents_dir / name.lower()
+    agent_dir.mkdir()
+    (agent_dir / "manifest.yaml").write_text(yaml.dump({"name": name, "role": "Tester", **extra}))
+
+
+def _make_loader(agents_dir, registry):
+    mock_redis = MagicMock()
+    mock_redis.subscribe = AsyncMock()
+    mock_redis.publish = AsyncMock()
+    mock_redis.publish_event = AsyncMock()
+    mock_llm = MagicMock()
+    mock_llm.cache = None
+    return PluginLoader(str(agents_dir), registry, mock_redis, mock_llm), mock_redis
+
+
+@pytest.mark.asyncio
+async def test_plugin_loader_respects_depends_on(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "Electra", depends_on=["Lisa"])
+    _write_agent(agents_dir, "Lisa")
+    _write_agent(agents_dir, "Renarde")
+
+    loader, _ = _make_loader(agents_dir, registry)
+    order = []
+    loader.on_agent_ready = lambda agent: order.append(agent.config.name)
+
+    await loader._initial_scan()
+
+    assert set(registry.agents) == {"Electra", "Lisa", "Renarde"}
+    assert order.index("Lisa") < order.index("Electra")
+
+
+@pytest.mark.asyncio
+async def test_plugin_loader_ignores_dependency_cycles(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "A", depends_on=["B"])
+    _write_agent(agents_dir, "B", depends_on=["A"])
+
+    loader, _ = _make_loader(agents_dir, registry)
+    await asyncio.wait_for(loader._initial_scan(), timeout=5)
+
+    assert set(registry.agents) == {"A", "B"}
+
+
+@pytest.mark.asyncio
+async def test_plugin_loader_publishes_readiness_and_timeline(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "Lisa")
+
+    loader, mock_redis = _make_loader(agents_dir, registry)
+    await loader._initial_scan()
+
+    stream, event = mock_redis.publish_event.call_args[0]
+    assert stream == "system_stream"
+    assert event["type"] == "agent.ready"
+    assert event["payload"]["content"]["agent_id"] == "Lisa"
+    phases = {(e["agent"], e["phase"]) for e in loader.startup_timeline}
+    assert ("Lisa", "build") in phases and ("Lisa", "start") in phases
+
+
+@pytest.mark.asyncio
+async def test_schedule_reload_coalesces_event_bursts(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "Lisa")
+
+    loader, _ = _make_loader(agents_dir, registry)
+    loader.reload_debounce = 0.05
+    loader._reload_agent = AsyncMock()
+
+    agent_dir = str(agents_dir / "lisa")
+    for _ in range(5):  # write, chmod, rename... from a single editor save
+        loader.schedule_reload(agent_dir)
+    await asyncio.sleep(0.15)
+
+    loader._reload_agent.assert_awaited_once_with(agent_dir)
+
+
+@pytest.mark.asyncio
+async def test_reload_skips_unchanged_bundle_and_swaps_on_change(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "Lisa")
+
+    loader, _ = _make_loader(agents_dir, registry)
+    await loader._initial_scan()
+    first = registry.agents["Lisa"]
+    agent_dir = str(agents_dir / "lisa")
+
+    await loader._reload_agent(agent_dir)
+    assert registry.agents["Lisa"] is first
+
+    (agents_dir / "lisa" / "persona.yaml").write_text(yaml.dump({"prompt": "Nouvelle personnalité"}))
+    await loader._reload_agent(agent_dir)
+    await asyncio.gather(*loader._background_tasks)
+
+    second = registry.agents["Lisa"]
+    assert second is not first
+    assert second.config.prompt == "Nouvelle personnalité"
+    assert first._retiring is True
+
+
+@pytest.mark.asyncio
+async def test_retiring_agent_drops_new_messages_but_finishes_inflight(tmp_path):
+    registry = AgentRegistry()
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    _write_agent(agents_dir, "Lisa")
+    loader, _ = _make_loader(agents_dir, registry)
+    await loader._initial_scan()
+    agent = registry.agents["Lisa"]
+
+    release = asyncio.Event()
+    handled = []
+
+    async def slow_on_message(message):
+        handled.append(message)
+        await release.wait()
+
+    agent.on_message = slow_on_message
+    inflight = asyncio.create_task(agent._dispatch({"n": 1}))
+    await asyncio.sleep(0)
+
+    retire = asyncio.create_task(agent.retire(timeout=1))
+    await asyncio.sleep(0)
+    await agent._dispatch({"n": 2})
+    assert not retire.done()
+
+    release.set()
+    await asyncio.gather(inflight, retire)
+    assert handled == [{"n": 1}]
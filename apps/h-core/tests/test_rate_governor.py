@@ -0,0 +1,123 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.infrastructure import rate_governor
+from src.infrastructure.llm import LlmClient
+from src.infrastructure.rate_governor import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_DISCUSSION,
+    PRIORITY_INTERACTIVE,
+    ProviderLimiter,
+    RateGovernor,
+    TokenBucket,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_wait_and_debt():
+    bucket = TokenBucket(rate=10.0, capacity=10.0)
+    assert bucket.wait_time(5) == 0
+    bucket.consume(10)
+    assert bucket.wait_time(5) == pytest.approx(0.5, abs=0.05)
+    bucket.consume(-10)  # refund
+    assert bucket.wait_time(10) == 0
+    assert TokenBucket(rate=None).wait_time(10**9) == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_order_when_capacity_frees_up():
+    limiter = ProviderLimiter("m", concurrency=1)
+    holder = await limiter.acquire(PRIORITY_INTERACTIVE)
+    order = []
+
+    async def request(name, priority):
+        lease = await limiter.acquire(priority)
+        order.append(name)
+        lease.release()
+
+    tasks = [
+        asyncio.create_task(request("backstory", PRIORITY_BACKGROUND)),
+        asyncio.create_task(request("discussion", PRIORITY_DISCUSSION)),
+        asyncio.create_task(request("user", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queued == 3
+    holder.release()
+    await asyncio.gather(*tasks)
+    assert order == ["user", "discussion", "backstory"]
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_bucket_spaces_calls():
+    limiter = ProviderLimiter("m", rpm=600)  # 10/s, burst of 600 - drain it first
+    limiter.requests.level = 1
+    started = time.monotonic()
+    (await limiter.acquire()).release()
+    (await limiter.acquire()).release()
+    assert time.monotonic() - started >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_429_pauses_and_halves_concurrency_then_recovers():
+    limiter = ProviderLimiter("m", concurrency=4)
+    lease = await limiter.acquire()
+    with patch.object(rate_governor.random, "uniform", return_value=1.0):
+        lease.release(error=RateLimitError("429 Too Many Requests"))
+    assert limiter.concurrency == 2
+    assert limiter.paused_until - time.monotonic() == pytest.approx(2.0, abs=0.1)
+
+    limiter.paused_until = 0
+    for _ in range(3):
+        (await limiter.acquire()).release(used_tokens=10)
+    assert limiter.concurrency == 4 and limiter.consecutive_429 == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = ProviderLimiter("m", concurrency=1)
+    holder = await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    holder.release()
+    assert limiter.in_flight == 0
+    (await asyncio.wait_for(limiter.acquire(), 0.5)).release()
+
+
+def test_limits_resolve_model_then_provider_then_defaults():
+    governor = RateGovernor(limits={"openrouter": {"rpm": 20}, "openrouter/x": {"concurrency": 1}})
+    limiter = governor.limiter("openrouter/x")
+    assert limiter.requests.rate == pytest.approx(20 / 60)
+    assert limiter.max_concurrency == 1
+    assert governor.limiter("openrouter/x") is limiter
+    assert governor.limiter("ollama/y").requests.rate is None
+
+
+@pytest.mark.asyncio
+async def test_llm_client_releases_slot_and_reports_429_to_the_governor():
+    governor = RateGovernor(limits={"p": {"concurrency": 2}})
+    ok = MagicMock()
+    ok.choices = [MagicMock()]
+    ok.choices[0].message.content = "fine"
+    ok.usage.prompt_tokens, ok.usage.completion_tokens, ok.usage.total_tokens = 10, 5, 15
+
+    with patch("src.infrastructure.llm.acompletion", new_callable=AsyncMock) as mock_acompletion, patch(
+        "src.infrastructure.llm.get_rate_governor", return_value=governor
+    ), patch("src.infrastructure.llm._load_litellm", return_value=True):
+        mock_acompletion.side_effect = [RateLimitError("rate limit"), ok]
+        client = LlmClient(
+            config_override={"model": "p/main"}, fallback_providers=[{"model": "p/other", "priority": 1}]
+        )
+        result = await client.get_completion([{"role": "user", "content": "Hi"}], priority=PRIORITY_DISCUSSION)
+
+    assert result == "fine"
+    assert governor.limiter("p/main").in_flight == 0 and governor.limiter("p/main").consecutive_429 == 1
+    assert governor.limiter("p/other").in_flight == 0
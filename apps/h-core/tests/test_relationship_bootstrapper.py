@@ -14,7 +14,7 @@ def mock_surreal():
         if method == "query" and "SELECT" in query:
             return []
         else:
-            return None  # For RELATE queries
+            return [{"status": "OK", "result": []}]  # For the RELATE transaction
 
     mock._call.side_effect = side_effect
     return mock
@@ -27,5 +27,59 @@ async def test_bootstrap_relationships(mock_surreal: SurrealDbClient):
     result = await bootstrapper.bootstrap_relationships(agents)
     assert result["KNOWS"] == 2  # Bidirectional
     assert result["TRUSTS"] == 2
-    # Verify queries were called (4 SELECT + 4 RELATE + 2 INSERT)
-    assert mock_surreal._call.call_count >= 8
+    # One SELECT for existing edges + one transaction (2 INSERT + 4 RELATE)
+    assert mock_surreal._call.call_count == 2
+    transaction = mock_surreal._call.call_args_list[1].args[1]
+    assert transaction.startswith("BEGIN TRANSACTION;") and transaction.endswith("COMMIT TRANSACTION;")
+    assert transaction.count("RELATE") == 4 and transaction.count("INSERT INTO subject") == 2
+
+
+@pytest.mark.asyncio
+async def test_only_missing_edges_are_created(mock_surreal):
+    existing = [
+        {"id": "KNOWS:k1", "in": "subject:lisa", "out": "subject:renarde"},
+        {"id": "TRUSTS:t1", "in": "subject:lisa", "out": "subject:renarde"},
+        {"id": "KNOWS:k2", "in": "subject:renarde", "out": "subject:lisa"},
+    ]
+
+    async def side_effect(method, query, params=None):
+        if "SELECT" in query:
+            return [{"status": "OK", "result": existing}]
+        return [{"status": "OK", "result": []}]
+
+    mock_surreal._call.side_effect = side_effect
+    agents = [{"name": "Lisa", "role": "Assistant"}, {"name": "Renarde", "role": "Coordinator"}]
+    result = await RelationshipBootstrapper(mock_surreal).bootstrap_relationships(agents)
+
+    assert result == {"KNOWS": 0, "TRUSTS": 1}
+    transaction = mock_surreal._call.call_args_list[1].args[1]
+    assert "RELATE subject:`renarde`->TRUSTS->subject:`lisa` SET level = 0.9" in transaction
+
+
+@pytest.mark.asyncio
+async def test_bootstrapped_roster_costs_one_query(mock_surreal):
+    agents = [{"name": f"Agent {i}", "role": "crew"} for i in range(12)]
+    bootstrapper = RelationshipBootstrapper(mock_surreal)
+    rows = [
+        {"id": f"{table}:x", "in": f"subject:`{a}`", "out": f"subject:`{b}`"}
+        for table, a, b in bootstrapper.desired_edges(agents)
+    ]
+    mock_surreal._call.side_effect = None
+    mock_surreal._call.return_value = [{"status": "OK", "result": rows}]
+
+    result = await bootstrapper.bootstrap_relationships(agents)
+
+    assert result == {"KNOWS": 0, "TRUSTS": 0}
+    assert mock_surreal._call.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_transaction_reports_nothing_created(mock_surreal):
+    async def side_effect(method, query, params=None):
+        if "SELECT" in query:
+            return []
+        return [{"status": "ERR", "result": "Database index `knows_unique` already contains [...]"}]
+
+    mock_surreal._call.side_effect = side_effect
+    agents = [{"name": "a", "role": "x"}, {"name": "b", "role": "y"}]
+    assert await RelationshipBootstrapper(mock_surreal).bootstrap_relationships(agents) == {"KNOWS": 0, "TRUSTS": 0}
@@ -0,0 +1,108 @@
+import time
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from src.models.hlink import HLinkMessage
+from src.services.tracing import (
+    Tracer,
+    build_waterfall,
+    format_waterfall,
+    load_spans,
+    start_trace,
+    trace_context,
+)
+
+
+def test_start_trace_stamps_metadata_and_reuses_correlation():
+    data = {"type": "user_message", "metadata": {"correlation_id": "abc"}}
+    trace_id = start_trace(data)
+
+    assert trace_id == "abc"
+    assert data["metadata"]["trace_id"] == "abc"
+    assert trace_context(data)[1] == pytest.approx(time.time(), abs=1)
+
+    fresh = {"type": "user_message"}
+    assert start_trace(fresh) == fresh["metadata"]["trace_id"]
+
+
+def test_trace_context_survives_hlink_validation():
+    data = {
+        "type": "user_message",
+        "sender": {"agent_id": "user", "role": "user"},
+        "recipient": {"target": "broadcast"},
+        "payload": {"content": "hi"},
+        "metadata": {"trace_id": "t-1", "sent_at": 123.5},
+    }
+    msg = HLinkMessage.model_validate(data)
+    assert trace_context(msg) == ("t-1", 123.5)
+    assert trace_context(msg.model_dump(mode="json")) == ("t-1", 123.5)
+
+
+def test_span_splits_queue_wait_from_processing():
+    tracer = Tracer("test", capacity=10, export_path="")
+    with tracer.span("t-1", "core.route", enqueued_at=time.time() - 0.05):
+        time.sleep(0.01)
+
+    (span,) = tracer.get_trace("t-1")
+    assert span.queue_wait_ms >= 45
+    assert 5 <= span.duration_ms < span.queue_wait_ms
+
+
+def test_span_without_trace_id_is_noop():
+    tracer = Tracer("test", capacity=10, export_path="")
+    with tracer.span(None, "core.route") as span:
+        assert span is None
+    assert tracer.recent_traces() == []
+
+
+def test_ring_buffer_is_bounded():
+    tracer = Tracer("test", capacity=3, export_path="")
+    for i in range(5):
+        with tracer.span(f"t-{i}", "hop"):
+            pass
+    assert tracer.recent_traces() == ["t-4", "t-3", "t-2"]
+
+
+def test_file_export_and_cross_service_waterfall(tmp_path):
+    bridge = Tracer("h-bridge", export_path=str(tmp_path))
+    core = Tracer("h-core", export_path=str(tmp_path))
+
+    with bridge.span("turn", "bridge.ws_ingress"):
+        pass
+    with core.span("turn", "core.route", enqueued_at=time.time() - 0.02):
+        pass
+    with core.span("other", "core.route"):
+        pass
+
+    spans = load_spans(str(tmp_path), "turn")
+    rows = build_waterfall(spans)
+    assert [r["name"] for r in rows] == ["bridge.ws_ingress", "core.route"]
+    assert rows[1]["queue_wait_ms"] >= 15
+    text = format_waterfall(rows)
+    assert "h-core:core.route" in text and "queued" in text
+
+
+@pytest.mark.asyncio
+async def test_agent_reply_carries_trace_id():
+    from src.domain.agent import BaseAgent
+    from src.models.agent import AgentConfig
+
+    redis = MagicMock()
+    redis.publish = AsyncMock()
+    redis.publish_event = AsyncMock()
+    agent = BaseAgent(
+        config=AgentConfig(name="Lisa", role="assistant"),
+        redis_client=redis,
+        llm_client=MagicMock(),
+        surreal_client=None,
+    )
+
+    correlation_id = str(uuid4())
+    await agent.send_message("user", "narrative.text", "hello", correlation_id=correlation_id, trace_id="t-9")
+
+    sent = redis.publish.call_args[0][1]
+    assert sent.metadata.trace_id == "t-9"
+    assert str(sent.metadata.correlation_id) == correlation_id
+    assert sent.metadata.sent_at is not None
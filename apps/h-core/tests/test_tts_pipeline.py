@@ -1,4 +1,6 @@
 import asyncio
+import os
+import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -44,6 +46,89 @@ async def test_speech_queue_stop_sets_event():
     assert q._stop_event.is_set()
 
 
+@pytest.mark.asyncio
+async def test_speech_queue_drops_expired_items():
+    from src.services.audio.speech_queue import PRIORITY_PROACTIVE, SpeechQueue, SpeechRequest
+
+    q = SpeechQueue(default_ttls={PRIORITY_PROACTIVE: 0.01})
+    await q.enqueue(SpeechRequest(text="old whisper", agent_id="dieu", priority=PRIORITY_PROACTIVE))
+    await q.enqueue(SpeechRequest(text="reply", agent_id="lisa", priority=3, ttl=60))
+    await asyncio.sleep(0.02)
+
+    assert (await q.dequeue()).text == "reply"
+    assert q.qsize() == 0
+
+
+@pytest.mark.asyncio
+async def test_speech_queue_urgent_item_preempts_playback_in_same_room():
+    from src.services.audio.speech_queue import SpeechQueue, SpeechRequest
+
+    preempted = []
+    q = SpeechQueue(on_preempt=AsyncMock(side_effect=lambda r: preempted.append(r.text)))
+    await q.enqueue(SpeechRequest(text="whisper", agent_id="dieu", priority=2, room="salon"))
+    playing = await q.dequeue("salon")
+
+    await q.enqueue(SpeechRequest(text="other room", agent_id="lisa", priority=0, room="cuisine"))
+    assert not playing.preempted.is_set()
+
+    await q.enqueue(SpeechRequest(text="answer", agent_id="lisa", priority=0, room="salon"))
+    assert playing.preempted.is_set()
+    assert preempted == ["whisper"]
+    assert (await q.dequeue("salon")).text == "answer"
+    assert q.qsize("cuisine") == 1
+
+
+@pytest.mark.asyncio
+async def test_speech_queue_unacknowledged_item_stops_playing_after_its_estimated_duration():
+    from src.services.audio.speech_queue import PRIORITY_PROACTIVE, SpeechQueue, SpeechRequest
+
+    on_preempt = AsyncMock()
+    q = SpeechQueue(on_preempt=on_preempt, default_ttls={PRIORITY_PROACTIVE: 0.01})
+    await q.enqueue(SpeechRequest(text="whisper", agent_id="dieu", priority=2))
+    playing = await q.dequeue()
+    assert q.playing() is playing and playing.playing_until > time.monotonic()
+
+    playing.playing_until -= 60  # the player never called done()
+    assert q.playing() is None
+    await q.enqueue(SpeechRequest(text="answer", agent_id="lisa", priority=0))
+    assert not playing.preempted.is_set()
+    on_preempt.assert_not_called()
+
+    await q.enqueue(SpeechRequest(text="stale whisper", agent_id="dieu", priority=PRIORITY_PROACTIVE))
+    await asyncio.sleep(0.02)
+    assert q.qsize() == 1  # the expired whisper is not counted
+
+
+@pytest.mark.asyncio
+async def test_speech_queue_rooms_are_independent():
+    from src.services.audio.speech_queue import SpeechQueue, SpeechRequest
+
+    q = SpeechQueue()
+    waiter = asyncio.create_task(q.dequeue("chambre"))
+    await q.enqueue(SpeechRequest(text="salon", agent_id="lisa", room="salon"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await q.enqueue(SpeechRequest(text="chambre", agent_id="lisa", room="chambre"))
+    assert (await asyncio.wait_for(waiter, 1)).text == "chambre"
+    q.interrupt("chambre")
+    assert q.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_speech_queue_merges_consecutive_utterances_from_same_agent():
+    from src.services.audio.speech_queue import SpeechQueue, SpeechRequest
+
+    q = SpeechQueue(merge_consecutive=True)
+    await q.enqueue(SpeechRequest(text="Bonjour.", agent_id="lisa"))
+    await q.enqueue(SpeechRequest(text="Comment vas-tu ?", agent_id="lisa"))
+    await q.enqueue(SpeechRequest(text="Salut.", agent_id="renarde"))
+    await q.enqueue(SpeechRequest(text="Moi aussi.", agent_id="lisa"))
+
+    assert q.qsize() == 3
+    assert (await q.dequeue()).text == "Bonjour. Comment vas-tu ?"
+
+
 @pytest.mark.asyncio
 async def test_melotts_provider_calls_post():
     from src.services.audio.melotts_provider import MeloTtsProvider
@@ -53,12 +138,10 @@ async def test_melotts_provider_calls_post():
     mock_response.status_code = 200
     mock_response.content = b"audio_data"
 
-    with patch("src.services.audio.melotts_provider.httpx") as mock_httpx:
+    with patch("src.services.audio.melotts_provider.get_http_client") as mock_get_client:
         mock_client = AsyncMock()
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
         mock_client.post = AsyncMock(return_value=mock_response)
-        mock_httpx.AsyncClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await provider.synthesize("Bonjour", "FR")
         assert result == b"audio_data"
@@ -72,12 +155,10 @@ async def test_melotts_provider_returns_empty_on_timeout():
 
     provider = MeloTtsProvider(base_url="http://mock-melotts")
 
-    with patch("src.services.audio.melotts_provider.httpx") as mock_httpx:
+    with patch("src.services.audio.melotts_provider.get_http_client") as mock_get_client:
         mock_client = AsyncMock()
-        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = AsyncMock(return_value=None)
         mock_client.post = AsyncMock(side_effect=Exception("timeout"))
-        mock_httpx.AsyncClient.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         result = await provider.synthesize("Bonjour", "FR")
         assert result == b""
@@ -181,3 +262,175 @@ async def test_tts_orchestrator_skips_broadcast_on_empty_audio():
     await orch.synthesize_and_broadcast("Bonjour", "lisa", "FR-Lisa")
 
     redis.publish_event.assert_not_called()
+
+
+def test_split_sentences_merges_short_and_cuts_long():
+    from src.services.audio.tts_orchestrator import split_sentences
+
+    text = "Oui. Je pense que tu as raison sur ce point! Et toi, qu'en dis-tu ? " + "mot " * 100
+    units = split_sentences(text, min_chars=20, max_chars=120)
+
+    assert units[0] == "Oui. Je pense que tu as raison sur ce point!"
+    assert units[1] == "Et toi, qu'en dis-tu ?"
+    assert all(len(u) <= 120 for u in units)
+    assert " ".join(units).split() == text.split()
+
+
+def _slow_orchestrator(delays):
+    from src.services.audio.tts_orchestrator import TtsOrchestrator
+
+    async def synth(text, voice_id, timeout_ms=800):
+        await asyncio.sleep(delays.get(text[:9], 0.01))
+        return text.encode()
+
+    primary = MagicMock()
+    primary.synthesize = AsyncMock(side_effect=synth)
+    redis = MagicMock()
+    redis.publish_event = AsyncMock()
+    return TtsOrchestrator(primary=primary, fallback=MagicMock(), redis_client=redis, max_concurrency=4)
+
+
+@pytest.mark.asyncio
+async def test_tts_pipeline_emits_in_order_while_synthesizing_in_parallel():
+    import base64
+
+    text = "Sentence1 is slow to render. Sentence2 comes back quickly. Sentence3 is also quick."
+    orch = _slow_orchestrator({"Sentence1": 0.05})
+
+    await orch.synthesize_and_broadcast(text, "lisa")
+
+    contents = [c[0][1]["payload"]["content"] for c in orch.redis.publish_event.call_args_list]
+    assert [c["seq"] for c in contents] == [0, 1, 2]
+    assert [base64.b64decode(c["audio_b64"]).decode()[:9] for c in contents] == ["Sentence1", "Sentence2", "Sentence3"]
+    assert [c["is_last"] for c in contents] == [False, False, True]
+    assert len({c["utterance_id"] for c in contents}) == 1
+
+
+@pytest.mark.asyncio
+async def test_tts_pipeline_closes_utterance_when_last_sentence_fails():
+    orch = _slow_orchestrator({})
+    original = orch.primary.synthesize.side_effect
+
+    async def synth(text, voice_id, timeout_ms=800):
+        if text.startswith("Sentence3"):
+            raise RuntimeError("engine down")
+        return await original(text, voice_id, timeout_ms)
+
+    orch.primary.synthesize.side_effect = synth
+    await orch.synthesize_and_broadcast(
+        "Sentence1 is rendered fine. Sentence2 is rendered fine. Sentence3 fails to render.", "lisa"
+    )
+
+    contents = [c[0][1]["payload"]["content"] for c in orch.redis.publish_event.call_args_list]
+    assert [(c["seq"], c["is_last"]) for c in contents] == [(0, False), (1, False), (2, True)]
+    assert contents[-1]["audio_b64"] == ""
+
+
+@pytest.mark.asyncio
+async def test_tts_pipeline_first_audio_independent_of_reply_length():
+    orch = _slow_orchestrator({})
+    long_reply = " ".join(f"Phrase numero {i} de la reponse." for i in range(40))
+    first_chunk_at = []
+
+    async def publish(stream, event):
+        if not first_chunk_at:
+            first_chunk_at.append(loop.time())
+
+    orch.redis.publish_event = AsyncMock(side_effect=publish)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await orch.synthesize_and_broadcast(long_reply, "lisa")
+
+    assert orch.redis.publish_event.call_count == 40
+    assert first_chunk_at[0] - started < 0.1
+
+
+@pytest.mark.asyncio
+async def test_tts_pipeline_cancel_stops_remaining_chunks():
+    text = "Sentence1 arrives right away. Sentence2 takes a long while. Sentence3 never gets played."
+    orch = _slow_orchestrator({"Sentence2": 0.5, "Sentence3": 0.5})
+
+    speaking = asyncio.create_task(orch.synthesize_and_broadcast(text, "lisa"))
+    await asyncio.sleep(0.05)
+    assert orch.cancel("lisa") is True
+    await speaking
+
+    assert orch.redis.publish_event.call_count == 1
+    assert orch.cancel("lisa") is False
+
+
+def test_tts_cache_key_normalizes_text_and_separates_params():
+    from src.services.audio.tts_cache import cache_key
+
+    assert cache_key("Bonjour  !", "FR", "melotts") == cache_key(" Bonjour!", "FR", "melotts")
+    assert cache_key("Bonjour", "FR", "melotts") != cache_key("Bonjour", "FR-Lisa", "melotts")
+    assert cache_key("Bonjour", "FR", "melotts") != cache_key("Bonjour", "FR", "elevenlabs")
+    assert cache_key("Bonjour", "FR", "melotts", {"rate": 1.1}) != cache_key("Bonjour", "FR", "melotts")
+
+
+@pytest.mark.asyncio
+async def test_tts_cache_serves_repeats_without_engine_calls(tmp_path):
+    from src.services.audio.tts_cache import TtsCache
+    from src.services.audio.tts_orchestrator import TtsOrchestrator
+
+    primary = MagicMock()
+    primary.synthesize = AsyncMock(return_value=b"")
+    fallback = MagicMock()
+    fallback.synthesize = AsyncMock(return_value=b"eleven_audio")
+    cache = TtsCache(directory=str(tmp_path), hot_entries=4)
+    orch = TtsOrchestrator(primary=primary, fallback=fallback, redis_client=MagicMock(), cache=cache)
+
+    assert await orch.synthesize("C'est fait.", "FR") == b"eleven_audio"
+    assert await orch.synthesize("C'est  fait.", "FR") == b"eleven_audio"
+    assert fallback.synthesize.call_count == 1
+
+    # Survives a restart through the disk tier
+    cold = TtsOrchestrator(primary=primary, fallback=fallback, redis_client=MagicMock(), cache=TtsCache(str(tmp_path)))
+    assert await cold.synthesize("C'est fait.", "FR") == b"eleven_audio"
+    assert fallback.synthesize.call_count == 1
+
+    # Long, one-off replies are not cached
+    await orch.synthesize("x" * 500, "FR")
+    await orch.synthesize("x" * 500, "FR")
+    assert fallback.synthesize.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_tts_cache_enforces_byte_budget(tmp_path):
+    from src.services.audio.tts_cache import TtsCache
+
+    cache = TtsCache(directory=str(tmp_path), max_bytes=250, hot_entries=0)
+    for i in range(5):
+        await cache.put(f"key{i}", bytes(100))
+
+    assert sorted(os.listdir(tmp_path)) == ["key3.audio", "key4.audio"]
+    assert await cache.get("key0") is None
+    assert await cache.get("key4") == bytes(100)
+
+
+@pytest.mark.asyncio
+async def test_tts_cache_oversized_clip_stays_in_memory_only(tmp_path):
+    from src.services.audio.tts_cache import TtsCache
+
+    cache = TtsCache(directory=str(tmp_path), max_bytes=250)
+    await cache.put("small", bytes(100))
+    await cache.put("huge", bytes(300))
+
+    assert os.listdir(tmp_path) == ["small.audio"]  # the big clip did not evict anything
+    assert await cache.get("huge") == bytes(300)
+
+
+@pytest.mark.asyncio
+async def test_tts_prewarm_synthesizes_only_missing_phrases(tmp_path):
+    from src.services.audio.tts_cache import TtsCache
+    from src.services.audio.tts_orchestrator import TtsOrchestrator
+
+    primary = MagicMock()
+    primary.synthesize = AsyncMock(return_value=b"melo")
+    cache = TtsCache(directory=str(tmp_path))
+    orch = TtsOrchestrator(primary=primary, fallback=MagicMock(), redis_client=MagicMock(), cache=cache)
+
+    phrases = {"FR-Electra": ["C'est fait.", "Bien reçu."], "FR-Lisa": ["Bonjour !"]}
+    assert await orch.prewarm(phrases) == 3
+    assert await orch.prewarm(phrases) == 0
+    assert primary.synthesize.call_count == 3
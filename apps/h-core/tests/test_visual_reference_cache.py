@@ -0,0 +1,91 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.visual.reference_cache import BackgroundRemover, ReferenceImageCache
+
+
+@pytest.fixture
+def ref_file(tmp_path):
+    path = tmp_path / "character_sheet_neutral.png"
+    path.write_bytes(b"fake image content")
+    return str(path)
+
+
+def test_reference_cache_hits_on_unchanged_file(ref_file):
+    cache = ReferenceImageCache(max_dimension=0)
+
+    first = cache.get_data_uri(ref_file)
+    second = cache.get_data_uri(ref_file)
+
+    assert first.startswith("data:image/png;base64,")
+    assert first == second
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+
+def test_reference_cache_reloads_when_mtime_changes(ref_file):
+    cache = ReferenceImageCache(max_dimension=0)
+    first = cache.get_data_uri(ref_file)
+
+    with open(ref_file, "wb") as f:
+        f.write(b"new sheet")
+    stat = os.stat(ref_file)
+    os.utime(ref_file, (stat.st_atime, stat.st_mtime + 10))
+
+    second = cache.get_data_uri(ref_file)
+    assert second != first
+    assert cache.misses == 2
+
+
+def test_reference_cache_evicts_oldest(tmp_path):
+    cache = ReferenceImageCache(max_entries=2, max_dimension=0)
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"ref_{i}.png"
+        p.write_bytes(f"img {i}".encode())
+        paths.append(str(p))
+        cache.get_data_uri(str(p))
+
+    assert paths[0] not in cache._entries
+    assert len(cache._entries) == 2
+
+
+def test_reference_cache_explicit_zero_disables_resizing(monkeypatch):
+    monkeypatch.setenv("VISUAL_REFERENCE_MAX_DIM", "512")
+    assert ReferenceImageCache(max_dimension=0).max_dimension == 0
+    assert ReferenceImageCache().max_dimension == 512
+
+
+def test_background_remover_reuses_session():
+    remover = BackgroundRemover()
+    remover._available = True
+    remover._remove = MagicMock(side_effect=lambda data, session=None: b"cut:" + data)
+    session = object()
+    remover._session = session
+
+    assert remover.remove_bytes(b"first pose") == b"cut:first pose"
+    assert remover.remove_bytes(b"second pose") == b"cut:second pose"
+    assert [c.kwargs["session"] for c in remover._remove.call_args_list] == [session, session]
+
+
+@pytest.mark.asyncio
+async def test_background_remover_rewrites_file(tmp_path):
+    path = tmp_path / "pose.png"
+    path.write_bytes(b"raw")
+    remover = BackgroundRemover()
+    remover._available = True
+    remover._session = False
+    remover._remove = MagicMock(return_value=b"transparent")
+
+    assert await remover.remove_file(str(path)) is True
+    assert path.read_bytes() == b"transparent"
+
+
+@pytest.mark.asyncio
+async def test_background_remover_skips_without_rembg(tmp_path):
+    remover = BackgroundRemover()
+    remover._available = False
+
+    assert await remover.remove_file(str(tmp_path / "missing.png")) is False
@@ -0,0 +1,85 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.features.home.wakeword.ring_buffer import AudioRingBuffer
+
+
+def test_frames_come_out_in_order_across_wraparound():
+    ring = AudioRingBuffer(capacity=10)
+    out = []
+    for start in range(0, 40, 4):
+        ring.write(np.arange(start, start + 4, dtype=np.int16))
+        while (frame := ring.read_frame(3)) is not None:
+            out.extend(frame.tolist())
+
+    assert out == list(range(39))
+    assert ring.overruns == 0
+
+
+def test_overlapping_frames_share_samples():
+    ring = AudioRingBuffer(capacity=16)
+    ring.write(np.arange(8, dtype=np.int16))
+
+    assert ring.read_frame(4, hop_size=2).tolist() == [0, 1, 2, 3]
+    assert ring.read_frame(4, hop_size=2).tolist() == [2, 3, 4, 5]
+    assert ring.read_frame(4, hop_size=2).tolist() == [4, 5, 6, 7]
+    assert ring.read_frame(4, hop_size=2) is None
+
+
+def test_overrun_is_counted_and_reader_skips_to_oldest_kept():
+    ring = AudioRingBuffer(capacity=8)
+    ring.write(np.arange(20, dtype=np.int16).tobytes())
+
+    assert ring.read_frame(4).tolist() == [12, 13, 14, 15]
+    assert ring.overruns == 1
+    assert ring.dropped_samples == 12
+
+
+def test_pre_trigger_window_is_zero_copy():
+    ring = AudioRingBuffer(capacity=8)
+    ring.write(np.arange(11, dtype=np.int16))
+
+    segments = ring.latest(5)
+    assert [s.tolist() for s in segments] == [[6, 7], [8, 9, 10]]
+    assert all(np.shares_memory(s, ring._buf) for s in segments)
+    assert np.frombuffer(ring.to_bytes(ring.written - 5), dtype=np.int16).tolist() == [6, 7, 8, 9, 10]
+
+
+def test_engine_capture_thread_feeds_inference_without_drops():
+    from src.features.home.wakeword.wakeword import WakewordEngine
+
+    engine = WakewordEngine({"chunk_size": 160, "pre_trigger_ms": 20})
+    scores = iter([0.0] * 49 + [0.9] + [0.0] * 1000)
+    engine.model = MagicMock()
+    engine.model.predict = MagicMock(side_effect=lambda frame: {"hey_lisa": next(scores)})
+    detections = []
+
+    async def on_detect(info):
+        detections.append(info)
+
+    engine.detection_callback = on_detect
+    engine.is_running = True
+    worker = threading.Thread(target=engine._processing_loop, daemon=True)
+    worker.start()
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.features.home.wakeword.wakeword.pyaudio", MagicMock(), raising=False)
+        for i in range(60):
+            engine._audio_callback(np.full(160, i, dtype=np.int16).tobytes(), 160, None, None)
+    deadline = time.time() + 2
+    while engine.model.predict.call_count < 60 and time.time() < deadline:
+        time.sleep(0.01)
+    engine.is_running = False
+    worker.join(timeout=1)
+
+    assert engine.model.predict.call_count == 60
+    assert engine.get_buffer_stats()["overruns"] == 0
+    (info,) = detections
+    pre_trigger = np.frombuffer(engine.audio_since(info["stream_position"]), dtype=np.int16)
+    # Fired on chunk 49: the 20ms window starts two chunks earlier and runs to whatever was captured since
+    assert pre_trigger[:320].tolist() == [48] * 160 + [49] * 160
+    assert pre_trigger[-1] == 59
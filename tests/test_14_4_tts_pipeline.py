@@ -99,5 +99,129 @@ class TestTTSPipeline:
         
         print("✅ Streaming logic test passed")
 
+    def _pipelined_service(self, delays):
+        import time as _time
+        from concurrent.futures import ThreadPoolExecutor
+
+        service = TTSService(AsyncMock())
+        service.engine_type = "elevenlabs"
+        service.synth_pool = ThreadPoolExecutor(max_workers=3)
+        sent = []
+        service._send_event = lambda msg_type, request_id, content: sent.append((msg_type, content))
+
+        def render(text, params, local_engine):
+            _time.sleep(delays.get(text[:9], 0.01))
+            return text.encode(), "mp3"
+
+        service._render = render
+        return service, sent
+
+    def test_sentences_synthesized_in_parallel_and_emitted_in_order(self):
+        """Sentence-level pipelining keeps chunk order while rendering concurrently."""
+        import base64 as _b64
+        import time as _time
+
+        service, sent = self._pipelined_service({"Sentence1": 0.15, "Sentence2": 0.1, "Sentence3": 0.1})
+        text = "Sentence1 is the slowest one. Sentence2 is a bit quicker. Sentence3 is a bit quicker too."
+
+        started = _time.perf_counter()
+        service._process_tts_request("req_1", text, {}, None)
+        elapsed = _time.perf_counter() - started
+
+        chunks = [c for t, c in sent if t == "tts_audio_chunk"]
+        assert [c["index"] for c in chunks] == [0, 1, 2]
+        assert [_b64.b64decode(c["audio_chunk"])[:9] for c in chunks] == [b"Sentence1", b"Sentence2", b"Sentence3"]
+        assert chunks[-1]["is_last"] is True
+        assert sent[-1] == ("tts_end", {"status": "completed", "chunks": 3})
+        assert elapsed < 0.3  # sequential would take 0.35s
+        service.synth_pool.shutdown()
+
+    def test_failed_last_sentence_still_closes_the_utterance(self):
+        """When the final sentence renders nothing, an empty chunk carries is_last."""
+        service, sent = self._pipelined_service({})
+        service._render = lambda text, params, local_engine: (
+            (None, "") if "Sentence3" in text else (text.encode(), "mp3")
+        )
+        text = "Sentence1 is rendered fine. Sentence2 is rendered fine. Sentence3 fails to render."
+
+        service._process_tts_request("req_3", text, {}, None)
+
+        chunks = [c for t, c in sent if t == "tts_audio_chunk"]
+        assert [c["is_last"] for c in chunks] == [False, False, True]
+        assert chunks[-1]["audio_chunk"] == "" and chunks[-1]["index"] == 2
+        assert sent[-1] == ("tts_end", {"status": "completed", "chunks": 2})
+        service.synth_pool.shutdown()
+
+    def test_cancel_stops_emitting_chunks(self):
+        service, sent = self._pipelined_service({"Sentence2": 0.2, "Sentence3": 0.2})
+        text = "Sentence1 arrives right away. Sentence2 takes a long while. Sentence3 never gets played."
+
+        original = service._send_event
+
+        def send_and_cancel(msg_type, request_id, content):
+            original(msg_type, request_id, content)
+            if msg_type == "tts_audio_chunk":
+                service.cancel("req_2")
+
+        service._send_event = send_and_cancel
+        service._process_tts_request("req_2", text, {}, None)
+
+        assert len([c for t, c in sent if t == "tts_audio_chunk"]) == 1
+        assert sent[-1][1]["status"] == "cancelled"
+        service.synth_pool.shutdown()
+
+    def _cached_service(self, tmp_path):
+        from services.tts_cache import TtsCache
+
+        service = TTSService(AsyncMock())
+        service.engine_type = "elevenlabs"
+        service.cache = TtsCache(directory=str(tmp_path))
+        calls = []
+
+        def render_engine(text, params, local_engine):
+            calls.append(text)
+            return f"{text}|{params.get('voice_id')}|{params.get('pitch')}".encode(), "mp3"
+
+        service._render_engine = render_engine
+        return service, calls
+
+    def test_render_replays_cached_sentences(self, tmp_path):
+        """Same text and voice hits the cache; request bookkeeping stays out of the key."""
+        service, calls = self._cached_service(tmp_path)
+        params = {"voice_id": "v1", "pitch": 1.1, "rate": 1.0}
+
+        first = service._render("C'est fait.", {**params, "enqueued_at": 1.0, "trace_id": "a"}, None)
+        again = service._render("C'est  fait.", {**params, "enqueued_at": 2.0, "trace_id": "b"}, None)
+        assert again == first == (b"C'est fait.|v1|1.1", "mp3")
+        assert calls == ["C'est fait."]
+
+        service._render("C'est fait.", {**params, "voice_id": "v2"}, None)
+        service._render("C'est fait.", {**params, "pitch": 0.9}, None)
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_prewarm_renders_persona_phrases_once(self, tmp_path):
+        from handlers.tts import load_persona_phrases
+
+        agents = tmp_path / "agents"
+        (agents / "electra").mkdir(parents=True)
+        (agents / "electra" / "persona.yaml").write_text(
+            'name: Electra\ncommon_phrases:\n  - "C\'est fait."\n  - "Bien reçu."\n', encoding="utf-8"
+        )
+        (agents / "lisa").mkdir()
+        (agents / "lisa" / "persona.yaml").write_text("name: Lisa\n", encoding="utf-8")
+        phrases = load_persona_phrases(str(agents))
+        assert phrases == {"electra": ["C'est fait.", "Bien reçu."]}
+
+        service, calls = self._cached_service(tmp_path / "cache")
+        service._voice_params = AsyncMock(side_effect=lambda text, params: {**params, "voice_id": "v1"})
+        assert await service.prewarm(phrases) == 2
+        assert await service.prewarm(phrases) == 0
+
+        audio, _ = service._render("Bien reçu.", {"agent_id": "electra", "voice_id": "v1"}, None)
+        assert audio == b"Bien re\xc3\xa7u.|v1|None"
+        assert sorted(calls) == ["Bien reçu.", "C'est fait."]
+
+
 if __name__ == '__main__':
     sys.exit(pytest.main([__file__]))
@@ -0,0 +1,258 @@
+"""
+WebSocket fan-out hub: per-client queues, coalescing, slow-consumer eviction,
+plus a benchmark with hundreds of simulated clients.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+BRIDGE_SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "apps", "h-bridge", "src"))
+if BRIDGE_SRC not in sys.path:
+    sys.path.insert(0, BRIDGE_SRC)
+
+from services.fanout import FanoutHub, Subscription  # noqa: E402
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0, hang: bool = False):
+        self.delay = delay
+        self.hang = hang
+        self.received = []
+        self.closed_with = None
+
+    async def send_text(self, text):
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _drain(sockets, expected, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if all(len(s.received) >= expected for s in sockets):
+            return time.perf_counter()
+        await asyncio.sleep(0.001)
+    raise AssertionError("clients did not receive all events in time")
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_are_coalesced_for_a_busy_client():
+    hub = FanoutHub(max_queue=16)
+    ws = FakeSocket(hang=True)
+    channel = hub.register(ws)
+    await asyncio.sleep(0)  # writer picks up nothing yet
+
+    hub.broadcast({"type": "narrative.text", "n": 0})
+    await asyncio.sleep(0)  # first message now stuck in send_text
+    for i in range(10):
+        hub.broadcast({"type": "system.heartbeat", "n": i})
+    hub.broadcast({"type": "narrative.text", "n": 1})
+
+    assert channel.backlog == 2
+    assert [json.loads(t)["n"] for _, t in channel._queue] == [9, 1]
+    hub.unregister(ws)
+
+
+@pytest.mark.asyncio
+async def test_droppable_events_are_shed_before_evicting():
+    hub = FanoutHub(max_queue=4)
+    ws = FakeSocket(hang=True)
+    channel = hub.register(ws)
+    await asyncio.sleep(0)
+
+    for i in range(4):
+        hub.broadcast({"type": "narrative.text", "n": i})
+    assert hub.broadcast({"type": "audio.chunk"}) == 0
+    assert channel.dropped == 1 and ws in hub.channels
+
+    hub.broadcast({"type": "narrative.text", "n": 99})
+    hub.broadcast({"type": "narrative.text", "n": 100})
+    await asyncio.sleep(0)
+    assert ws not in hub.channels
+    assert ws.closed_with == 1013
+
+
+@pytest.mark.asyncio
+async def test_hung_client_is_evicted_on_send_timeout():
+    hub = FanoutHub(send_timeout=0.05)
+    hung, healthy = FakeSocket(hang=True), FakeSocket()
+    hub.register(hung)
+    hub.register(healthy)
+
+    hub.broadcast({"type": "narrative.text"})
+    await asyncio.sleep(0.1)
+
+    assert hung not in hub.channels
+    assert len(healthy.received) == 1
+
+
+@pytest.mark.asyncio
+async def test_benchmark_broadcast_latency_independent_of_slowest_client():
+    """300 clients, 5 of them at 200ms per send: fast clients must not wait for them."""
+    hub = FanoutHub(max_queue=256, send_timeout=5)
+    fast = [FakeSocket() for _ in range(295)]
+    slow = [FakeSocket(delay=0.2) for _ in range(5)]
+    for ws in fast + slow:
+        hub.register(ws)
+
+    events = 20
+    started = time.perf_counter()
+    enqueue_time = 0.0
+    for i in range(events):
+        t0 = time.perf_counter()
+        hub.broadcast({"type": "narrative.text", "n": i, "payload": {"content": "x" * 200}})
+        enqueue_time += time.perf_counter() - t0
+        await asyncio.sleep(0)
+    done = await _drain(fast, events)
+
+    fast_latency = done - started
+    print(
+        f"\nFANOUT_BENCH: {len(fast) + len(slow)} clients, {events} events, "
+        f"broadcast {enqueue_time / events * 1e6:.0f}us/event, fast clients done in {fast_latency * 1000:.0f}ms, "
+        f"slow backlog {max(hub.channels[s].backlog for s in slow)}"
+    )
+    # A sequential send loop would take at least events * 5 * 200ms = 20s
+    assert fast_latency < 1.0
+    # Slow clients still hold their own backlog rather than having been skipped
+    assert all(hub.channels[s].backlog > 0 for s in slow)
+    for ws in fast + slow:
+        hub.unregister(ws)
+
+
+def _agent_event(msg_type, agent, room=None):
+    return {
+        "type": msg_type,
+        "sender": {"agent_id": agent, "role": "agent"},
+        "recipient": {"target": "broadcast", "room": room},
+        "payload": {"content": "..."},
+    }
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_filter_by_type_agent_room_and_audio():
+    hub = FanoutHub()
+    everything = FakeSocket()
+    lisa_only = FakeSocket()
+    kitchen_panel = FakeSocket()
+    hub.register(everything)
+    hub.register(lisa_only, Subscription.from_dict({"agents": "lisa"}))
+    hub.register(kitchen_panel, Subscription.from_dict({"rooms": ["kitchen"], "types": "narrative.text", "audio": "0"}))
+
+    hub.broadcast(_agent_event("narrative.text", "lisa", "kitchen"))
+    hub.broadcast(_agent_event("narrative.text", "electra", "kitchen"))
+    hub.broadcast(_agent_event("narrative.text", "lisa", "bedroom"))
+    hub.broadcast(_agent_event("audio.chunk", "lisa", "kitchen"))
+    hub.broadcast({"type": "system.log", "payload": {"content": "x"}})  # unscoped
+    hub.broadcast({"type": "system.heartbeat"})  # always delivered
+
+    await _drain([everything], 6)
+    await asyncio.sleep(0.01)
+    assert [m["type"] for m in everything.received].count("narrative.text") == 3
+    assert [(m["type"], m.get("sender", {}).get("agent_id")) for m in lisa_only.received] == [
+        ("narrative.text", "lisa"),
+        ("narrative.text", "lisa"),
+        ("audio.chunk", "lisa"),
+        ("system.log", None),
+        ("system.heartbeat", None),
+    ]
+    assert [(m["type"], m.get("sender", {}).get("agent_id")) for m in kitchen_panel.received] == [
+        ("narrative.text", "lisa"),
+        ("narrative.text", "electra"),
+        ("system.heartbeat", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscription_change_invalidates_routes():
+    hub = FanoutHub()
+    ws = FakeSocket()
+    hub.register(ws, Subscription.from_dict({"agents": "lisa"}))
+
+    hub.broadcast(_agent_event("narrative.text", "electra"))
+    assert hub.subscribe(ws, Subscription.from_dict({"agents": "lisa,electra"}))
+    hub.broadcast(_agent_event("narrative.text", "electra"))
+    await _drain([ws], 1)
+    hub.unregister(ws)
+    assert hub.broadcast(_agent_event("narrative.text", "electra")) == 0
+
+    await asyncio.sleep(0.01)
+    assert len(ws.received) == 1
+    assert hub.subscribers("narrative.text", "electra") == ()
+
+
+@pytest.mark.asyncio
+async def test_benchmark_filtered_fanout_only_pays_for_subscribers():
+    hub = FanoutHub(max_queue=4096)
+    panels = [FakeSocket() for _ in range(300)]
+    for i, ws in enumerate(panels):
+        hub.register(ws, Subscription.from_dict({"rooms": f"room-{i % 30}", "audio": False}))
+
+    events = 600
+    started = time.perf_counter()
+    for n in range(events):
+        hub.broadcast(_agent_event("audio.chunk", "lisa", f"room-{n % 30}"))
+        hub.broadcast(_agent_event("narrative.text", "lisa", f"room-{n % 30}"))
+    elapsed = time.perf_counter() - started
+
+    await _drain(panels, events // 30)
+    await asyncio.sleep(0.01)
+    # Each narrative event reaches only the 10 panels of its room; audio reaches none
+    assert sum(len(ws.received) for ws in panels) == events * 10
+    assert all(m["type"] == "narrative.text" for ws in panels for m in ws.received)
+    print(f"\nfiltered fan-out: {2 * events} events x 300 clients in {elapsed * 1000:.1f}ms")
+    for ws in panels:
+        hub.unregister(ws)
+
+
+def _stream_event(n, msg_type="narrative.text", agent="lisa", room=None):
+    event = _agent_event(msg_type, agent, room)
+    event["stream_id"] = f"1700000000000-{n}"
+    event["n"] = n
+    return event
+
+
+@pytest.mark.asyncio
+async def test_reconnecting_client_gets_only_missed_events():
+    hub = FanoutHub(replay_size=100)
+    hub.warm([(f"1700000000000-{n}", _stream_event(n)) for n in range(3)], complete=True)
+    for n in range(3, 6):
+        hub.broadcast(_stream_event(n))
+    hub.broadcast({"type": "system.heartbeat", "stream_id": "1700000000000-6"})  # not replayed
+
+    ws = FakeSocket()
+    hub.register(ws, Subscription.from_dict({"agents": "lisa"}))
+    result = hub.replay(ws, "1700000000000-3")
+    assert result == {"count": 2, "complete": True, "last_id": "1700000000000-5"}
+
+    # A re-delivered entry (e.g. reclaimed after a restart) is not sent twice
+    hub.broadcast(_stream_event(5))
+    hub.broadcast(_stream_event(7))
+    await _drain([ws], 3)
+    await asyncio.sleep(0.01)
+    assert [m["n"] for m in ws.received] == [4, 5, 7]
+
+
+@pytest.mark.asyncio
+async def test_replay_reports_gaps_so_the_client_reloads():
+    hub = FanoutHub(replay_size=5)
+    for n in range(1, 11):
+        hub.broadcast(_stream_event(n))
+    ws = FakeSocket()
+    hub.register(ws)
+
+    # Events 2..5 fell out of the buffer
+    result = hub.replay(ws, "1700000000000-1")
+    assert result["complete"] is False and result["count"] == 5
+    assert hub.replay(ws, "1700000000000-6")["complete"] is True
+    assert hub.replay(ws, "not-an-id")["complete"] is False
+    hub.unregister(ws)
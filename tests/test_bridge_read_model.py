@@ -0,0 +1,103 @@
+"""
+Bridge read-model cache: config/history are loaded once, kept current from
+system_stream events, and served with ETags.
+"""
+
+import os
+import sys
+
+import pytest
+
+BRIDGE_SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "apps", "h-bridge", "src"))
+if BRIDGE_SRC not in sys.path:
+    sys.path.insert(0, BRIDGE_SRC)
+
+from services.read_model import ReadModelCache  # noqa: E402
+
+
+class CountingLoader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    async def __call__(self, *args):
+        self.calls += 1
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_config_is_loaded_once_and_updated_from_events():
+    cache = ReadModelCache(ttl=0)
+    loader = CountingLoader({"llm_model": "a", "llm_provider": "ollama", "source": "env"})
+
+    for _ in range(20):
+        assert (await cache.get_config(loader))["llm_model"] == "a"
+    assert loader.calls == 1
+    etag = cache.config.etag
+    assert cache.config.not_modified(etag)
+
+    cache.apply_event({"type": "system.config_update", "payload": {"content": {"log_level": "DEBUG"}}})
+    assert cache.config.etag == etag  # not an LLM config change
+
+    cache.apply_event(
+        {"type": "system.config_update", "payload": {"content": {"llm_config": {"model": "b", "provider": "openai"}}}}
+    )
+    config = await cache.get_config(loader)
+    assert config == {"llm_model": "b", "llm_provider": "openai", "source": "db"}
+    assert loader.calls == 1
+    assert not cache.config.not_modified(etag)
+
+
+@pytest.mark.asyncio
+async def test_history_window_grows_incrementally():
+    rows = [{"id": f"fact:{n}", "content": f"fact {n}"} for n in (3, 2, 1)]
+    cache = ReadModelCache(history_size=4, ttl=0)
+    loader = CountingLoader(rows)
+
+    # Facts added before the first load are picked up by the load itself
+    cache.apply_event({"type": "memory.facts_added", "payload": {"content": {"facts": [{"id": "fact:0"}]}}})
+    assert [f["id"] for f in await cache.get_history(loader)] == ["fact:3", "fact:2", "fact:1"]
+
+    cache.apply_event(
+        {"type": "memory.facts_added", "payload": {"content": {"facts": [{"id": "fact:4"}, {"id": "fact:5"}]}}}
+    )
+    history = await cache.get_history(loader)
+    assert [f["id"] for f in history] == ["fact:5", "fact:4", "fact:3", "fact:2"]
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_removed_facts_reload_the_history():
+    cache = ReadModelCache(ttl=0)
+    loader = CountingLoader([{"id": "fact:2"}, {"id": "fact:1"}])
+    await cache.get_history(loader)
+
+    loader.value = [{"id": "fact:2"}]
+    cache.apply_event({"type": "memory.facts_removed", "payload": {"content": {"count": 1}}})
+    assert [f["id"] for f in await cache.get_history(loader)] == ["fact:2"]
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_safety_ttl_reloads_after_invalidation():
+    cache = ReadModelCache(ttl=300)
+    loader = CountingLoader([{"id": "fact:1"}])
+    await cache.get_history(loader)
+    await cache.get_history(loader)
+    cache.history.invalidate()
+    await cache.get_history(loader)
+    assert loader.calls == 2
+    # Same content after the reload: the ETag does not change
+    assert cache.history.version == 1
+
+
+@pytest.mark.asyncio
+async def test_etag_survives_a_restart_but_not_a_content_change():
+    before_restart, after_restart = ReadModelCache(ttl=0), ReadModelCache(ttl=0)
+    await before_restart.get_history(CountingLoader([{"id": "fact:1"}, {"id": "fact:2"}]))
+    await after_restart.get_history(CountingLoader([{"id": "fact:9"}]))
+    assert before_restart.history.version == after_restart.history.version == 1
+    assert before_restart.history.etag != after_restart.history.etag
+
+    after_restart.history.set(list(before_restart.history.value))
+    assert after_restart.history.not_modified(before_restart.history.etag)
@@ -0,0 +1,86 @@
+"""
+Bridge consumer-group housekeeping: abandoned group cleanup and pending-entry
+reclaim on startup, against an in-memory stand-in for the Redis stream commands.
+"""
+
+import os
+import sys
+
+import pytest
+
+BRIDGE_SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "apps", "h-bridge", "src"))
+if BRIDGE_SRC not in sys.path:
+    sys.path.insert(0, BRIDGE_SRC)
+
+from infrastructure.redis import RedisClient  # noqa: E402
+
+
+class FakeStreams:
+    def __init__(self):
+        self.groups = {
+            "bridge-web-1": [{"name": "web-1", "idle": 10}],
+            "bridge-3f2a": [{"name": "bridge-1", "idle": 7_200_000}],
+            "bridge-9c1d": [],
+            "bridge-live": [{"name": "live", "idle": 500}],
+            "core-workers": [{"name": "core", "idle": 9_999_999}],
+        }
+        self.destroyed = []
+        self.acked = []
+        # Left pending by a crashed run: one held by a dead consumer, one by ourselves
+        self.foreign_pending = [("1-0", {"type": "narrative.text", "payload": '{"content": "a"}'})]
+        self.own_pending = [("2-0", {"type": "narrative.text", "payload": '{"content": "b"}'})]
+
+    async def xinfo_groups(self, stream):
+        return [{"name": name} for name in self.groups]
+
+    async def xinfo_consumers(self, stream, group):
+        return self.groups[group]
+
+    async def xgroup_destroy(self, stream, group):
+        self.destroyed.append(group)
+        del self.groups[group]
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        claimed, self.foreign_pending = self.foreign_pending, []
+        self.own_pending = claimed + self.own_pending
+        return ["0-0", claimed, []]
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        last_id = streams["system_stream"]
+        pending = [m for m in self.own_pending if last_id == "0" or m[0] > last_id]
+        return [("system_stream", pending)] if pending else []
+
+    async def xack(self, stream, group, m_id):
+        self.acked.append(m_id)
+        self.own_pending = [m for m in self.own_pending if m[0] != m_id]
+
+
+@pytest.mark.asyncio
+async def test_cleanup_destroys_only_abandoned_bridge_groups():
+    client = RedisClient()
+    client.client = FakeStreams()
+
+    destroyed = await client.cleanup_groups("system_stream", prefix="bridge-", keep="bridge-web-1", idle_ms=3_600_000)
+
+    assert sorted(destroyed) == ["bridge-3f2a", "bridge-9c1d"]
+    assert "bridge-live" in client.client.groups and "core-workers" in client.client.groups
+
+
+@pytest.mark.asyncio
+async def test_pending_entries_are_redelivered_with_their_ids():
+    client = RedisClient()
+    client.client = FakeStreams()
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    processed = await client._drain_pending(
+        "system_stream", "bridge-web-1", "web-1", handler, reclaim_idle_ms=30_000, with_ids=True
+    )
+
+    # The dead consumer's entry is claimed and acked, then our own pending list is drained
+    assert processed == 2
+    assert [e["stream_id"] for e in received] == ["1-0", "2-0"]
+    assert received[-1]["payload"] == {"content": "b"}
+    assert client.client.own_pending == []